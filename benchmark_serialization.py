@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da serialização de tickets
+Compara o caminho antigo (cópia para dict + isoformat campo a campo +
+provider padrão do Flask) com o TicketJSONProvider, sem precisar de banco
+
+Uso: python benchmark_serialization.py [linhas ...]   (padrão: 10000 100000)
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extras import RealDictRow
+from src.utils.serialization import TicketJSONProvider
+
+REPEAT = 3
+
+
+def build_rows(count):
+    """Gera linhas no formato devolvido por SELECT t.*, tt.name as type_name (colunas de init-db.sql)"""
+    base = datetime(2026, 1, 1, 8, 0, 0)
+    urgencies = ('low', 'medium', 'high')
+    rows = []
+    for i in range(count):
+        created_at = base + timedelta(minutes=i)
+        completed = i % 4 == 0
+        rows.append(RealDictRow([
+            ('id', i + 1),
+            ('ticket_number', f'TK26{i + 1:04d}'),
+            ('type_id', i % 10 + 1),
+            ('title', f'Ticket de teste {i}'),
+            ('description', 'Descrição do problema relatado pelo usuário ' * 3),
+            ('requester', f'Usuário {i % 500}'),
+            ('requester_email', f'usuario{i % 500}@empresa.com'),
+            ('urgency', urgencies[i % 3]),
+            ('status', 'completed' if completed else 'pending'),
+            ('priority', i % 5 + 1),
+            ('assigned_to', 'tecnico1' if completed else None),
+            ('created_at', created_at),
+            ('updated_at', created_at + timedelta(hours=1)),
+            ('completed_at', created_at + timedelta(hours=2) if completed else None),
+            ('created_by', 'admin'),
+            ('updated_by', 'tecnico1' if completed else None),
+            ('estimated_hours', Decimal('2.50')),
+            ('actual_hours', Decimal('1.75') if completed else None),
+            ('resolution', 'Equipamento substituído e testado com o usuário' if completed else None),
+            ('tags', ['hardware', 'estacao'] if i % 7 == 0 else None),
+            ('type_name', 'Hardware'),
+        ]))
+    return rows
+
+
+def legacy_serialize(app, rows):
+    """Caminho anterior de get_tickets"""
+    result = []
+    for ticket in rows:
+        ticket_dict = dict(ticket)
+        for field in ['created_at', 'completed_at', 'updated_at']:
+            if ticket_dict.get(field):
+                ticket_dict[field] = ticket_dict[field].isoformat()
+        for field in ['estimated_hours', 'actual_hours']:
+            if ticket_dict.get(field) is not None:
+                ticket_dict[field] = float(ticket_dict[field])
+        result.append(ticket_dict)
+    return app.json.dumps(result)
+
+
+def fast_serialize(app, rows):
+    return app.json.dumps(rows)
+
+
+def measure(func, app, rows):
+    best = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        body = func(app, rows)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+
+    legacy_app = Flask('legacy')
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    fast_app = Flask('fast')
+    fast_app.json = TicketJSONProvider(fast_app)
+
+    print(f"📊 Serialização de tickets (melhor de {REPEAT})")
+    for size in sizes:
+        rows = build_rows(size)
+        with legacy_app.app_context():
+            legacy_time, legacy_bytes = measure(legacy_serialize, legacy_app, rows)
+        with fast_app.app_context():
+            fast_time, fast_bytes = measure(fast_serialize, fast_app, rows)
+
+        print(f"\n{size:,} linhas")
+        print(f"   antigo: {legacy_time * 1000:9.1f} ms  ({legacy_bytes / 1024:,.0f} KiB)")
+        print(f"   novo:   {fast_time * 1000:9.1f} ms  ({fast_bytes / 1024:,.0f} KiB)")
+        print(f"   ganho:  {legacy_time / fast_time:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Suíte de microbenchmarks dos caminhos quentes da API
+Mede, contra um PostgreSQL local semeado em tamanhos fixos (generate_dataset.py):
+
+    - custo de token_required (cache quente e frio) sobre uma rota vazia
+    - serialização da listagem e GET /api/tickets/ paginado
+    - cada consulta de /api/stats (agregados, finalizados hoje, tipos, versão)
+    - create_ticket com a busca do tipo e o UPDATE dinâmico de update_ticket
+    - custo dos triggers por INSERT/UPDATE (mesma instrução com e sem triggers)
+
+Escritas rodam dentro de um SAVEPOINT desfeito a cada iteração: o banco não
+muda entre execuções e o tempo de COMMIT (fsync) fica de fora. Os resultados
+são comparados com a baseline gravada; medianas acima da tolerância são
+marcadas como regressão e o script sai com código 1.
+
+Uso:
+    python benchmark_suite.py --save-baseline           # semeia 10k e 100k tickets e grava a baseline
+    python benchmark_suite.py                           # mede e compara com a baseline
+    python benchmark_suite.py --sizes 1000000 --only stats --skip-seed
+
+Conexão pelas mesmas variáveis do app (POSTGRES_*). O token é gerado para o
+primeiro usuário ativo do SQLite (crie o admin antes).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import jwt
+from flask import jsonify
+
+from src.main import app
+from src.models.postgres_connection import get_postgres_connection
+from src.models.ticket_partitions import fetch_ticket_created_at
+from src.models.ticket_types import ticket_type_catalog, TICKET_TYPES_SQL
+from src.models.user import User
+from src.routes.auth import token_required, user_cache, token_cache
+from src.routes.stats import stats_cache, AGGREGATE_STATS_SQL, COMPLETED_TODAY_SQL
+from src.routes.tickets import (
+    build_listing_query, build_update_query, INSERT_TICKET_SQL, MAX_PAGE_SIZE
+)
+from src.utils.conditional import TICKETS_VERSION_SQL
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmark_baseline.json')
+
+WARMUP = 3
+MIN_ITERATIONS = 10
+
+# Sem triggers o número não é gerado e ticket_number é NOT NULL: a variante
+# sem triggers envia um número fixo (o SAVEPOINT desfaz o INSERT). O trigger
+# ALWAYS de ticket_numbers continua ativo e rejeitaria um número repetido
+INSERT_NUMBERED_TICKET_SQL = """
+    INSERT INTO tickets (type_id, title, description, requester, requester_email, urgency, status, created_by, ticket_number)
+    VALUES (%s, %s, %s, %s, %s, %s, 'pending', %s, 'TKBENCH')
+    RETURNING *
+"""
+
+BENCHMARKS = []
+
+
+def benchmark(name, group):
+    """Registra `setup(ctx) -> função medida`; a função pode devolver o próprio tempo"""
+    def decorator(setup):
+        BENCHMARKS.append((name, group, setup))
+        return setup
+    return decorator
+
+
+class Context:
+    """Estado compartilhado pelos benchmarks de um tamanho de base"""
+
+    def __init__(self, conn, client, headers, rng):
+        self.conn = conn
+        self.client = client
+        self.headers = headers
+        self.rng = rng
+        self.cursor = conn.cursor()
+        self.cursor.execute("SELECT id FROM tickets WHERE status <> 'completed' ORDER BY id DESC LIMIT 500")
+        self.open_ids = [row['id'] for row in self.cursor.fetchall()]
+        self.type_names = [row['name'] for row in self._fetch(TICKET_TYPES_SQL)]
+        self.conn.rollback()
+
+    def _fetch(self, query, params=None):
+        self.cursor.execute(query, params)
+        return self.cursor.fetchall()
+
+    def query(self, query, params=None):
+        def run():
+            self._fetch(query, params)
+        return run
+
+    def in_savepoint(self, statement, replica=False):
+        """Mede `statement(cursor)` dentro de um SAVEPOINT desfeito em seguida"""
+        if replica:
+            # Sem triggers (nem checagem de FK) até o fim da transação
+            self.cursor.execute("SET LOCAL session_replication_role = replica")
+
+        def run():
+            self.cursor.execute("SAVEPOINT bench")
+            started = time.perf_counter()
+            statement(self.cursor)
+            elapsed = time.perf_counter() - started
+            self.cursor.execute("ROLLBACK TO SAVEPOINT bench")
+            return elapsed
+        return run
+
+
+@benchmark('auth_plain_route', 'auth')
+def bench_auth_plain(ctx):
+    return lambda: ctx.client.get('/__bench/plain')
+
+
+@benchmark('auth_token_required', 'auth')
+def bench_auth_warm(ctx):
+    return lambda: ctx.client.get('/__bench/auth', headers=ctx.headers)
+
+
+@benchmark('auth_token_required_cold', 'auth')
+def bench_auth_cold(ctx):
+    def run():
+        user_cache.invalidate()
+        token_cache.invalidate()
+        ctx.client.get('/__bench/auth', headers=ctx.headers)
+    return run
+
+
+@benchmark('tickets_serialize_page', 'tickets')
+def bench_serialize(ctx):
+    query, params, _ = build_listing_query({'limit': str(MAX_PAGE_SIZE)})
+    rows = ctx._fetch(query, params)
+    ctx.conn.rollback()
+    return lambda: app.json.dumps(rows)
+
+
+@benchmark('tickets_listing_page', 'tickets')
+def bench_listing_page(ctx):
+    query, params, _ = build_listing_query({'limit': '100'})
+    return ctx.query(query, params)
+
+
+@benchmark('tickets_listing_filtered', 'tickets')
+def bench_listing_filtered(ctx):
+    query, params, _ = build_listing_query({'status': 'pending,in_progress', 'urgency': 'high', 'limit': '100'})
+    return ctx.query(query, params)
+
+
+@benchmark('get_tickets_route', 'tickets')
+def bench_get_tickets(ctx):
+    return lambda: ctx.client.get('/api/tickets/?limit=100', headers=ctx.headers)
+
+
+@benchmark('stats_aggregate_query', 'stats')
+def bench_stats_aggregate(ctx):
+    return ctx.query(AGGREGATE_STATS_SQL)
+
+
+@benchmark('stats_completed_today_query', 'stats')
+def bench_stats_completed(ctx):
+    return ctx.query(COMPLETED_TODAY_SQL)
+
+
+@benchmark('stats_ticket_types_query', 'stats')
+def bench_stats_types(ctx):
+    return ctx.query(TICKET_TYPES_SQL)
+
+
+@benchmark('stats_version_query', 'stats')
+def bench_stats_version(ctx):
+    return ctx.query(TICKETS_VERSION_SQL)
+
+
+@benchmark('get_dashboard_stats_uncached', 'stats')
+def bench_dashboard_route(ctx):
+    def run():
+        stats_cache.invalidate()
+        ctx.client.get('/api/stats/dashboard', headers=ctx.headers)
+    return run
+
+
+def _create(ctx, query=INSERT_TICKET_SQL):
+    def statement(cursor):
+        type_id = ticket_type_catalog.get_type_id(ctx.rng.choice(ctx.type_names), cursor)
+        cursor.execute(query, (
+            type_id, 'Benchmark', 'Ticket criado pelo benchmark', 'Benchmark',
+            'benchmark@empresa.com', ctx.rng.choice(('low', 'medium', 'high')), 'benchmark',
+        ))
+        cursor.fetchone()
+    return statement
+
+
+def _update(ctx, data):
+    def statement(cursor):
+        ticket_id = ctx.rng.choice(ctx.open_ids)
+        created_at = fetch_ticket_created_at(cursor, ticket_id)
+        cursor.execute(*build_update_query(data(), 'benchmark', ticket_id, created_at))
+        cursor.fetchone()
+    return statement
+
+
+@benchmark('create_ticket', 'writes')
+def bench_create(ctx):
+    return ctx.in_savepoint(_create(ctx))
+
+
+@benchmark('create_ticket_without_triggers', 'triggers')
+def bench_create_replica(ctx):
+    return ctx.in_savepoint(_create(ctx, INSERT_NUMBERED_TICKET_SQL), replica=True)
+
+
+@benchmark('update_ticket_urgency', 'writes')
+def bench_update(ctx):
+    return ctx.in_savepoint(_update(ctx, lambda: {'urgency': ctx.rng.choice(('low', 'medium', 'high'))}))
+
+
+@benchmark('update_ticket_urgency_without_triggers', 'triggers')
+def bench_update_replica(ctx):
+    return ctx.in_savepoint(_update(ctx, lambda: {'urgency': ctx.rng.choice(('low', 'medium', 'high'))}), replica=True)
+
+
+@benchmark('update_ticket_complete', 'writes')
+def bench_complete(ctx):
+    return ctx.in_savepoint(_update(ctx, lambda: {'status': 'completed'}))
+
+
+# Diferenças entre medianas, calculadas depois das medições
+DERIVED = {
+    'token_required_overhead': ('auth_token_required', 'auth_plain_route'),
+    'token_required_cold_overhead': ('auth_token_required_cold', 'auth_plain_route'),
+    'trigger_cost_per_insert': ('create_ticket', 'create_ticket_without_triggers'),
+    'trigger_cost_per_update': ('update_ticket_urgency', 'update_ticket_urgency_without_triggers'),
+}
+
+
+def register_bench_routes():
+    """Rotas mínimas para isolar o custo de token_required"""
+
+    def plain():
+        return jsonify({'ok': True})
+
+    @token_required
+    def authenticated(current_user):
+        return jsonify({'ok': True})
+
+    app.add_url_rule('/__bench/plain', 'bench_plain', plain)
+    app.add_url_rule('/__bench/auth', 'bench_auth', authenticated)
+
+
+def auth_headers():
+    user = User.query.filter_by(is_active=True).order_by(User.id).first()
+    if user is None:
+        raise SystemExit("❌ Nenhum usuário ativo no SQLite: crie o admin antes (ver README)")
+    token = jwt.encode({
+        'user_id': user.id,
+        'username': user.username,
+        'role': user.role,
+        'exp': datetime.now(timezone.utc).timestamp() + 3600,
+    }, app.config['SECRET_KEY'], algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+def measure(func, min_time, max_iterations):
+    for _ in range(WARMUP):
+        func()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_iterations:
+        started = time.perf_counter()
+        elapsed = func()
+        samples.append(elapsed if isinstance(elapsed, float) else time.perf_counter() - started)
+        if len(samples) >= MIN_ITERATIONS and time.perf_counter() >= deadline:
+            break
+    samples.sort()
+    return {
+        'median_ms': round(samples[len(samples) // 2] * 1000, 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+        'min_ms': round(samples[0] * 1000, 4),
+        'iterations': len(samples),
+    }
+
+
+def seed(size, args):
+    print(f"\n🌱 Semeando {size:,} tickets (seed {args.seed})...")
+    subprocess.run([sys.executable, os.path.join(ROOT, 'generate_dataset.py'), '--tickets', str(size),
+                    '--seed', str(args.seed), '--reset'], check=True)
+    # Caches do processo apontam para a base anterior
+    stats_cache.invalidate()
+    ticket_type_catalog.invalidate()
+
+
+def run_size(size, args, client, headers):
+    results = {}
+    with get_postgres_connection() as conn:
+        ctx = Context(conn, client, headers, random.Random(args.seed))
+        for name, group, setup in BENCHMARKS:
+            if args.only and args.only not in name and args.only != group:
+                continue
+            try:
+                func = setup(ctx)
+                results[name] = measure(func, args.min_time, args.max_iterations)
+            except Exception as e:
+                print(f"   ⚠️  {name}: {e}")
+                conn.rollback()
+                continue
+            finally:
+                # Cada benchmark começa em uma transação limpa
+                if not conn.closed:
+                    conn.rollback()
+            print(f"   {name:<42}{results[name]['median_ms']:>10.3f} ms  (p95 {results[name]['p95_ms']:.3f}, "
+                  f"{results[name]['iterations']} iterações)")
+
+    for name, (total, base) in DERIVED.items():
+        if total in results and base in results:
+            results[name] = {
+                'median_ms': round(results[total]['median_ms'] - results[base]['median_ms'], 4),
+                'derived': True,
+            }
+            print(f"   {name:<42}{results[name]['median_ms']:>10.3f} ms  (diferença de medianas)")
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Lista de (chave, baseline, atual, variação) acima da tolerância"""
+    regressions = []
+    print(f"\n📊 Comparação com a baseline ({baseline['meta'].get('git_commit')}, "
+          f"tolerância {tolerance * 100:.0f}%)")
+    for key, current in results.items():
+        previous = baseline['results'].get(key)
+        if previous is None:
+            continue
+        old, new = previous['median_ms'], current['median_ms']
+        change = (new - old) / old if old > 0 else 0.0
+        regressed = old > 0 and change > tolerance and new - old > min_delta_ms
+        marker = '⚠️  regressão' if regressed else ''
+        print(f"   {key:<50}{old:>10.3f} →{new:>10.3f} ms {change * 100:+7.1f}% {marker}")
+        if regressed:
+            regressions.append((key, old, new, change))
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=ROOT).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks das rotas e consultas')
+    parser.add_argument('--sizes', default='10000,100000', help='tamanhos da base, separados por vírgula')
+    parser.add_argument('--seed', type=int, default=7, help='seed do generate_dataset.py')
+    parser.add_argument('--skip-seed', action='store_true', help='usa a base atual (um único tamanho)')
+    parser.add_argument('--only', help='nome (ou parte) de benchmark, ou grupo: auth, tickets, stats, writes, triggers')
+    parser.add_argument('--min-time', type=float, default=1.0, help='segundos mínimos por benchmark')
+    parser.add_argument('--max-iterations', type=int, default=500)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='grava os resultados como baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='aumento relativo tolerado da mediana')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help='aumento absoluto mínimo para regressão')
+    parser.add_argument('--output', help='grava os resultados desta execução em JSON')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    if args.skip_seed and len(sizes) > 1:
+        parser.error('--skip-seed mede a base atual: informe um único tamanho em --sizes')
+
+    register_bench_routes()
+    client = app.test_client()
+    with app.app_context():
+        headers = auth_headers()
+
+        results = {}
+        for size in sizes:
+            if not args.skip_seed:
+                seed(size, args)
+            print(f"\n⏱️  Base com {size:,} tickets")
+            for name, result in run_size(size, args, client, headers).items():
+                results[f'{size}:{name}'] = result
+
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'sizes': sizes,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline gravada em {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️  Sem baseline em {args.baseline}: rode com --save-baseline para criar")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressão(ões) acima de {args.tolerance * 100:.0f}%")
+        sys.exit(1)
+    print("\n✅ Nenhuma regressão")
+
+
+if __name__ == "__main__":
+    main()
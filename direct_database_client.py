@@ -7,8 +7,24 @@ Cria tickets diretamente no banco, sem passar pela API
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
+import csv
+import io
+import json
+import sys
+import time
 import uuid
 
+from src.utils.ticket_limits import VALID_STATUSES, VALID_URGENCIES, MAX_FIELD_LENGTHS
+
+# Colunas aceitas na importação em massa (além das obrigatórias)
+IMPORT_REQUIRED_FIELDS = ('type', 'title', 'description', 'requester')
+IMPORT_STAGING_COLUMNS = (
+    'line_no', 'type_name', 'title', 'description', 'requester', 'requester_email',
+    'urgency', 'status', 'assigned_to', 'resolution', 'created_by', 'created_at', 'completed_at'
+)
+# Limites da API mais as colunas VARCHAR que só a importação preenche (ver tickets_import_staging)
+IMPORT_MAX_FIELD_LENGTHS = {**MAX_FIELD_LENGTHS, 'type': 100, 'assigned_to': 100, 'created_by': 100}
+
 class DirectDatabaseClient:
     def __init__(self, host, port, database, user, password):
         """
@@ -27,6 +43,7 @@ class DirectDatabaseClient:
         self.user = user
         self.password = password
         self.conn = None
+        self._type_ids = None  # cache nome -> id de ticket_types
     
     def connect(self):
         """Conecta ao banco de dados"""
@@ -82,6 +99,13 @@ class DirectDatabaseClient:
             print(f"❌ Erro ao buscar tipos: {e}")
             return []
     
+    def _get_type_id(self, cursor, type_name):
+        """Resolve o nome do tipo para id usando o cache (recarrega se não achar)"""
+        if self._type_ids is None or type_name not in self._type_ids:
+            cursor.execute("SELECT id, name FROM ticket_types")
+            self._type_ids = {row['name']: row['id'] for row in cursor.fetchall()}
+        return self._type_ids.get(type_name)
+    
     def create_ticket_direct(self, ticket_data):
         """
         Cria ticket diretamente no banco
@@ -103,17 +127,14 @@ class DirectDatabaseClient:
         try:
             cursor = self.conn.cursor()
             
-            # 1. Buscar ID do tipo
-            cursor.execute("SELECT id FROM ticket_types WHERE name = %s", (ticket_data['type'],))
-            type_result = cursor.fetchone()
+            # 1. Buscar ID do tipo (cache em memória)
+            type_id = self._get_type_id(cursor, ticket_data['type'])
             
-            if not type_result:
+            if type_id is None:
                 print(f"❌ Erro: Tipo '{ticket_data['type']}' não encontrado")
                 cursor.close()
                 return None
             
-            type_id = type_result['id']
-            
             # 2. Inserir ticket (o trigger vai gerar o ticket_number automaticamente)
             insert_query = """
                 INSERT INTO tickets (
@@ -157,6 +178,255 @@ class DirectDatabaseClient:
                 self.conn.rollback()
             return None
     
+    def _read_import_records(self, source, file_format):
+        """
+        Gera (número da linha, registro ou None, erro) sem carregar o arquivo inteiro
+        
+        source pode ser um caminho de arquivo ou um iterável de dicionários
+        """
+        if not isinstance(source, str):
+            for line_no, record in enumerate(source, 1):
+                yield line_no, record, None
+            return
+        
+        with open(source, newline='', encoding='utf-8') as f:
+            if file_format == 'csv':
+                # Linha 1 é o cabeçalho
+                for line_no, record in enumerate(csv.DictReader(f), 2):
+                    yield line_no, record, None
+            else:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_no, json.loads(line), None
+                    except json.JSONDecodeError as e:
+                        yield line_no, None, f'JSON inválido: {e}'
+    
+    def _validate_import_record(self, record):
+        """Retorna a mensagem de erro do registro ou None"""
+        if not isinstance(record, dict):
+            return 'Registro deve ser um objeto'
+        
+        missing = [f for f in IMPORT_REQUIRED_FIELDS if not record.get(f)]
+        if missing:
+            return f"Campos obrigatórios ausentes: {', '.join(missing)}"
+        
+        if (record.get('urgency') or 'medium') not in VALID_URGENCIES:
+            return f"Urgência inválida: {record.get('urgency')}"
+        
+        if (record.get('status') or 'pending') not in VALID_STATUSES:
+            return f"Status inválido: {record.get('status')}"
+        
+        # Valor longo demais abortaria o COPY do lote inteiro
+        for field, max_length in IMPORT_MAX_FIELD_LENGTHS.items():
+            value = record.get(field)
+            if value is not None and len(str(value)) > max_length:
+                return f'{field} excede {max_length} caracteres'
+        
+        for field in ('created_at', 'completed_at'):
+            if record.get(field):
+                try:
+                    datetime.fromisoformat(str(record[field]))
+                except ValueError:
+                    return f'Data inválida em {field}: {record[field]}'
+        
+        return None
+    
+    def _ensure_import_partitions(self, cursor, created_at_values):
+        """
+        Cria as partições mensais das datas históricas do lote (senão as linhas
+        caem na default) numa transação própria, confirmada antes da carga:
+        anexar uma partição trava tickets em ACCESS EXCLUSIVE até o COMMIT
+        """
+        if not created_at_values:
+            return
+        cursor.execute("""
+            SELECT ensure_ticket_partitions(MIN(value), MAX(value))
+            FROM unnest(%s::TIMESTAMP[]) AS value
+        """, (created_at_values,))
+        self.conn.commit()
+    
+    def _copy_import_batch(self, cursor, buffer):
+        """Envia um lote ao staging via COPY e move para tickets em um único INSERT"""
+        buffer.seek(0)
+        cursor.execute("TRUNCATE tickets_import_staging")
+        cursor.copy_expert(
+            f"COPY tickets_import_staging ({', '.join(IMPORT_STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        
+        # Tipos desconhecidos são resolvidos em lote pelo JOIN e voltam como rejeitados
+        cursor.execute("""
+            SELECT s.line_no, s.type_name
+            FROM tickets_import_staging s
+            LEFT JOIN ticket_types tt ON tt.name = s.type_name
+            WHERE tt.id IS NULL
+        """)
+        unknown_types = cursor.fetchall()
+        
+        cursor.execute("""
+            INSERT INTO tickets (
+                type_id, title, description, requester, requester_email, urgency, status,
+                assigned_to, resolution, created_by, created_at, completed_at
+            )
+            SELECT
+                tt.id, s.title, s.description, s.requester, COALESCE(s.requester_email, ''),
+                COALESCE(s.urgency, 'medium'), COALESCE(s.status, 'pending'),
+                s.assigned_to, s.resolution, s.created_by,
+                COALESCE(s.created_at, CURRENT_TIMESTAMP), s.completed_at
+            FROM tickets_import_staging s
+            JOIN ticket_types tt ON tt.name = s.type_name
+            ORDER BY s.line_no
+        """)
+        imported = cursor.rowcount
+        self.conn.commit()
+        
+        return imported, unknown_types
+    
+    def import_tickets(self, source, file_format='ndjson', reject_path=None,
+                       batch_size=10000, created_by='import'):
+        """
+        Importa tickets em massa via COPY FROM STDIN (para migrações de outros helpdesks)
+        
+        Os registros são lidos em streaming e enviados em lotes de `batch_size`
+        para uma tabela temporária; cada lote vira um único INSERT ... SELECT
+        em tickets (triggers de número, histórico e contadores continuam valendo).
+        
+        Args:
+            source: Caminho de arquivo CSV/NDJSON ou iterável de dicionários
+            file_format: 'csv' ou 'ndjson' (ignorado para iteráveis)
+            reject_path: Arquivo NDJSON para registros rejeitados (linha, motivo, registro)
+            batch_size: Registros por lote (limita a memória usada)
+            created_by: Valor padrão de created_by
+        
+        Campos: type, title, description, requester (obrigatórios), requester_email,
+        urgency, status, assigned_to, resolution, created_by, created_at, completed_at
+        
+        Returns:
+            Dicionário com imported, rejected, seconds e rows_per_second
+        """
+        if not self.conn:
+            print("❌ Erro: Conecte ao banco primeiro")
+            return None
+        
+        if file_format not in ('csv', 'ndjson'):
+            raise ValueError("file_format deve ser 'csv' ou 'ndjson'")
+        
+        imported = 0
+        rejected = 0
+        started = time.monotonic()
+        reject_file = None
+        
+        def reject(line_no, reason, record):
+            nonlocal reject_file, rejected
+            rejected += 1
+            if reject_path:
+                if reject_file is None:
+                    reject_file = open(reject_path, 'w', encoding='utf-8')
+                reject_file.write(json.dumps(
+                    {'line': line_no, 'reason': reason, 'record': record},
+                    ensure_ascii=False, default=str
+                ) + '\n')
+        
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS tickets_import_staging (
+                    line_no BIGINT,
+                    type_name VARCHAR(100),
+                    title VARCHAR(255),
+                    description TEXT,
+                    requester VARCHAR(255),
+                    requester_email VARCHAR(255),
+                    urgency VARCHAR(20),
+                    status VARCHAR(20),
+                    assigned_to VARCHAR(100),
+                    resolution TEXT,
+                    created_by VARCHAR(100),
+                    created_at TIMESTAMP,
+                    completed_at TIMESTAMP
+                )
+            """)
+            
+            pending_records = {}
+            pending_created_at = []
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            
+            def flush():
+                nonlocal imported, buffer, writer
+                if not pending_records:
+                    return
+                self._ensure_import_partitions(cursor, pending_created_at)
+                batch_imported, unknown_types = self._copy_import_batch(cursor, buffer)
+                imported += batch_imported
+                for row in unknown_types:
+                    reject(row['line_no'], f"Tipo '{row['type_name']}' não encontrado",
+                           pending_records[row['line_no']])
+                pending_records.clear()
+                pending_created_at.clear()
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                
+                elapsed = time.monotonic() - started
+                print(f"📦 {imported} importados, {rejected} rejeitados "
+                      f"({imported / elapsed if elapsed else 0:.0f} linhas/s)")
+            
+            for line_no, record, error in self._read_import_records(source, file_format):
+                if error is None:
+                    error = self._validate_import_record(record)
+                if error:
+                    reject(line_no, error, record)
+                    continue
+                
+                # Campo vazio sem aspas no CSV do COPY vira NULL
+                writer.writerow([
+                    line_no,
+                    record['type'],
+                    record['title'],
+                    record['description'],
+                    record['requester'],
+                    record.get('requester_email') or None,
+                    record.get('urgency') or None,
+                    record.get('status') or None,
+                    record.get('assigned_to') or None,
+                    record.get('resolution') or None,
+                    record.get('created_by') or created_by,
+                    record.get('created_at') or None,
+                    record.get('completed_at') or None,
+                ])
+                pending_records[line_no] = record
+                if record.get('created_at'):
+                    pending_created_at.append(str(record['created_at']))
+                
+                if len(pending_records) >= batch_size:
+                    flush()
+            
+            flush()
+            cursor.close()
+            
+        except Exception as e:
+            print(f"❌ Erro na importação: {e}")
+            self.conn.rollback()
+            raise
+        finally:
+            if reject_file:
+                reject_file.close()
+        
+        elapsed = time.monotonic() - started
+        summary = {
+            'imported': imported,
+            'rejected': rejected,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(imported / elapsed, 1) if elapsed else None,
+        }
+        print(f"✅ Importação concluída: {imported} tickets em {summary['seconds']}s "
+              f"({summary['rows_per_second']} linhas/s), {rejected} rejeitados")
+        if rejected and reject_path:
+            print(f"   Rejeitados gravados em {reject_path}")
+        return summary
+    
     def get_tickets(self, limit=10):
         """Lista tickets do banco"""
         if not self.conn:
@@ -216,6 +486,14 @@ def main():
         return
     
     try:
+        # Importação em massa: python direct_database_client.py importar arquivo.(csv|ndjson) [rejeitados.ndjson]
+        if len(sys.argv) >= 3 and sys.argv[1] == 'importar':
+            path = sys.argv[2]
+            file_format = 'csv' if path.lower().endswith('.csv') else 'ndjson'
+            reject_path = sys.argv[3] if len(sys.argv) > 3 else path + '.rejeitados.ndjson'
+            client.import_tickets(path, file_format=file_format, reject_path=reject_path)
+            return
+        
         # Buscar tipos disponíveis
         client.get_ticket_types()
         
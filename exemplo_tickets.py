@@ -46,6 +46,33 @@ def create_ticket(token, ticket_data):
         print(f"❌ Erro: {response.json()}")
         return None
 
+def create_tickets_bulk(token, tickets):
+    """Cria vários tickets em uma única requisição"""
+    headers = {
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/json'
+    }
+    
+    response = requests.post(
+        f"{API_URL}/api/tickets/bulk",
+        json=tickets,
+        headers=headers
+    )
+    
+    data = response.json()
+    if 'results' not in data:
+        print(f"❌ Erro: {data}")
+        return []
+    
+    for item in data['results']:
+        if item['status'] == 'created':
+            ticket = item['ticket']
+            print(f"✅ Ticket criado: #{ticket.get('ticket_number')} - {ticket.get('title')}")
+        else:
+            print(f"❌ Erro no item {item['index']}: {item['message']}")
+    
+    return data['results']
+
 def main():
     # Obter token
     token = get_auth_token()
@@ -63,7 +90,6 @@ def main():
         "requester_email": "ana@empresa.com",
         "urgency": "high"
     }
-    create_ticket(token, ticket1)
     
     # Exemplo 2: Problema de Software
     ticket2 = {
@@ -74,7 +100,6 @@ def main():
         "requester_email": "carlos@empresa.com",
         "urgency": "medium"
     }
-    create_ticket(token, ticket2)
     
     # Exemplo 3: Problema de Rede
     ticket3 = {
@@ -85,7 +110,6 @@ def main():
         "requester_email": "maria@empresa.com",
         "urgency": "medium"
     }
-    create_ticket(token, ticket3)
     
     # Exemplo 4: Problema de Impressora
     ticket4 = {
@@ -96,7 +120,6 @@ def main():
         "requester_email": "joao@empresa.com",
         "urgency": "low"
     }
-    create_ticket(token, ticket4)
     
     # Exemplo 5: Problema de Email
     ticket5 = {
@@ -107,9 +130,11 @@ def main():
         "requester_email": "pedro@empresa.com",
         "urgency": "medium"
     }
-    create_ticket(token, ticket5)
     
-    print(f"\n🎉 Todos os tickets de exemplo foram criados!")
+    # Enviar todos em uma única requisição
+    create_tickets_bulk(token, [ticket1, ticket2, ticket3, ticket4, ticket5])
+    
+    print(f"\n🎉 Todos os tickets de exemplo foram enviados!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -109,6 +109,53 @@ class ExternalTicketAPI:
             print(f"❌ Erro na requisição: {e}")
             return None
     
+    def create_tickets_bulk(self, tickets, chunk_size=500):
+        """
+        Cria vários tickets via POST /api/tickets/bulk
+        
+        Args:
+            tickets: Lista de dicionários no mesmo formato de create_ticket
+            chunk_size: Quantidade de tickets enviada por requisição
+        
+        Returns:
+            Lista de resultados por item (status 'created' ou 'error')
+        """
+        if not self.token:
+            print("❌ Erro: Faça login primeiro")
+            return []
+        
+        results = []
+        for start in range(0, len(tickets), chunk_size):
+            chunk = tickets[start:start + chunk_size]
+            try:
+                response = self.session.post(
+                    f"{self.server_url}/api/tickets/bulk",
+                    json=chunk,
+                    timeout=120
+                )
+                
+                data = response.json()
+                if response.status_code not in (201, 207, 400) or 'results' not in data:
+                    print(f"❌ Erro ao criar tickets: {data.get('message', 'Erro desconhecido')}")
+                    results.extend({'index': start + i, 'status': 'error', 'message': data.get('message')} for i in range(len(chunk)))
+                    continue
+                
+                for item in data['results']:
+                    item['index'] += start
+                    results.append(item)
+                    
+            except Exception as e:
+                print(f"❌ Erro na requisição: {e}")
+                results.extend({'index': start + i, 'status': 'error', 'message': str(e)} for i in range(len(chunk)))
+        
+        created = sum(1 for r in results if r['status'] == 'created')
+        print(f"✅ {created} de {len(tickets)} tickets criados")
+        for item in results:
+            if item['status'] == 'error':
+                print(f"   ❌ Item {item['index']}: {item.get('message')}")
+        
+        return results
+    
     def get_ticket_types(self):
         """Busca tipos de tickets disponíveis"""
         if not self.token:
@@ -14,6 +14,10 @@ interface Ticket {
   completedAt?: string;
 }
 
+// Espera entre tentativas de reabrir o stream: dobra a cada falha até o teto
+const STREAM_RETRY_BASE_MS = 15000;
+const STREAM_RETRY_MAX_MS = 300000;
+
 interface DashboardProps {
   onLogout: () => void;
 }
@@ -25,6 +29,36 @@ export default function Dashboard({ onLogout }: DashboardProps) {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
+  const fetchStats = async (token: string) => {
+    const statsResponse = await fetch("/api/stats/dashboard", {
+      headers: {
+        Authorization: `Bearer ${token}`,
+      },
+    });
+    if (!statsResponse.ok) {
+      throw new Error("Falha ao buscar estatísticas");
+    }
+    const statsData = await statsResponse.json();
+    setStats(statsData);
+  };
+
+  // Substitui (ou insere no topo) um ticket na lista sem recarregar tudo
+  const upsertTicket = (ticket: Ticket) => {
+    setTickets((current) => {
+      const exists = current.some((t) => String(t.id) === String(ticket.id));
+      return exists
+        ? current.map((t) => (String(t.id) === String(ticket.id) ? ticket : t))
+        : [ticket, ...current];
+    });
+  };
+
+  const refreshStats = () => {
+    const token = localStorage.getItem("token");
+    if (token) {
+      fetchStats(token).catch((err) => console.error("Erro ao buscar estatísticas:", err));
+    }
+  };
+
   const fetchTicketsAndStats = async () => {
     setLoading(true);
     setError(null);
@@ -46,16 +80,7 @@ export default function Dashboard({ onLogout }: DashboardProps) {
       const ticketsData = await ticketsResponse.json();
       setTickets(ticketsData);
 
-      const statsResponse = await fetch("/api/stats/dashboard", {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
-      if (!statsResponse.ok) {
-        throw new Error("Falha ao buscar estatísticas");
-      }
-      const statsData = await statsResponse.json();
-      setStats(statsData);
+      await fetchStats(token);
 
     } catch (err: any) {
       setError(err.message);
@@ -70,6 +95,82 @@ export default function Dashboard({ onLogout }: DashboardProps) {
     fetchTicketsAndStats();
   }, []);
 
+  // Mudanças feitas por outros agentes chegam via Server-Sent Events
+  useEffect(() => {
+    const token = localStorage.getItem("token");
+    if (!token) {
+      return;
+    }
+
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+    let attempts = 0;
+    let missedEvents = false;
+
+    // Sem stream (ex.: 503 no limite de streams) tenta de novo com espera
+    // exponencial e aleatória, para os dashboards recusados não voltarem
+    // todos juntos; a lista só é recarregada quando a conexão volta
+    const scheduleReconnect = () => {
+      missedEvents = true;
+      const delay = Math.min(STREAM_RETRY_MAX_MS, STREAM_RETRY_BASE_MS * 2 ** attempts);
+      attempts += 1;
+      retryTimer = setTimeout(connect, delay * (0.5 + Math.random()));
+    };
+
+    // A query string vai para o access log: o stream usa um ticket de curta
+    // duração, não o token de login
+    const connect = async () => {
+      const response = await fetch("/api/auth/stream-ticket", {
+        method: "POST",
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      }).catch(() => null);
+      if (closed) {
+        return;
+      }
+      if (!response?.ok) {
+        scheduleReconnect();
+        return;
+      }
+      const { ticket } = await response.json();
+      source = new EventSource(`/api/tickets/stream?ticket=${encodeURIComponent(ticket)}`);
+      source.addEventListener("open", () => {
+        attempts = 0;
+        if (missedEvents) {
+          missedEvents = false;
+          fetchTicketsAndStats();
+        }
+      });
+      source.addEventListener("ticket", (message) => {
+        const event = JSON.parse((message as MessageEvent).data);
+        if (event.kind === "deleted") {
+          setTickets((current) => current.filter((t) => String(t.id) !== String(event.id)));
+        } else {
+          upsertTicket(event.ticket);
+        }
+        refreshStats();
+      });
+      // O servidor pede recarga completa quando eventos podem ter sido perdidos
+      source.addEventListener("resync", () => fetchTicketsAndStats());
+      // Respostas diferentes de 200 (ex.: 503 no limite de streams) encerram o
+      // EventSource sem reconexão automática
+      source.addEventListener("error", () => {
+        if (source?.readyState === EventSource.CLOSED) {
+          scheduleReconnect();
+        }
+      });
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, []);
+
   const today = new Date().toLocaleDateString("pt-BR", {
     weekday: "long",
     year: "numeric",
@@ -101,7 +202,8 @@ export default function Dashboard({ onLogout }: DashboardProps) {
       if (!response.ok) {
         throw new Error("Falha ao finalizar ticket");
       }
-      fetchTicketsAndStats(); // Recarrega os dados após a atualização
+      upsertTicket(await response.json()); // Atualiza só o ticket alterado
+      refreshStats();
     } catch (error) {
       console.error("Erro ao finalizar ticket:", error);
       alert("Erro ao finalizar ticket.");
@@ -126,7 +228,8 @@ export default function Dashboard({ onLogout }: DashboardProps) {
       if (!response.ok) {
         throw new Error("Falha ao atualizar urgência");
       }
-      fetchTicketsAndStats(); // Recarrega os dados após a atualização
+      upsertTicket(await response.json()); // Atualiza só o ticket alterado
+      refreshStats();
     } catch (error) {
       console.error("Erro ao atualizar urgência:", error);
       alert("Erro ao atualizar urgência.");
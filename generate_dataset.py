@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Gerador de dados sintéticos para testes de escala
+Gera N tickets (1 mil a 10 milhões) com histórico e comentários e carrega
+tudo via COPY, em blocos paralelos
+
+Distribuições:
+    - abertura concentrada em dias úteis e horário comercial, com volume
+      crescendo ao longo do período
+    - tipos, urgências e solicitantes com frequências desiguais (poucos
+      solicitantes abrem muitos tickets)
+    - tempo de resolução log-normal por urgência, com uma cauda de tickets
+      esquecidos: os antigos estão quase todos finalizados, os recentes
+      ainda pendentes ou em andamento
+    - ticket_history com as mesmas linhas que log_ticket_changes gravaria
+      (criação, troca de urgência, atribuição, mudanças de status)
+    - 0 a 5 comentários por ticket, parte deles internos
+
+O resultado é determinístico para a mesma --seed, --tickets e --end,
+qualquer que seja o número de processos (cada bloco tem seu próprio gerador
+aleatório). IDs de histórico e comentários seguem a ordem de carga.
+
+Durante a carga os triggers de tickets ficam desligados na sessão de cada
+processo (session_replication_role = replica, exige superusuário), exceto
+trigger_claim_ticket_number (ENABLE ALWAYS), que registra cada número em
+ticket_numbers e rejeita repetidos; ao final
+o script ajusta sequências e ticket_number_counters, reconstrói
+ticket_counters e preenche ticket_search. As partições mensais do período
+são criadas antes da carga. Use em bancos de teste, sem escritas
+concorrentes.
+
+Uso:
+    python generate_dataset.py --tickets 100000
+    python generate_dataset.py --tickets 10000000 --workers 8 --reset --seed 42
+    python generate_dataset.py --tickets 1000000 --dry-run     # só mede a geração
+
+Conexão pelas mesmas variáveis do app (POSTGRES_HOST, POSTGRES_PORT,
+POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD).
+"""
+
+import argparse
+import csv
+import io
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+import unicodedata
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+import psycopg2
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.postgres_connection import connection_kwargs
+
+# Tickets por bloco: unidade de geração, de COPY e de commit
+BLOCK_SIZE = 10_000
+
+TICKET_COLUMNS = (
+    'id', 'ticket_number', 'type_id', 'title', 'description', 'requester', 'requester_email',
+    'urgency', 'status', 'priority', 'assigned_to', 'created_at', 'updated_at', 'completed_at',
+    'created_by', 'updated_by', 'estimated_hours', 'actual_hours', 'resolution', 'tags'
+)
+HISTORY_COLUMNS = ('ticket_id', 'action', 'field_name', 'old_value', 'new_value', 'changed_by', 'changed_at', 'notes')
+COMMENT_COLUMNS = ('ticket_id', 'comment', 'created_by', 'created_at', 'is_internal')
+
+# Peso relativo de cada tipo padrão (tipos criados depois recebem peso 3)
+TYPE_WEIGHTS = {
+    'Software': 25, 'Hardware': 18, 'Acesso': 14, 'Rede': 12, 'Email': 9,
+    'Impressora': 8, 'Sistema': 6, 'Outros': 4, 'Telefonia': 3, 'Backup': 2,
+}
+
+URGENCIES = ('low', 'medium', 'high')
+URGENCY_WEIGHTS = tuple(accumulate((35, 45, 20)))
+PRIORITY_BY_URGENCY = {'low': (4, 5), 'medium': (3, 3), 'high': (1, 2)}
+# Mediana (horas) do tempo de resolução e estimativa por urgência
+RESOLUTION_MEDIAN_HOURS = {'low': 80.0, 'medium': 30.0, 'high': 6.0}
+# Fração de tickets esquecidos na fila (resolução muito mais lenta)
+STALE_FRACTION = 0.03
+STALE_FACTOR = 40
+ESTIMATED_HOURS = {'low': (1, 8), 'medium': (1, 16), 'high': (1, 24)}
+
+# Intensidade de abertura por dia da semana (segunda = 0) e hora do dia
+WEEKDAY_WEIGHTS = (1.0, 0.95, 0.95, 0.9, 0.8, 0.12, 0.06)
+HOUR_WEIGHTS = (0.02, 0.02, 0.02, 0.02, 0.02, 0.03, 0.08, 0.3, 0.8, 1.0, 1.0, 0.9,
+                0.5, 0.8, 1.0, 0.9, 0.8, 0.5, 0.2, 0.08, 0.05, 0.04, 0.03, 0.02)
+# Volume no fim do período em relação ao início
+GROWTH = 1.5
+
+FIRST_NAMES = ('Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique',
+               'Isabela', 'João', 'Juliana', 'Lucas', 'Mariana', 'Marcos', 'Natália', 'Otávio',
+               'Paula', 'Pedro', 'Rafaela', 'Rodrigo', 'Sofia', 'Thiago', 'Vanessa', 'Vinícius')
+LAST_NAMES = ('Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Almeida',
+              'Ferreira', 'Rodrigues', 'Gomes', 'Martins', 'Araújo', 'Barbosa', 'Ribeiro', 'Rocha')
+DEPARTMENTS = ('financeiro', 'RH', 'comercial', 'jurídico', 'marketing', 'logística',
+               'compras', 'recepção', 'diretoria', 'TI')
+CREATORS = (('integracao', 30), ('webhook', 25), ('admin', 15))
+
+TEMPLATES = {
+    'Hardware': [
+        ('Computador não liga', 'O computador do setor {dep} não liga desde {quando}. O LED da fonte acende mas não dá boot.'),
+        ('Monitor piscando', 'O monitor da estação {n} do setor {dep} fica piscando e às vezes apaga.'),
+        ('Teclado com teclas falhando', 'Algumas teclas do teclado não respondem desde {quando}.'),
+        ('Notebook superaquecendo', 'O notebook esquenta muito e desliga sozinho durante reuniões.'),
+    ],
+    'Software': [
+        ('Excel travando', 'O Excel trava ao abrir planilhas grandes do setor {dep} desde {quando}.'),
+        ('Erro ao instalar atualização', 'A atualização do sistema falha com erro {n} na estação do setor {dep}.'),
+        ('Aplicativo fechando sozinho', 'O aplicativo de gestão fecha sozinho ao gerar relatórios.'),
+        ('Licença expirada', 'O software de desenho informa que a licença expirou desde {quando}.'),
+    ],
+    'Rede': [
+        ('Internet lenta', 'A conexão com a internet está muito lenta no setor {dep} desde {quando}.'),
+        ('Sem acesso ao Wi-Fi', 'Os notebooks do setor {dep} não conectam na rede sem fio.'),
+        ('VPN desconectando', 'A VPN cai a cada poucos minutos ao trabalhar de casa.'),
+        ('Ponto de rede sem sinal', 'O ponto de rede {n} da sala do setor {dep} não funciona.'),
+    ],
+    'Sistema': [
+        ('Erro no sistema de vendas', 'O sistema de vendas apresenta erro {n} ao finalizar pedidos.'),
+        ('Windows não inicia', 'A estação do setor {dep} fica presa na tela de carregamento desde {quando}.'),
+        ('Lentidão no ERP', 'O ERP está muito lento para lançar notas no setor {dep}.'),
+    ],
+    'Impressora': [
+        ('Impressora não imprime colorido', 'A impressora do setor {dep} só imprime em preto e branco.'),
+        ('Papel atolando', 'A impressora do setor {dep} atola papel a cada poucas folhas.'),
+        ('Impressora offline', 'A impressora aparece offline para todos do setor {dep} desde {quando}.'),
+    ],
+    'Email': [
+        ('Outlook não sincroniza', 'O Outlook não recebe emails novos desde {quando}.'),
+        ('Caixa de email cheia', 'A caixa de email do setor {dep} atingiu o limite e não recebe mensagens.'),
+        ('Email caindo no spam', 'Emails enviados para clientes estão caindo na caixa de spam.'),
+    ],
+    'Telefonia': [
+        ('Ramal mudo', 'O ramal {n} do setor {dep} está sem tom de discagem.'),
+        ('Telefone VOIP reiniciando', 'O telefone VOIP reinicia sozinho durante as ligações.'),
+    ],
+    'Acesso': [
+        ('Senha bloqueada', 'Usuário do setor {dep} bloqueou a senha após várias tentativas {quando}.'),
+        ('Acesso à pasta compartilhada', 'Solicito acesso à pasta compartilhada do setor {dep}.'),
+        ('Criação de usuário', 'Novo colaborador do setor {dep} precisa de usuário e email.'),
+        ('Permissão no sistema', 'Preciso de permissão para aprovar pedidos no sistema do setor {dep}.'),
+    ],
+    'Backup': [
+        ('Arquivo apagado por engano', 'Um arquivo da pasta do setor {dep} foi apagado {quando} e precisa ser recuperado.'),
+        ('Falha no backup noturno', 'O backup noturno do servidor do setor {dep} falhou com erro {n}.'),
+    ],
+    'Outros': [
+        ('Dúvida geral', 'Dúvida sobre o uso dos equipamentos do setor {dep}.'),
+        ('Troca de equipamento', 'Solicito a troca do equipamento da estação {n}.'),
+    ],
+}
+TAGS = {
+    'Hardware': ('equipamento', 'garantia', 'troca'),
+    'Software': ('licenca', 'instalacao', 'atualizacao'),
+    'Rede': ('vpn', 'wifi', 'conectividade'),
+    'Acesso': ('senha', 'permissao', 'usuario'),
+    'Email': ('outlook', 'spam'),
+}
+WHEN = ('hoje cedo', 'ontem', 'segunda-feira', 'a última atualização', 'a queda de energia')
+RESOLUTIONS = (
+    'Problema resolvido após reinicialização e atualização de drivers.',
+    'Equipamento substituído e configurado.',
+    'Configuração corrigida remotamente.',
+    'Permissões ajustadas conforme solicitado.',
+    'Orientado o usuário; problema não se repetiu.',
+    'Encaminhado ao fornecedor, que aplicou a correção.',
+)
+COMMENTS_REQUESTER = (
+    'Alguma previsão de atendimento?',
+    'O problema voltou a acontecer hoje.',
+    'Obrigado, funcionou!',
+    'Segue print do erro em anexo.',
+)
+COMMENTS_AGENT = (
+    'Verificando o problema remotamente.',
+    'Aguardando peça do fornecedor.',
+    'Pode testar novamente, por favor?',
+    'Agendada visita técnica.',
+)
+COMMENTS_INTERNAL = (
+    'Possível problema no switch do andar.',
+    'Mesmo erro reportado por outros usuários do setor.',
+    'Escalado para o time de infraestrutura.',
+)
+COMMENT_COUNT_WEIGHTS = tuple(accumulate((35, 30, 17, 9, 6, 3)))  # 0 a 5 comentários
+
+# Tabelas dependentes listadas explicitamente: sem chaves estrangeiras para
+# tickets (particionada), o CASCADE não chega a elas
+RESET_SQL = """
+    TRUNCATE tickets, ticket_history, ticket_comments, ticket_attachments, ticket_search,
+             ticket_tombstones, ticket_counters, ticket_counter_totals, ticket_number_counters,
+             ticket_numbers
+    RESTART IDENTITY CASCADE
+"""
+
+# Mesma semeadura de init-db.sql: contadores por ano >= maior número existente
+SEED_NUMBER_COUNTERS_SQL = """
+    INSERT INTO ticket_number_counters (year_suffix, last_value)
+    SELECT SUBSTRING(ticket_number FROM 3 FOR 2), MAX(CAST(SUBSTRING(ticket_number FROM 5) AS INTEGER))
+    FROM tickets
+    WHERE ticket_number ~ '^TK[0-9]{3,}$'
+    GROUP BY SUBSTRING(ticket_number FROM 3 FOR 2)
+    ON CONFLICT (year_suffix)
+    DO UPDATE SET last_value = GREATEST(ticket_number_counters.last_value, EXCLUDED.last_value)
+"""
+
+SEARCH_BACKFILL_SQL = """
+    INSERT INTO ticket_search (ticket_id, created_at, document)
+    SELECT id, created_at, ticket_search_document(title, description, resolution)
+    FROM tickets
+    WHERE id BETWEEN %s AND %s
+    ON CONFLICT (ticket_id) DO NOTHING
+"""
+
+
+class Plan:
+    """Parâmetros compartilhados por todos os blocos (derivados só da seed e dos argumentos)"""
+
+    def __init__(self, seed, total, days, end, first_id, first_number, types):
+        self.seed = seed
+        self.total = total
+        self.end = end
+        self.start = end - timedelta(days=days)
+        self.first_id = first_id
+        self.first_number = first_number
+        self.type_ids = [type_id for type_id, _ in types]
+        self.type_names = [name for _, name in types]
+        self.type_weights = list(accumulate(TYPE_WEIGHTS.get(name, 3) for _, name in types))
+
+        rng = random.Random(f'{seed}:plan')
+        # Intensidade por hora do período; a posição (i + u) / N de cada ticket
+        # na curva acumulada dá o created_at, crescente com o id
+        day_noise = [rng.lognormvariate(0, 0.15) for _ in range(days)]
+        hours = days * 24
+        weights = []
+        for hour in range(hours):
+            day = self.start + timedelta(hours=hour)
+            trend = 1 + (GROWTH - 1) * hour / hours
+            weights.append(WEEKDAY_WEIGHTS[day.weekday()] * HOUR_WEIGHTS[day.hour] * day_noise[hour // 24] * trend)
+        self.hour_weights = weights
+        self.cumulative = list(accumulate(weights))
+
+        requesters = []
+        for i in range(max(200, min(total // 20, 50_000))):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            email = _ascii(f"{first.lower()}.{last.lower()}{i}@empresa.com")
+            requesters.append((f'{first} {last}', email))
+        self.requesters = requesters
+        self.agents = [_ascii(f"{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}{i}")
+                       for i in range(30)]
+        self.creators = [name for name, _ in CREATORS]
+        self.creator_weights = list(accumulate(weight for _, weight in CREATORS))
+        self.agent_creator_weight = 30  # restante: tickets abertos pelos próprios agentes
+
+    def created_at(self, index, u):
+        position = (index + u) / self.total * self.cumulative[-1]
+        hour = min(bisect_right(self.cumulative, position), len(self.cumulative) - 1)
+        before = self.cumulative[hour - 1] if hour else 0.0
+        fraction = (position - before) / self.hour_weights[hour] if self.hour_weights[hour] else 0.0
+        return self.start + timedelta(hours=hour + min(max(fraction, 0.0), 0.999999))
+
+
+def _ascii(value):
+    return unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode()
+
+
+def _timestamp(value):
+    return value.isoformat(sep=' ', timespec='seconds')
+
+
+def generate_block(plan, block):
+    """Gera as linhas (tickets, histórico, comentários) do bloco como CSV para COPY"""
+    rng = random.Random(f'{plan.seed}:{block}')
+    first = block * BLOCK_SIZE
+    last = min(first + BLOCK_SIZE, plan.total)
+
+    tickets, history, comments = io.StringIO(), io.StringIO(), io.StringIO()
+    ticket_rows, history_rows, comment_rows = csv.writer(tickets), csv.writer(history), csv.writer(comments)
+    counts = [0, 0, 0]
+    end = plan.end
+    creator_total = plan.creator_weights[-1] + plan.agent_creator_weight
+
+    for index in range(first, last):
+        ticket_id = plan.first_id + index
+        created = plan.created_at(index, rng.random())
+        type_index = bisect_right(plan.type_weights, rng.random() * plan.type_weights[-1])
+        type_name = plan.type_names[type_index]
+        urgency = URGENCIES[bisect_right(URGENCY_WEIGHTS, rng.random() * URGENCY_WEIGHTS[-1])]
+        # Solicitantes frequentes: índice concentrado no início da lista
+        requester, email = plan.requesters[int(len(plan.requesters) * rng.random() ** 3)]
+        pick = rng.random() * creator_total
+        created_by = (plan.creators[bisect_right(plan.creator_weights, pick)]
+                      if pick < plan.creator_weights[-1] else rng.choice(plan.agents))
+
+        title, description = rng.choice(TEMPLATES.get(type_name, TEMPLATES['Outros']))
+        description = description.format(dep=rng.choice(DEPARTMENTS), n=rng.randint(1, 500), quando=rng.choice(WHEN))
+        tags = TAGS.get(type_name)
+        tags = '{' + ','.join(rng.sample(tags, rng.randint(1, len(tags)))) + '}' if tags and rng.random() < 0.4 else None
+
+        events = [(created, 'created', None, None, None, created_by, 'Ticket criado')]
+        initial_urgency = urgency
+        if rng.random() < 0.08:
+            initial_urgency = rng.choice([u for u in URGENCIES if u != urgency])
+
+        resolution_hours = rng.lognormvariate(math.log(RESOLUTION_MEDIAN_HOURS[urgency]), 1.0)
+        if rng.random() < STALE_FRACTION:
+            resolution_hours *= STALE_FACTOR
+        assign_at = created + timedelta(hours=resolution_hours * rng.uniform(0.05, 0.4))
+        agent = rng.choice(plan.agents)
+        status, assigned_to, completed_at, resolution, actual_hours = 'pending', None, None, None, None
+        updated_by = created_by
+
+        if initial_urgency != urgency:
+            changed_at = created + (assign_at - created) / 2
+            if changed_at <= end:
+                events.append((changed_at, 'urgency_changed', 'urgency', initial_urgency, urgency, agent, None))
+            else:
+                urgency = initial_urgency
+
+        if rng.random() < 0.04:
+            cancelled_at = created + timedelta(hours=rng.lognormvariate(math.log(24), 1.0))
+            if cancelled_at <= end:
+                status = 'cancelled'
+                events.append((cancelled_at, 'status_changed', 'status', 'pending', 'cancelled', agent, None))
+        elif assign_at <= end:
+            status, assigned_to = 'in_progress', agent
+            events.append((assign_at, 'assigned', 'assigned_to', None, agent, agent, None))
+            events.append((assign_at, 'status_changed', 'status', 'pending', 'in_progress', agent, None))
+            done_at = created + timedelta(hours=resolution_hours)
+            if done_at <= end:
+                status, completed_at = 'completed', done_at
+                resolution = rng.choice(RESOLUTIONS)
+                actual_hours = f'{min(999.99, max(0.25, resolution_hours * rng.uniform(0.1, 0.5))):.2f}'
+                events.append((done_at, 'status_changed', 'status', 'in_progress', 'completed', agent, None))
+
+        events.sort(key=lambda event: event[0])
+        updated_at = events[-1][0]
+        if len(events) > 1:
+            updated_by = events[-1][5]
+        low, high = ESTIMATED_HOURS[urgency]
+
+        ticket_rows.writerow((
+            ticket_id, f'TK{created.year % 100:02d}{plan.first_number + index:04d}', plan.type_ids[type_index],
+            title, description, requester, email, urgency, status, rng.randint(*PRIORITY_BY_URGENCY[urgency]),
+            assigned_to, _timestamp(created), _timestamp(updated_at),
+            _timestamp(completed_at) if completed_at else None,
+            created_by, updated_by, f'{rng.uniform(low, high):.2f}', actual_hours, resolution, tags,
+        ))
+        for changed_at, action, field, old, new, changed_by, notes in events:
+            history_rows.writerow((ticket_id, action, field, old, new, changed_by, _timestamp(changed_at), notes))
+        counts[1] += len(events)
+
+        comment_count = bisect_right(COMMENT_COUNT_WEIGHTS, rng.random() * COMMENT_COUNT_WEIGHTS[-1])
+        if comment_count:
+            window = ((completed_at or end) - created).total_seconds()
+            for offset in sorted(rng.random() * window for _ in range(comment_count)):
+                at = created + timedelta(seconds=offset)
+                roll = rng.random()
+                if roll < 0.4:
+                    comment_rows.writerow((ticket_id, rng.choice(COMMENTS_REQUESTER), requester, _timestamp(at), 'f'))
+                elif roll < 0.75:
+                    comment_rows.writerow((ticket_id, rng.choice(COMMENTS_AGENT), agent, _timestamp(at), 'f'))
+                else:
+                    comment_rows.writerow((ticket_id, rng.choice(COMMENTS_INTERNAL), agent, _timestamp(at), 't'))
+            counts[2] += comment_count
+        counts[0] += 1
+
+    return tickets, history, comments, counts
+
+
+# Estado de cada processo do pool
+_plan = None
+_conn = None
+
+
+def _init_worker(plan, kwargs):
+    global _plan, _conn
+    _plan = plan
+    if kwargs is None:
+        return
+    _conn = psycopg2.connect(**kwargs)
+    cursor = _conn.cursor()
+    # Desliga triggers (e checagens de FK) só nesta sessão
+    cursor.execute("SET session_replication_role = replica")
+    cursor.execute("SET synchronous_commit = off")
+    _conn.commit()
+
+
+def _copy(cursor, table, columns, buffer):
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _load_block(block):
+    tickets, history, comments, counts = generate_block(_plan, block)
+    if _conn is not None:
+        with _conn.cursor() as cursor:
+            _copy(cursor, 'tickets', TICKET_COLUMNS, tickets)
+            _copy(cursor, 'ticket_history', HISTORY_COLUMNS, history)
+            _copy(cursor, 'ticket_comments', COMMENT_COLUMNS, comments)
+        _conn.commit()
+    return counts
+
+
+def _backfill_search(id_range):
+    with _conn.cursor() as cursor:
+        cursor.execute(SEARCH_BACKFILL_SQL, id_range)
+        count = cursor.rowcount
+    _conn.commit()
+    return count
+
+
+def prepare(conn, args):
+    """Limpa o banco (--reset) e retorna o plano da carga"""
+    cursor = conn.cursor()
+    if args.reset:
+        print("🧹 Limpando tickets, histórico, comentários e contadores...")
+        cursor.execute(RESET_SQL)
+
+    cursor.execute("SELECT id, name FROM ticket_types WHERE is_active = TRUE ORDER BY id")
+    types = cursor.fetchall()
+    if not types:
+        raise SystemExit("❌ Nenhum tipo de ticket ativo em ticket_types")
+
+    # IDs e números continuam depois dos existentes, sem colidir com os
+    # números que o trigger já entregou em qualquer ano
+    cursor.execute("""
+        SELECT COALESCE((SELECT MAX(id) FROM tickets), 0) AS max_id,
+               COALESCE((SELECT MAX(last_value) FROM ticket_number_counters), 0) AS max_number
+    """)
+    max_id, max_number = cursor.fetchone()
+    plan = Plan(args.seed, args.tickets, args.days, args.end, max_id + 1, max(max_id, max_number) + 1, types)
+
+    # Partições mensais do período inteiro antes do COPY (senão tudo cai na default)
+    cursor.execute("SELECT ensure_ticket_partitions(%s, %s)", (plan.start, plan.end))
+    created, = cursor.fetchone()
+    if created:
+        print(f"🗂️  {created} partições mensais criadas")
+    conn.commit()
+    return plan
+
+
+def finalize(conn, pool, plan, workers):
+    cursor = conn.cursor()
+    print("🔧 Ajustando sequências e contadores...")
+    for table in ('tickets', 'ticket_history', 'ticket_comments'):
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        )
+    cursor.execute(SEED_NUMBER_COUNTERS_SQL)
+    cursor.execute("SELECT rebuild_ticket_counters()")
+    conn.commit()
+
+    print("🔎 Preenchendo ticket_search...")
+    last_id = plan.first_id + plan.total - 1
+    step = max(BLOCK_SIZE, plan.total // (workers * 4) + 1)
+    ranges = [(start, min(start + step - 1, last_id)) for start in range(plan.first_id, last_id + 1, step)]
+    indexed = sum(pool.imap_unordered(_backfill_search, ranges))
+    print(f"   {indexed:,} documentos")
+
+    print("📈 Atualizando estatísticas do planejador...")
+    conn.autocommit = True
+    cursor.execute("ANALYZE tickets, ticket_history, ticket_comments, ticket_search, ticket_counters, ticket_counter_totals")
+    conn.autocommit = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera tickets sintéticos para testes de escala')
+    parser.add_argument('--tickets', type=int, default=100_000, help='quantidade de tickets (1k a 10M)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--days', type=int, default=730, help='período coberto, em dias até --end')
+    parser.add_argument('--end', type=date.fromisoformat, default=date.today(),
+                        help='data final (AAAA-MM-DD); fixe para repetir exatamente a mesma carga')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='processos de geração/COPY')
+    parser.add_argument('--reset', action='store_true', help='apaga tickets existentes antes de carregar')
+    parser.add_argument('--dry-run', action='store_true', help='só gera os dados, sem conectar ao banco')
+    args = parser.parse_args()
+
+    if not 1 <= args.tickets <= 10_000_000:
+        parser.error('--tickets deve estar entre 1 e 10.000.000')
+    args.end = datetime.combine(args.end, datetime.min.time())
+
+    kwargs = None
+    conn = None
+    if args.dry_run:
+        plan = Plan(args.seed, args.tickets, args.days, args.end, 1, 1,
+                    [(i + 1, name) for i, name in enumerate(TYPE_WEIGHTS)])
+    else:
+        kwargs = connection_kwargs(os.environ)
+        conn = psycopg2.connect(**kwargs)
+        plan = prepare(conn, args)
+
+    blocks = math.ceil(args.tickets / BLOCK_SIZE)
+    print(f"🎫 Gerando {args.tickets:,} tickets em {blocks} blocos com {args.workers} processos (seed {args.seed})")
+
+    started = time.perf_counter()
+    totals = [0, 0, 0]
+    with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(plan, kwargs)) as pool:
+        done = 0
+        for counts in pool.imap_unordered(_load_block, range(blocks)):
+            totals = [total + count for total, count in zip(totals, counts)]
+            done += 1
+            if done == blocks or done % max(1, blocks // 20) == 0:
+                elapsed = time.perf_counter() - started
+                print(f"   {done}/{blocks} blocos, {totals[0]:,} tickets, {sum(totals) / elapsed:,.0f} linhas/s")
+        load_time = time.perf_counter() - started
+
+        if conn is not None:
+            finalize(conn, pool, plan, args.workers)
+            conn.close()
+
+    rows = sum(totals)
+    print(f"\n✅ {totals[0]:,} tickets, {totals[1]:,} linhas de histórico, {totals[2]:,} comentários")
+    print(f"   carga: {load_time:.1f} s ({rows / load_time:,.0f} linhas/s); total: {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Configuração do Gunicorn (servidor de produção)
+
+O app é carregado uma vez no processo mestre (preload) e os workers são
+criados por fork. Pools e conexões são abertos depois do fork, em cada
+worker: o pool PostgreSQL é recriado sob demanda quando o PID muda e a
+engine SQLite herdada é descartada em post_fork.
+
+Sinais no processo mestre:
+    HUP   recarrega a configuração e troca os workers sem derrubar conexões
+          (com preload o código só é relido com USR2 + WINCH ou reiniciando)
+    TERM  desligamento gracioso: para de aceitar conexões e espera as
+          requisições em andamento por até GUNICORN_GRACEFUL_TIMEOUT segundos
+    TTIN / TTOU  adiciona / remove um worker
+"""
+
+import multiprocessing
+import os
+
+# src.main:app (WSGI) ou src.asgi:app com GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker
+wsgi_app = os.environ.get('GUNICORN_APP', 'src.main:app')
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Um processo por núcleo; threads cobrem a espera de I/O (PostgreSQL e os
+# streams SSE, que ocupam uma thread enquanto estão abertos). Com o worker
+# uvicorn, `threads` não se aplica: as rotas Flask usam ASGI_WSGI_THREADS
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Reciclagem periódica dos workers (0 desativa)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+# Snapshots de métricas por worker, somados em /api/metrics; precisa estar
+# definido antes do preload, que lê a configuração do app
+metrics_dir = os.environ.setdefault('METRICS_MULTIPROC_DIR', '/tmp/dashboard-metrics')
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    from src.utils.metrics import reset_snapshot_dir
+
+    # Snapshots de uma execução anterior somariam contadores de workers mortos
+    if metrics_dir:
+        reset_snapshot_dir(metrics_dir)
+
+
+def when_ready(server):
+    server.log.info(
+        "Dashboard pronto: %s workers x %s threads em %s", workers, threads, bind
+    )
+
+
+def post_fork(server, worker):
+    from src.main import app
+    from src.models.user import db
+    from src.utils.metrics import metrics, start_snapshot_writer
+
+    # Conexões SQLite abertas no mestre (db.create_all) não são compartilhadas
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    if metrics_dir:
+        start_snapshot_writer(metrics, metrics_dir, app.config['METRICS_SNAPSHOT_INTERVAL'])
+
+
+def worker_exit(server, worker):
+    from src.models.postgres_connection import close_pool
+    from src.utils.metrics import metrics, write_worker_snapshot
+
+    # Devolve as conexões PostgreSQL ao sair (reload, TERM ou max_requests)
+    close_pool()
+
+    # Último snapshot, incorporado pelo mestre em child_exit
+    if metrics_dir:
+        write_worker_snapshot(metrics, metrics_dir)
+
+
+def child_exit(server, worker):
+    from src.utils.metrics import mark_worker_exited
+
+    # Roda no mestre: os contadores do worker continuam somando na coleta
+    if metrics_dir:
+        mark_worker_exited(metrics_dir, worker.pid)
@@ -3,6 +3,7 @@
 
 -- Extensões necessárias
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Tabela de tipos de tickets
 CREATE TABLE IF NOT EXISTS ticket_types (
@@ -14,20 +15,24 @@ CREATE TABLE IF NOT EXISTS ticket_types (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Tabela principal de tickets
+-- Tabela principal de tickets, particionada por mês de criação (ensure_ticket_partitions)
+-- Só consultas com created_at no WHERE evitam planejar e travar todas as partições
+-- (buscas por id pegam created_at em ticket_numbers); as demais ficam 2 a 4 ms mais lentas
+-- com ~30 partições, e o custo cresce a cada mês (ver README, Partições Mensais)
+-- A chave primária inclui created_at; a unicidade de ticket_number vem de ticket_numbers
 CREATE TABLE IF NOT EXISTS tickets (
-    id SERIAL PRIMARY KEY,
-    ticket_number VARCHAR(20) UNIQUE NOT NULL,
+    id SERIAL,
+    ticket_number VARCHAR(20) NOT NULL,
     type_id INTEGER REFERENCES ticket_types(id),
     title VARCHAR(255) NOT NULL,
     description TEXT NOT NULL,
     requester VARCHAR(255) NOT NULL,
     requester_email VARCHAR(255),
-    urgency VARCHAR(20) DEFAULT 'medium' CHECK (urgency IN ('low', 'medium', 'high')),
+    urgency VARCHAR(20) NOT NULL DEFAULT 'medium' CHECK (urgency IN ('low', 'medium', 'high')),
     status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'in_progress', 'completed', 'cancelled')),
     priority INTEGER DEFAULT 3 CHECK (priority BETWEEN 1 AND 5),
     assigned_to VARCHAR(100),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     completed_at TIMESTAMP NULL,
     created_by VARCHAR(100),
@@ -35,36 +40,39 @@ CREATE TABLE IF NOT EXISTS tickets (
     estimated_hours DECIMAL(5,2),
     actual_hours DECIMAL(5,2),
     resolution TEXT,
-    tags TEXT[]
-);
+    tags TEXT[],
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
--- Tabela de histórico de tickets
+-- Tabela de histórico de tickets, particionada por mês da alteração
+-- ticket_id não tem chave estrangeira: a remoção em cascata é feita por trigger
 CREATE TABLE IF NOT EXISTS ticket_history (
-    id SERIAL PRIMARY KEY,
-    ticket_id INTEGER REFERENCES tickets(id) ON DELETE CASCADE,
+    id SERIAL,
+    ticket_id INTEGER,
     action VARCHAR(50) NOT NULL,
     field_name VARCHAR(100),
     old_value TEXT,
     new_value TEXT,
     changed_by VARCHAR(100) NOT NULL,
-    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    notes TEXT
-);
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    notes TEXT,
+    PRIMARY KEY (id, changed_at)
+) PARTITION BY RANGE (changed_at);
 
--- Tabela de comentários
+-- Tabela de comentários (ticket_id validado por trigger)
 CREATE TABLE IF NOT EXISTS ticket_comments (
     id SERIAL PRIMARY KEY,
-    ticket_id INTEGER REFERENCES tickets(id) ON DELETE CASCADE,
+    ticket_id INTEGER,
     comment TEXT NOT NULL,
     created_by VARCHAR(100) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     is_internal BOOLEAN DEFAULT FALSE
 );
 
--- Tabela de anexos
+-- Tabela de anexos (ticket_id validado por trigger)
 CREATE TABLE IF NOT EXISTS ticket_attachments (
     id SERIAL PRIMARY KEY,
-    ticket_id INTEGER REFERENCES tickets(id) ON DELETE CASCADE,
+    ticket_id INTEGER,
     filename VARCHAR(255) NOT NULL,
     original_filename VARCHAR(255) NOT NULL,
     file_size INTEGER,
@@ -73,27 +81,143 @@ CREATE TABLE IF NOT EXISTS ticket_attachments (
     uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Partições default: recebem linhas de meses sem partição em vez de falhar o INSERT
+-- Em banco criado antes do particionamento, CREATE TABLE IF NOT EXISTS acima
+-- mantém as tabelas antigas: as partições ficam para a migração
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'tickets'::regclass) = 'p' THEN
+        CREATE TABLE IF NOT EXISTS tickets_default PARTITION OF tickets DEFAULT;
+    ELSE
+        RAISE WARNING 'tickets não é particionada: aplique supabase/migrations/20261018132000_ticket_partitioning.sql';
+    END IF;
+    IF (SELECT relkind FROM pg_class WHERE oid = 'ticket_history'::regclass) = 'p' THEN
+        CREATE TABLE IF NOT EXISTS ticket_history_default PARTITION OF ticket_history DEFAULT;
+    ELSE
+        RAISE WARNING 'ticket_history não é particionada: aplique supabase/migrations/20261018132000_ticket_partitioning.sql';
+    END IF;
+END;
+$$;
+
+-- Função para criar a partição mensal de uma tabela particionada por RANGE
+-- Linhas do mês que tenham caído na partição default (a partição ainda não
+-- existia no INSERT) são movidas para a nova partição
+CREATE OR REPLACE FUNCTION create_monthly_partition(p_parent TEXT, p_column TEXT, p_month DATE)
+RETURNS BOOLEAN AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := p_parent || '_' || to_char(p_month, 'YYYY_MM');
+    default_name TEXT := p_parent || '_default';
+    has_stray_rows BOOLEAN := FALSE;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    IF to_regclass(default_name) IS NOT NULL THEN
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE %I >= %L AND %I < %L)',
+                       default_name, p_column, month_start, p_column, month_end)
+        INTO has_stray_rows;
+    END IF;
+
+    IF NOT has_stray_rows THEN
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                       partition_name, p_parent, month_start, month_end);
+        RETURN TRUE;
+    END IF;
+
+    -- A default desanexada não tem mais os triggers da tabela: as linhas mudam
+    -- de partição sem gerar histórico, contadores, tombstones ou notificações
+    EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', p_parent, default_name);
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, p_parent);
+    EXECUTE format('WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                   default_name, p_column, month_start, p_column, month_end, partition_name);
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   p_parent, partition_name, month_start, month_end);
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', p_parent, default_name);
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para garantir as partições mensais de tickets e ticket_history entre duas datas
+-- Uso: SELECT ensure_ticket_partitions();  (mês atual e os 3 seguintes)
+--      ou  flask tickets ensure-partitions
+-- Retorna o número de partições criadas
+CREATE OR REPLACE FUNCTION ensure_ticket_partitions(
+    p_from TIMESTAMP DEFAULT LOCALTIMESTAMP,
+    p_to TIMESTAMP DEFAULT LOCALTIMESTAMP + INTERVAL '3 months'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE;
+    created_count INTEGER := 0;
+BEGIN
+    FOR month_start IN
+        SELECT generate_series(date_trunc('month', p_from), date_trunc('month', p_to), INTERVAL '1 month')::DATE
+    LOOP
+        IF create_monthly_partition('tickets', 'created_at', month_start) THEN
+            created_count := created_count + 1;
+        END IF;
+        IF create_monthly_partition('ticket_history', 'changed_at', month_start) THEN
+            created_count := created_count + 1;
+        END IF;
+    END LOOP;
+    RETURN created_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partições do mês atual e dos 3 seguintes, e criação diária das partições
+-- futuras quando pg_cron estiver habilitado (sem pg_cron, agende
+-- `flask tickets ensure-partitions` no cron do servidor)
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'tickets'::regclass) <> 'p' THEN
+        RETURN;
+    END IF;
+    PERFORM ensure_ticket_partitions();
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('ensure-ticket-partitions', '0 3 * * *', 'SELECT ensure_ticket_partitions()');
+    END IF;
+END;
+$$;
+
+-- Contador de números de ticket por ano (evita varrer tickets a cada INSERT)
+CREATE TABLE IF NOT EXISTS ticket_number_counters (
+    year_suffix VARCHAR(2) PRIMARY KEY,
+    last_value INTEGER NOT NULL DEFAULT 0
+);
+
+-- Semear/ajustar os contadores a partir dos números já existentes (TKYY####)
+INSERT INTO ticket_number_counters (year_suffix, last_value)
+SELECT SUBSTRING(ticket_number FROM 3 FOR 2), MAX(CAST(SUBSTRING(ticket_number FROM 5) AS INTEGER))
+FROM tickets
+WHERE ticket_number ~ '^TK[0-9]{3,}$'
+GROUP BY SUBSTRING(ticket_number FROM 3 FOR 2)
+ON CONFLICT (year_suffix)
+DO UPDATE SET last_value = GREATEST(ticket_number_counters.last_value, EXCLUDED.last_value);
+
 -- Função para gerar número do ticket automaticamente
+-- O UPSERT no contador do ano é O(1) e o lock da linha serializa inserts
+-- concorrentes, então dois tickets nunca recebem o mesmo número
 CREATE OR REPLACE FUNCTION generate_ticket_number()
 RETURNS TRIGGER AS $$
 DECLARE
-    year_suffix VARCHAR(4);
+    current_suffix VARCHAR(2);
     sequence_num INTEGER;
-    new_number VARCHAR(20);
 BEGIN
     -- Pegar os últimos 2 dígitos do ano
-    year_suffix := RIGHT(EXTRACT(YEAR FROM CURRENT_DATE)::TEXT, 2);
-    
-    -- Buscar o próximo número sequencial para o ano
-    SELECT COALESCE(MAX(CAST(SUBSTRING(ticket_number FROM 4) AS INTEGER)), 0) + 1
-    INTO sequence_num
-    FROM tickets
-    WHERE ticket_number LIKE 'TK' || year_suffix || '%';
+    current_suffix := RIGHT(EXTRACT(YEAR FROM CURRENT_DATE)::TEXT, 2);
     
-    -- Gerar o número com padding de zeros
-    new_number := 'TK' || year_suffix || LPAD(sequence_num::TEXT, 4, '0');
+    -- Reservar o próximo número sequencial do ano
+    -- (variável não pode se chamar year_suffix: conflitaria com a coluna)
+    INSERT INTO ticket_number_counters AS c (year_suffix, last_value)
+    VALUES (current_suffix, 1)
+    ON CONFLICT (year_suffix) DO UPDATE SET last_value = c.last_value + 1
+    RETURNING c.last_value INTO sequence_num;
     
-    NEW.ticket_number := new_number;
+    -- Gerar o número com padding de zeros (acima de 9999 usa mais dígitos)
+    NEW.ticket_number := 'TK' || current_suffix || LPAD(sequence_num::TEXT, GREATEST(4, LENGTH(sequence_num::TEXT)), '0');
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
@@ -105,6 +229,57 @@ CREATE TRIGGER trigger_generate_ticket_number
     FOR EACH ROW
     EXECUTE FUNCTION generate_ticket_number();
 
+-- Números já usados: tickets particionada não aceita UNIQUE só em ticket_number,
+-- então a chave primária desta tabela faz a verificação (inclusive para números
+-- informados no INSERT ou gravados com os triggers desligados).
+-- created_at permite buscar por id só na partição do ticket (ticket_partitions.py)
+CREATE TABLE IF NOT EXISTS ticket_numbers (
+    ticket_number VARCHAR(20) PRIMARY KEY,
+    ticket_id INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ticket_numbers_ticket_id ON ticket_numbers (ticket_id) INCLUDE (created_at);
+
+-- Registrar os tickets existentes (número repetido aborta o script)
+INSERT INTO ticket_numbers (ticket_number, ticket_id, created_at)
+SELECT t.ticket_number, t.id, t.created_at
+FROM tickets t
+WHERE NOT EXISTS (
+    SELECT 1 FROM ticket_numbers n WHERE n.ticket_number = t.ticket_number AND n.ticket_id = t.id
+);
+
+-- Função para reservar e liberar o número do ticket
+CREATE OR REPLACE FUNCTION claim_ticket_number()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.ticket_number IS NOT DISTINCT FROM OLD.ticket_number THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM ticket_numbers WHERE ticket_number = OLD.ticket_number;
+    END IF;
+
+    -- Número repetido viola ticket_numbers_pkey e desfaz o comando em tickets
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO ticket_numbers (ticket_number, ticket_id, created_at)
+        VALUES (NEW.ticket_number, NEW.id, NEW.created_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para manter ticket_numbers (ALWAYS: dispara também com
+-- session_replication_role = replica, usado pela carga de generate_dataset.py)
+DROP TRIGGER IF EXISTS trigger_claim_ticket_number ON tickets;
+CREATE TRIGGER trigger_claim_ticket_number
+    AFTER INSERT OR UPDATE OF ticket_number OR DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION claim_ticket_number();
+
+ALTER TABLE tickets ENABLE ALWAYS TRIGGER trigger_claim_ticket_number;
+
 -- Função para atualizar timestamp de updated_at
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -166,6 +341,310 @@ CREATE TRIGGER trigger_log_ticket_changes
     FOR EACH ROW
     EXECUTE FUNCTION log_ticket_changes();
 
+-- Tabela de contadores agregados para as estatísticas do dashboard
+-- kind = 'created'   -> tickets por (status, urgência, tipo, dia de criação)
+-- kind = 'completed' -> tickets finalizados por (urgência, tipo, dia de finalização)
+-- Valores nulos viram sentinelas ('' / 0 / -infinity) para caber na chave primária
+-- Cada bucket é dividido em slots (um por sessão, pg_backend_pid() % 16) para que
+-- inserções concorrentes no mesmo dia não disputem a mesma linha; as leituras somam os slots
+CREATE TABLE IF NOT EXISTS ticket_counters (
+    kind VARCHAR(10) NOT NULL CHECK (kind IN ('created', 'completed')),
+    status VARCHAR(20) NOT NULL DEFAULT '',
+    urgency VARCHAR(20) NOT NULL DEFAULT '',
+    type_id INTEGER NOT NULL DEFAULT 0,
+    day DATE NOT NULL,
+    slot SMALLINT NOT NULL DEFAULT 0,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, status, urgency, type_id, day, slot)
+);
+
+-- Função para somar delta a um bucket de ticket_counters
+CREATE OR REPLACE FUNCTION bump_ticket_counter(
+    p_kind VARCHAR, p_status VARCHAR, p_urgency VARCHAR, p_type_id INTEGER, p_day DATE, p_delta INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO ticket_counters (kind, status, urgency, type_id, day, slot, count)
+    VALUES (p_kind, COALESCE(p_status, ''), COALESCE(p_urgency, ''), COALESCE(p_type_id, 0),
+            COALESCE(p_day, '-infinity'::DATE), pg_backend_pid() % 16, p_delta)
+    ON CONFLICT (kind, status, urgency, type_id, day, slot)
+    DO UPDATE SET count = ticket_counters.count + EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Totais de todo o histórico, sem a coluna day: /api/stats lê daqui os totais
+-- por status, urgência e tipo (tamanho fixo) e só os últimos 7 dias de ticket_counters
+CREATE TABLE IF NOT EXISTS ticket_counter_totals (
+    status VARCHAR(20) NOT NULL DEFAULT '',
+    urgency VARCHAR(20) NOT NULL DEFAULT '',
+    type_id INTEGER NOT NULL DEFAULT 0,
+    slot SMALLINT NOT NULL DEFAULT 0,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, urgency, type_id, slot)
+);
+
+-- Função para somar delta ao total de todo o histórico (slot da sessão atual)
+CREATE OR REPLACE FUNCTION bump_ticket_total(
+    p_status VARCHAR, p_urgency VARCHAR, p_type_id INTEGER, p_delta INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO ticket_counter_totals (status, urgency, type_id, slot, count)
+    VALUES (COALESCE(p_status, ''), COALESCE(p_urgency, ''), COALESCE(p_type_id, 0),
+            pg_backend_pid() % 16, p_delta)
+    ON CONFLICT (status, urgency, type_id, slot)
+    DO UPDATE SET count = ticket_counter_totals.count + EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para manter ticket_counters e ticket_counter_totals a cada INSERT/UPDATE/DELETE em tickets
+CREATE OR REPLACE FUNCTION maintain_ticket_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- UPDATE que não mexe em nenhuma dimensão não altera contadores
+    IF TG_OP = 'UPDATE'
+       AND (OLD.status, OLD.urgency, OLD.type_id, OLD.created_at, OLD.completed_at)
+           IS NOT DISTINCT FROM (NEW.status, NEW.urgency, NEW.type_id, NEW.created_at, NEW.completed_at) THEN
+        RETURN NULL;
+    END IF;
+
+    -- Remove a contribuição da versão antiga
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_ticket_counter('created', OLD.status, OLD.urgency, OLD.type_id, DATE(OLD.created_at), -1);
+        IF OLD.status = 'completed' AND OLD.completed_at IS NOT NULL THEN
+            PERFORM bump_ticket_counter('completed', OLD.status, OLD.urgency, OLD.type_id, DATE(OLD.completed_at), -1);
+        END IF;
+    END IF;
+
+    -- Adiciona a contribuição da versão nova
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_ticket_counter('created', NEW.status, NEW.urgency, NEW.type_id, DATE(NEW.created_at), 1);
+        IF NEW.status = 'completed' AND NEW.completed_at IS NOT NULL THEN
+            PERFORM bump_ticket_counter('completed', NEW.status, NEW.urgency, NEW.type_id, DATE(NEW.completed_at), 1);
+        END IF;
+    END IF;
+
+    -- Totais sem dia: só mudam quando status, urgência ou tipo mudam
+    IF TG_OP = 'DELETE'
+       OR (TG_OP = 'UPDATE' AND (OLD.status, OLD.urgency, OLD.type_id)
+                                IS DISTINCT FROM (NEW.status, NEW.urgency, NEW.type_id)) THEN
+        PERFORM bump_ticket_total(OLD.status, OLD.urgency, OLD.type_id, -1);
+    END IF;
+    IF TG_OP = 'INSERT'
+       OR (TG_OP = 'UPDATE' AND (OLD.status, OLD.urgency, OLD.type_id)
+                                IS DISTINCT FROM (NEW.status, NEW.urgency, NEW.type_id)) THEN
+        PERFORM bump_ticket_total(NEW.status, NEW.urgency, NEW.type_id, 1);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para manter os contadores
+DROP TRIGGER IF EXISTS trigger_maintain_ticket_counters ON tickets;
+CREATE TRIGGER trigger_maintain_ticket_counters
+    AFTER INSERT OR UPDATE OR DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_ticket_counters();
+
+-- Função para avisar os ouvintes (LISTEN ticket_changes) sobre mudanças em tickets
+-- Payload: {"id": <ticket id>, "kind": "created" | "updated" | "deleted"}
+CREATE OR REPLACE FUNCTION notify_ticket_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('ticket_changes', json_build_object('id', OLD.id, 'kind', 'deleted')::TEXT);
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify(
+        'ticket_changes',
+        json_build_object('id', NEW.id, 'kind', CASE TG_OP WHEN 'INSERT' THEN 'created' ELSE 'updated' END)::TEXT
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para notificar mudanças (entregue somente após o COMMIT)
+DROP TRIGGER IF EXISTS trigger_notify_ticket_change ON tickets;
+CREATE TRIGGER trigger_notify_ticket_change
+    AFTER INSERT OR UPDATE OR DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_ticket_change();
+
+-- Registro de tickets removidos para a sincronização incremental (GET /api/tickets/changes)
+CREATE TABLE IF NOT EXISTS ticket_tombstones (
+    ticket_id INTEGER PRIMARY KEY,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Função para registrar o tombstone de um ticket removido
+CREATE OR REPLACE FUNCTION record_ticket_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO ticket_tombstones (ticket_id, deleted_at)
+    VALUES (OLD.id, CURRENT_TIMESTAMP)
+    ON CONFLICT (ticket_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para registrar remoções
+DROP TRIGGER IF EXISTS trigger_record_ticket_tombstone ON tickets;
+CREATE TRIGGER trigger_record_ticket_tombstone
+    AFTER DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION record_ticket_tombstone();
+
+-- Função para impedir a troca de created_at (chave de partição: mover a linha
+-- de partição dispararia os triggers de remoção e criação)
+CREATE OR REPLACE FUNCTION keep_ticket_created_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.created_at IS DISTINCT FROM OLD.created_at THEN
+        RAISE EXCEPTION 'created_at do ticket % não pode ser alterado', OLD.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para manter created_at fixo
+DROP TRIGGER IF EXISTS trigger_keep_ticket_created_at ON tickets;
+CREATE TRIGGER trigger_keep_ticket_created_at
+    BEFORE UPDATE OF created_at ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION keep_ticket_created_at();
+
+-- Função para remover histórico, comentários, anexos e documento de busca
+-- de um ticket removido (tabela particionada não aceita chave estrangeira só em id)
+CREATE OR REPLACE FUNCTION delete_ticket_dependents()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM ticket_history WHERE ticket_id = OLD.id;
+    DELETE FROM ticket_comments WHERE ticket_id = OLD.id;
+    DELETE FROM ticket_attachments WHERE ticket_id = OLD.id;
+    DELETE FROM ticket_search WHERE ticket_id = OLD.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para a remoção em cascata
+DROP TRIGGER IF EXISTS trigger_delete_ticket_dependents ON tickets;
+CREATE TRIGGER trigger_delete_ticket_dependents
+    AFTER DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION delete_ticket_dependents();
+
+-- Função para validar ticket_id em comentários e anexos (no lugar da chave estrangeira)
+-- FOR KEY SHARE impede que o ticket seja removido antes do COMMIT; com o
+-- created_at de ticket_numbers o SELECT lê só a partição do ticket
+CREATE OR REPLACE FUNCTION check_ticket_reference()
+RETURNS TRIGGER AS $$
+DECLARE
+    ticket_created_at TIMESTAMP;
+BEGIN
+    IF NEW.ticket_id IS NOT NULL THEN
+        SELECT created_at INTO ticket_created_at FROM ticket_numbers WHERE ticket_id = NEW.ticket_id;
+        PERFORM 1 FROM tickets WHERE id = NEW.ticket_id AND created_at = ticket_created_at FOR KEY SHARE;
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Ticket % não encontrado (%)', NEW.ticket_id, TG_TABLE_NAME
+                USING ERRCODE = 'foreign_key_violation';
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Triggers para validar as referências
+DROP TRIGGER IF EXISTS trigger_check_ticket_reference ON ticket_comments;
+CREATE TRIGGER trigger_check_ticket_reference
+    BEFORE INSERT OR UPDATE OF ticket_id ON ticket_comments
+    FOR EACH ROW
+    EXECUTE FUNCTION check_ticket_reference();
+
+DROP TRIGGER IF EXISTS trigger_check_ticket_reference ON ticket_attachments;
+CREATE TRIGGER trigger_check_ticket_reference
+    BEFORE INSERT OR UPDATE OF ticket_id ON ticket_attachments
+    FOR EACH ROW
+    EXECUTE FUNCTION check_ticket_reference();
+
+-- Documento de busca textual dos tickets (GET /api/tickets/search), mantido por trigger
+-- Fica fora de tickets para não pesar em SELECT t.* e nas respostas da API;
+-- created_at (cópia da chave de partição) entra na junção com tickets, que
+-- assim lê só a partição de cada resultado
+CREATE TABLE IF NOT EXISTS ticket_search (
+    ticket_id INTEGER PRIMARY KEY,
+    created_at TIMESTAMP NOT NULL,
+    document TSVECTOR NOT NULL
+);
+
+-- Função que monta o documento: título (peso A), descrição (B) e resolução (C)
+CREATE OR REPLACE FUNCTION ticket_search_document(p_title TEXT, p_description TEXT, p_resolution TEXT)
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('portuguese', COALESCE(p_title, '')), 'A')
+        || setweight(to_tsvector('portuguese', COALESCE(p_description, '')), 'B')
+        || setweight(to_tsvector('portuguese', COALESCE(p_resolution, '')), 'C');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Função para atualizar o documento de busca do ticket
+CREATE OR REPLACE FUNCTION update_ticket_search()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO ticket_search (ticket_id, created_at, document)
+    VALUES (NEW.id, NEW.created_at, ticket_search_document(NEW.title, NEW.description, NEW.resolution))
+    ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para manter ticket_search (só quando os campos pesquisáveis mudam)
+DROP TRIGGER IF EXISTS trigger_update_ticket_search ON tickets;
+CREATE TRIGGER trigger_update_ticket_search
+    AFTER INSERT OR UPDATE OF title, description, resolution ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION update_ticket_search();
+
+-- Função para reconstruir ticket_counters e ticket_counter_totals a partir de tickets
+-- (após cargas em massa). Grava um único slot (0) por bucket, compactando os
+-- slots acumulados pelo trigger
+-- Uso: SELECT rebuild_ticket_counters();  ou  flask stats reconcile-counters
+CREATE OR REPLACE FUNCTION rebuild_ticket_counters()
+RETURNS BIGINT AS $$
+DECLARE
+    bucket_count BIGINT;
+    total_count BIGINT;
+BEGIN
+    -- Bloqueia escritas em tickets enquanto os contadores são recalculados
+    LOCK TABLE tickets IN SHARE MODE;
+
+    DELETE FROM ticket_counters;
+    DELETE FROM ticket_counter_totals;
+
+    INSERT INTO ticket_counters (kind, status, urgency, type_id, day, count)
+    SELECT 'created', COALESCE(status, ''), COALESCE(urgency, ''), COALESCE(type_id, 0),
+           COALESCE(DATE(created_at), '-infinity'::DATE), COUNT(*)
+    FROM tickets
+    GROUP BY 1, 2, 3, 4, 5
+    UNION ALL
+    SELECT 'completed', status, COALESCE(urgency, ''), COALESCE(type_id, 0),
+           DATE(completed_at), COUNT(*)
+    FROM tickets
+    WHERE status = 'completed' AND completed_at IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5;
+
+    GET DIAGNOSTICS bucket_count = ROW_COUNT;
+
+    INSERT INTO ticket_counter_totals (status, urgency, type_id, count)
+    SELECT status, urgency, type_id, SUM(count)
+    FROM ticket_counters
+    WHERE kind = 'created'
+    GROUP BY status, urgency, type_id;
+
+    GET DIAGNOSTICS total_count = ROW_COUNT;
+    RETURN bucket_count + total_count;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Inserir tipos de tickets padrão (APENAS OS TIPOS, SEM TICKETS DE EXEMPLO)
 INSERT INTO ticket_types (name, description, color) VALUES
 ('Hardware', 'Problemas relacionados a equipamentos físicos', '#EF4444'),
@@ -182,14 +661,47 @@ ON CONFLICT (name) DO NOTHING;
 
 -- REMOVIDO: Inserção de tickets de exemplo para produção limpa
 
--- Criar índices para melhor performance
+-- Popular ticket_counters em bancos que já tinham tickets antes da tabela existir
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM ticket_counters) OR NOT EXISTS (SELECT 1 FROM ticket_counter_totals) THEN
+        PERFORM rebuild_ticket_counters();
+    END IF;
+END;
+$$;
+
+-- Popular ticket_search com tickets criados antes do trigger existir
+-- (INSERT direto: não dispara os triggers de tickets nem altera updated_at)
+INSERT INTO ticket_search (ticket_id, created_at, document)
+SELECT id, created_at, ticket_search_document(title, description, resolution)
+FROM tickets
+ON CONFLICT (ticket_id) DO NOTHING;
+
+-- Criar índices para melhor performance (em tickets e ticket_history valem para todas as partições)
+CREATE INDEX IF NOT EXISTS idx_tickets_ticket_number ON tickets(ticket_number);
 CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status);
 CREATE INDEX IF NOT EXISTS idx_tickets_urgency ON tickets(urgency);
 CREATE INDEX IF NOT EXISTS idx_tickets_created_at ON tickets(created_at);
 CREATE INDEX IF NOT EXISTS idx_tickets_type_id ON tickets(type_id);
 CREATE INDEX IF NOT EXISTS idx_tickets_assigned_to ON tickets(assigned_to);
+CREATE INDEX IF NOT EXISTS idx_tickets_completed_at ON tickets(completed_at) WHERE completed_at IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_ticket_history_ticket_id ON ticket_history(ticket_id);
 CREATE INDEX IF NOT EXISTS idx_ticket_comments_ticket_id ON ticket_comments(ticket_id);
+CREATE INDEX IF NOT EXISTS idx_ticket_attachments_ticket_id ON ticket_attachments(ticket_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_updated_at ON tickets(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_ticket_counters_day ON ticket_counters (day, kind);
+CREATE INDEX IF NOT EXISTS idx_ticket_tombstones_deleted_at ON ticket_tombstones(deleted_at, ticket_id);
+CREATE INDEX IF NOT EXISTS idx_ticket_search_document ON ticket_search USING GIN (document);
+CREATE INDEX IF NOT EXISTS idx_tickets_requester_trgm ON tickets USING GIN (requester gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_tickets_requester_email_trgm ON tickets USING GIN (requester_email gin_trgm_ops);
+
+-- Índice da listagem paginada (urgência, mais recentes, id); a urgência vai
+-- negada para as três colunas serem DESC e o cursor ser uma comparação de linha
+CREATE INDEX IF NOT EXISTS idx_tickets_listing ON tickets (
+    (-(CASE urgency WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END)) DESC,
+    created_at DESC,
+    id DESC
+);
 
 -- Views úteis para relatórios
 CREATE OR REPLACE VIEW v_tickets_summary AS
@@ -232,9 +744,9 @@ SELECT
 FROM tickets;
 
 -- Comentários nas tabelas para documentação
-COMMENT ON TABLE tickets IS 'Tabela principal de tickets de suporte';
+COMMENT ON TABLE tickets IS 'Tabela principal de tickets de suporte (partições mensais por created_at)';
 COMMENT ON TABLE ticket_types IS 'Tipos/categorias de tickets disponíveis';
-COMMENT ON TABLE ticket_history IS 'Histórico de mudanças nos tickets';
+COMMENT ON TABLE ticket_history IS 'Histórico de mudanças nos tickets (partições mensais por changed_at)';
 COMMENT ON TABLE ticket_comments IS 'Comentários adicionados aos tickets';
 COMMENT ON TABLE ticket_attachments IS 'Arquivos anexados aos tickets';
 
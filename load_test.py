@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Teste de carga da API HTTP
+Simula agentes (login, listagem, estatísticas, atualização) e produtores de
+webhook (criação de tickets) com os mesmos formatos de requisição de
+ExternalTicketAPI, WebhookTicketCreator e do dashboard
+
+As requisições chegam em ritmo fixo (--rate por segundo, modelo aberto) e são
+atendidas por --users usuários virtuais, cada um com sua sessão HTTP e seu
+token. A latência é medida a partir do instante em que a requisição deveria
+ter saído: se os usuários virtuais estiverem todos ocupados, a fila entra na
+conta em vez de esconder a lentidão do servidor.
+
+Uso:
+    # Servidor e PostgreSQL já rodando
+    python load_test.py --url http://localhost:5000 --rate 100 --duration 60 --output carga.json
+
+    # Sobe o gunicorn local (gunicorn.conf.py) contra o PostgreSQL das variáveis POSTGRES_*
+    docker-compose up -d postgres
+    python load_test.py --start-server --rate 200 --users 200 --output carga.json
+
+    # Compara duas execuções
+    python load_test.py --compare antes.json depois.json
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from webhook_ticket_creator import WebhookTicketCreator
+
+# Peso de cada operação no mix (proporcional)
+DEFAULT_MIX = {
+    'login': 2,
+    'list_tickets': 35,
+    'stats_dashboard': 20,
+    'ticket_types': 5,
+    'create_ticket': 10,
+    'webhook_ticket': 10,
+    'update_ticket': 18,
+}
+
+TICKET_TYPES = ['Hardware', 'Software', 'Rede', 'Sistema', 'Impressora', 'Email',
+                'Telefonia', 'Acesso', 'Backup', 'Outros']
+FORM_CATEGORIES = ['computador', 'programa', 'internet', 'impressora', 'email', 'sistema', 'outro']
+EMAIL_SUBJECTS = ['Computador lento', 'Erro no sistema', 'Sem internet no setor',
+                  'Problema com impressora HP', 'Outlook não sincroniza', 'Dúvida geral']
+NAMES = ['João Silva', 'Maria Santos', 'Pedro Almeida', 'Ana Costa', 'Carlos Souza',
+         'Fernanda Lima', 'Rafael Rocha', 'Juliana Alves']
+URGENCIES = ['low', 'medium', 'high']
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples):
+    """p50/p95/p99/máximo/média em milissegundos"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None, 'mean': None}
+    return {
+        'p50': round(percentile(ordered, 0.50) * 1000, 2),
+        'p95': round(percentile(ordered, 0.95) * 1000, 2),
+        'p99': round(percentile(ordered, 0.99) * 1000, 2),
+        'max': round(ordered[-1] * 1000, 2),
+        'mean': round(sum(ordered) / len(ordered) * 1000, 2),
+    }
+
+
+class Recorder:
+    """Resultados por operação; só registra o que foi agendado dentro da janela medida"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.window_start = None
+        self.window_end = None
+        self.latency = defaultdict(list)
+        self.service = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+        self.error_samples = defaultdict(list)
+        self.dropped = 0
+        self.max_dispatch_lag = 0.0
+
+    def in_window(self, scheduled):
+        return self.window_start is not None and self.window_start <= scheduled < self.window_end
+
+    def record(self, name, scheduled, started, finished, status, error=None):
+        if not self.in_window(scheduled):
+            return
+        with self._lock:
+            self.latency[name].append(finished - scheduled)
+            self.service[name].append(finished - started)
+            self.statuses[name][str(status)] += 1
+            if error is not None:
+                self.errors[name] += 1
+                if len(self.error_samples[name]) < 5:
+                    self.error_samples[name].append(error)
+
+    def drop(self, scheduled):
+        if self.in_window(scheduled):
+            with self._lock:
+                self.dropped += 1
+
+    def dispatch_lag(self, lag):
+        self.max_dispatch_lag = max(self.max_dispatch_lag, lag)
+
+    def report(self, duration):
+        endpoints = {}
+        total_requests = total_errors = 0
+        for name in sorted(self.latency):
+            count = len(self.latency[name])
+            errors = self.errors[name]
+            total_requests += count
+            total_errors += errors
+            endpoints[name] = {
+                'requests': count,
+                'errors': errors,
+                'error_rate': round(errors / count, 4) if count else 0.0,
+                'throughput_rps': round(count / duration, 2),
+                'latency_ms': summarize(self.latency[name]),
+                'service_ms': summarize(self.service[name]),
+                'status_codes': dict(self.statuses[name]),
+                'error_samples': self.error_samples[name],
+            }
+        all_latency = [value for samples in self.latency.values() for value in samples]
+        return {
+            'totals': {
+                'requests': total_requests,
+                'errors': total_errors,
+                'error_rate': round(total_errors / total_requests, 4) if total_requests else 0.0,
+                'throughput_rps': round(total_requests / duration, 2),
+                'dropped': self.dropped,
+                'latency_ms': summarize(all_latency),
+            },
+            'endpoints': endpoints,
+            'client': {'max_dispatch_lag_ms': round(self.max_dispatch_lag * 1000, 2)},
+        }
+
+
+class SharedTickets:
+    """IDs conhecidos (criados ou vistos na listagem), alvos de update_ticket"""
+
+    def __init__(self, limit=10000):
+        self._lock = threading.Lock()
+        self._ids = []
+        self._limit = limit
+
+    def add(self, ticket_ids):
+        with self._lock:
+            self._ids.extend(ticket_ids)
+            if len(self._ids) > self._limit:
+                del self._ids[:len(self._ids) - self._limit]
+
+    def pick(self, rng):
+        with self._lock:
+            return rng.choice(self._ids) if self._ids else None
+
+
+class VirtualUser:
+    """Um agente/integração: sessão HTTP própria, token próprio e ETags do último GET"""
+
+    def __init__(self, index, args, recorder, tickets):
+        self.index = index
+        self.args = args
+        self.recorder = recorder
+        self.tickets = tickets
+        self.rng = random.Random(args.seed * 1000 + index)
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        self.etags = {}
+
+    def request(self, name, scheduled, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.args.url}{path}", timeout=self.args.timeout, **kwargs)
+        except requests.RequestException as e:
+            self.recorder.record(name, scheduled, started, time.perf_counter(), 'exception', type(e).__name__)
+            return None
+        # Corpo lido por completo: o tempo inclui a transferência
+        content = response.content
+        finished = time.perf_counter()
+        error = None
+        if response.status_code >= 400:
+            error = f"{response.status_code}: {content[:200].decode('utf-8', 'replace')}"
+        self.recorder.record(name, scheduled, started, finished, response.status_code, error)
+        return response
+
+    def login(self, scheduled):
+        response = self.request('login', scheduled, 'POST', '/api/auth/login',
+                                json={'username': self.args.username, 'password': self.args.password})
+        if response is not None and response.status_code == 200:
+            self.session.headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+            return True
+        return False
+
+    def conditional_get(self, name, scheduled, path):
+        headers = {}
+        if self.args.conditional and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        response = self.request(name, scheduled, 'GET', path, headers=headers)
+        if response is not None and response.status_code == 200 and 'ETag' in response.headers:
+            self.etags[path] = response.headers['ETag']
+        return response
+
+    def list_tickets(self, scheduled):
+        path = '/api/tickets/' + (f'?limit={self.args.list_limit}' if self.args.list_limit else '')
+        response = self.conditional_get('list_tickets', scheduled, path)
+        if response is not None and response.status_code == 200:
+            data = response.json()
+            rows = data['tickets'] if isinstance(data, dict) else data
+            self.tickets.add([row['id'] for row in rows[:50] if row.get('status') == 'pending'])
+
+    def stats_dashboard(self, scheduled):
+        self.conditional_get('stats_dashboard', scheduled, '/api/stats/dashboard')
+
+    def ticket_types(self, scheduled):
+        self.conditional_get('ticket_types', scheduled, '/api/tickets/types')
+
+    def create_ticket(self, scheduled):
+        # Formato de ExternalTicketAPI.create_ticket
+        name = self.rng.choice(NAMES)
+        payload = {
+            'type': self.rng.choice(TICKET_TYPES),
+            'title': f"Carga {self.index}-{self.rng.randrange(10**6)}",
+            'description': 'Chamado gerado pelo teste de carga. ' * self.rng.randint(1, 6),
+            'requester': name,
+            'requester_email': f"{name.split()[0].lower()}@empresa.com",
+            'urgency': self.rng.choice(URGENCIES),
+        }
+        self._created(self.request('create_ticket', scheduled, 'POST', '/api/tickets/', json=payload))
+
+    def webhook_ticket(self, scheduled):
+        # Formatos de WebhookTicketCreator (formulário, email e chatbot)
+        name = self.rng.choice(NAMES)
+        email = f"{name.split()[0].lower()}@empresa.com"
+        source = self.rng.randrange(3)
+        if source == 0:
+            payload = WebhookTicketCreator.form_payload({
+                'nome': name, 'email': email,
+                'categoria': self.rng.choice(FORM_CATEGORIES),
+                'urgencia': self.rng.choice(['baixa', 'media', 'alta']),
+                'problema': 'Problema relatado pelo formulário do teste de carga.',
+            })
+        elif source == 1:
+            payload = WebhookTicketCreator.email_payload({
+                'subject': self.rng.choice(EMAIL_SUBJECTS),
+                'body': 'Boa tarde,\n\nMensagem gerada pelo teste de carga.\n\nObrigado',
+                'from_name': name, 'from_email': email,
+            })
+        else:
+            payload = WebhookTicketCreator.chatbot_payload({
+                'user_name': name, 'user_email': email,
+                'user_message': 'Mensagem do chatbot no teste de carga',
+                'category': self.rng.choice(TICKET_TYPES),
+                'urgency': self.rng.choice(URGENCIES),
+            })
+        self._created(self.request('webhook_ticket', scheduled, 'POST', '/api/tickets/', json=payload))
+
+    def _created(self, response):
+        if response is not None and response.status_code == 201:
+            self.tickets.add([response.json()['id']])
+
+    def update_ticket(self, scheduled):
+        # Mesmas alterações do dashboard: finalizar ou trocar a urgência
+        ticket_id = self.tickets.pick(self.rng)
+        if ticket_id is None:
+            return self.list_tickets(scheduled)
+        if self.rng.random() < 0.3:
+            payload = {'status': 'completed'}
+        else:
+            payload = {'urgency': self.rng.choice(URGENCIES)}
+        self.request('update_ticket', scheduled, 'PUT', f'/api/tickets/{ticket_id}', json=payload)
+
+    def run(self, work, deadline):
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            operation, scheduled = item
+            if time.perf_counter() > deadline:
+                self.recorder.drop(scheduled)
+                continue
+            try:
+                getattr(self, operation)(scheduled)
+            except ValueError as e:
+                # Requisição já registrada; resposta fora do formato esperado
+                print(f"⚠️  {operation}: {e}")
+
+
+def parse_mix(value):
+    mix = dict(DEFAULT_MIX)
+    if value:
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            if name not in DEFAULT_MIX:
+                raise argparse.ArgumentTypeError(f"Operação desconhecida no mix: {name}")
+            mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def dispatch(args, work, recorder, started):
+    """Agenda as operações em ritmo --rate (Poisson ou constante) até o fim da janela"""
+    rng = random.Random(args.seed)
+    operations, weights = zip(*args.mix.items())
+    scheduled = started
+    while True:
+        if args.arrival == 'poisson':
+            scheduled += rng.expovariate(args.rate)
+        else:
+            scheduled += 1 / args.rate
+        if scheduled >= recorder.window_end:
+            return
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            recorder.dispatch_lag(-delay)
+        work.put((rng.choices(operations, weights)[0], scheduled))
+
+
+def start_server(args):
+    """Sobe o gunicorn com gunicorn.conf.py na porta de --url e espera o /api/health"""
+    parsed = urlparse(args.url)
+    env = dict(os.environ, GUNICORN_BIND=f"{parsed.hostname}:{parsed.port or 80}")
+    root = os.path.dirname(os.path.abspath(__file__))
+    print(f"🚀 Iniciando gunicorn em {env['GUNICORN_BIND']}...")
+    process = subprocess.Popen(['gunicorn', '--config', 'gunicorn.conf.py'], cwd=root, env=env)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"❌ gunicorn saiu com código {process.returncode}")
+        try:
+            requests.get(f"{args.url}/api/health", timeout=2)
+            return process
+        except requests.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("❌ Servidor não respondeu em 60 s")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(args):
+    recorder = Recorder()
+    tickets = SharedTickets()
+    users = [VirtualUser(i, args, recorder, tickets) for i in range(args.users)]
+
+    print(f"🔐 Autenticando {args.users} usuários virtuais...")
+    logins = [threading.Thread(target=user.login, args=(0.0,)) for user in users]
+    for thread in logins:
+        thread.start()
+    for thread in logins:
+        thread.join()
+    if not any('Authorization' in user.session.headers for user in users):
+        raise SystemExit("❌ Nenhum usuário virtual conseguiu fazer login")
+
+    work = queue.Queue()
+    started = time.perf_counter()
+    recorder.window_start = started + args.warmup
+    recorder.window_end = recorder.window_start + args.duration
+    deadline = recorder.window_end + args.timeout
+
+    threads = [threading.Thread(target=user.run, args=(work, deadline), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+
+    print(f"🏃 {args.rate:g} req/s por {args.duration:g} s (+{args.warmup:g} s de aquecimento), "
+          f"{args.users} usuários virtuais")
+    dispatch(args, work, recorder, started)
+    for _ in threads:
+        work.put(None)
+    for thread in threads:
+        thread.join()
+
+    result = recorder.report(args.duration)
+    result['meta'] = {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'url': args.url,
+        'rate': args.rate,
+        'arrival': args.arrival,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'users': args.users,
+        'mix': args.mix,
+        'list_limit': args.list_limit,
+        'conditional': args.conditional,
+        'seed': args.seed,
+    }
+    return result
+
+
+def print_report(result):
+    totals = result['totals']
+    print(f"\n📊 {totals['requests']} requisições, {totals['throughput_rps']} req/s, "
+          f"erros {totals['error_rate'] * 100:.2f}%, descartadas {totals['dropped']}")
+    print(f"   {'operação':<16}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'erros':>9}")
+    for name, data in result['endpoints'].items():
+        latency = data['latency_ms']
+        print(f"   {name:<16}{data['throughput_rps']:>9}{latency['p50']:>10}{latency['p95']:>10}"
+              f"{latency['p99']:>10}{data['error_rate'] * 100:>8.2f}%")
+    if result['client']['max_dispatch_lag_ms'] > 50:
+        print(f"⚠️  Gerador atrasou até {result['client']['max_dispatch_lag_ms']} ms: "
+              "o cliente pode ter sido o gargalo")
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    def delta(old, new):
+        if old in (None, 0) or new is None:
+            return '     -'
+        return f"{(new - old) / old * 100:+6.1f}%"
+
+    print(f"📊 {before_path} ({before['meta'].get('git_commit')}) → {after_path} ({after['meta'].get('git_commit')})")
+    print(f"   {'operação':<16}{'req/s':>18}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'erros':>16}")
+    names = sorted(set(before['endpoints']) | set(after['endpoints']))
+    for name in names + ['(total)']:
+        old = before['totals'] if name == '(total)' else before['endpoints'].get(name)
+        new = after['totals'] if name == '(total)' else after['endpoints'].get(name)
+        if not old or not new:
+            print(f"   {name:<16} presente em só uma das execuções")
+            continue
+        cells = [f"{new['throughput_rps']:>10} {delta(old['throughput_rps'], new['throughput_rps'])}"]
+        for key in ('p50', 'p95', 'p99'):
+            cells.append(f"{new['latency_ms'][key]:>10} {delta(old['latency_ms'][key], new['latency_ms'][key])}")
+        cells.append(f"{new['error_rate'] * 100:>6.2f}% ({old['error_rate'] * 100:.2f}%)")
+        print(f"   {name:<16}" + ''.join(f"{cell:>18}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga da API HTTP')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='123456')
+    parser.add_argument('--rate', type=float, default=50, help='requisições por segundo')
+    parser.add_argument('--arrival', choices=['poisson', 'constant'], default='poisson')
+    parser.add_argument('--duration', type=float, default=60, help='segundos medidos')
+    parser.add_argument('--warmup', type=float, default=10, help='segundos iniciais fora da medição')
+    parser.add_argument('--users', type=int, default=50, help='usuários virtuais (conexões simultâneas)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(''),
+                        help='pesos, ex.: list_tickets=50,create_ticket=5 (operações: ' + ', '.join(DEFAULT_MIX) + ')')
+    parser.add_argument('--list-limit', type=int, default=100,
+                        help='?limit= da listagem (0 = lista completa, como o dashboard)')
+    parser.add_argument('--no-conditional', dest='conditional', action='store_false',
+                        help='não reenviar ETag (If-None-Match) nos GETs')
+    parser.add_argument('--timeout', type=float, default=30, help='timeout por requisição (s)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--start-server', action='store_true', help='sobe o gunicorn local antes do teste')
+    parser.add_argument('--output', help='arquivo JSON com o resultado')
+    parser.add_argument('--compare', nargs=2, metavar=('ANTES', 'DEPOIS'), help='compara dois resultados e sai')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    args.url = args.url.rstrip('/')
+    server = start_server(args) if args.start_server else None
+    try:
+        result = run(args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=40)
+
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"💾 Resultado salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+App ASGI: leituras do dashboard em asyncio + asyncpg, demais rotas no Flask
+
+GET /api/tickets/, /api/tickets/types, /api/stats/ e /api/stats/dashboard
+seguem o mesmo contrato das rotas Flask (filtros, paginação, ETag/304,
+formato JSON), mas esperam o PostgreSQL sem ocupar uma thread: um processo
+mantém milhares de conexões abertas. Todo o resto é repassado ao app Flask.
+
+Uso:
+    uvicorn src.asgi:app --host 0.0.0.0 --port 5000
+    GUNICORN_APP=src.asgi:app GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker \\
+        gunicorn --config gunicorn.conf.py
+"""
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.http import http_date, parse_date, parse_etags, quote_etag
+from contextlib import asynccontextmanager
+from datetime import timezone
+import asyncio
+import contextvars
+import jwt
+import os
+import time
+
+from src.main import app as flask_app
+from src.models.async_postgres import (
+    open_async_pool, close_async_pool, get_async_pool, to_asyncpg
+)
+from src.models.db_instrumentation import log_slow_query
+from src.models.ticket_types import ticket_type_catalog, TICKET_TYPES_SQL
+from src.routes.auth import authenticate_token
+from src.routes.stats import (
+    cached_async, AGGREGATE_STATS_SQL, COMPLETED_TODAY_SQL, VERSION_CACHE_KEY,
+    summarize_ticket_aggregates, build_stats_payload, build_dashboard_payload
+)
+from src.routes.tickets import build_listing_query, encode_cursor
+from src.utils.conditional import (
+    TICKETS_VERSION_SQL, build_validators, evaluate_preconditions
+)
+from src.utils.metrics import (
+    http_requests_total, http_request_duration, db_query_duration, db_rows_total
+)
+from src.utils.query_stats import query_stats
+
+# Threads que atendem as rotas Flask (síncronas) dentro do app ASGI
+WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', '16'))
+
+# Endpoint da requisição atual, usado como label das métricas de consulta
+_endpoint = contextvars.ContextVar('endpoint', default='background')
+
+
+class AuthError(Exception):
+    pass
+
+
+def json_response(payload, status_code=200):
+    return Response(flask_app.json.dumps(payload), status_code=status_code,
+                    media_type='application/json')
+
+
+def error_response(message, status_code):
+    return json_response({'message': message}, status_code)
+
+
+async def authenticate(request):
+    """Equivalente assíncrono de token_required; retorna o usuário ou levanta AuthError"""
+    auth_header = request.headers.get('authorization')
+    if not auth_header:
+        raise AuthError('Token não fornecido')
+    parts = auth_header.split(' ')
+    if len(parts) < 2 or not parts[1]:
+        raise AuthError('Token inválido')
+
+    def resolve():
+        # Cache de usuários e tokens é o mesmo do Flask; falhas de cache
+        # consultam o SQLite, então rodam fora do event loop
+        with flask_app.app_context():
+            return authenticate_token(parts[1])
+
+    try:
+        user = await run_in_threadpool(resolve)
+    except jwt.ExpiredSignatureError:
+        raise AuthError('Token expirado')
+    except jwt.InvalidTokenError:
+        raise AuthError('Token inválido')
+    if not user:
+        raise AuthError('Usuário inválido')
+    return user
+
+
+def set_validators(response, etag, last_modified):
+    response.headers['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified.replace(tzinfo=timezone.utc))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def is_not_modified(request, version, etag, last_modified):
+    return evaluate_preconditions(
+        version, etag, last_modified,
+        parse_etags(request.headers.get('if-none-match')),
+        parse_date(request.headers.get('if-modified-since')),
+        flask_app.config.get('CONDITIONAL_GET_GRACE', 5),
+    )
+
+
+def acquire():
+    return get_async_pool().acquire(timeout=flask_app.config.get('POSTGRES_POOL_TIMEOUT', 5.0))
+
+
+async def timed(coro, query):
+    """
+    Registra a duração e as linhas da consulta nas mesmas métricas e
+    agregados por fingerprint do Flask (sem captura de EXPLAIN)
+    """
+    started = time.perf_counter()
+    try:
+        result = await coro
+    finally:
+        elapsed = time.perf_counter() - started
+        endpoint = _endpoint.get()
+        db_query_duration.observe(elapsed, endpoint)
+        fingerprint, normalized = query_stats.record(query, elapsed, endpoint)
+        if elapsed >= flask_app.config.get('SLOW_QUERY_MS', 500) / 1000:
+            query_stats.mark_slow(fingerprint)
+            log_slow_query(elapsed, endpoint, fingerprint, normalized)
+    if isinstance(result, list) and result:
+        db_rows_total.inc(_endpoint.get(), amount=len(result))
+    return result
+
+
+async def fetch(query, *params):
+    """Executa a consulta em uma conexão própria do pool (para asyncio.gather)"""
+    async with acquire() as conn:
+        return await timed(conn.fetch(query, *params), query)
+
+
+async def types_snapshot():
+    """Catálogo de tipos compartilhado com o Flask, recarregado via asyncpg"""
+    if not ticket_type_catalog.is_fresh():
+        rows = await fetch(TICKET_TYPES_SQL)
+        ticket_type_catalog.store([dict(row) for row in rows])
+    return ticket_type_catalog.snapshot()
+
+
+async def fetch_version():
+    async with acquire() as conn:
+        return await timed(conn.fetchrow(TICKETS_VERSION_SQL), TICKETS_VERSION_SQL)
+
+
+def endpoint(name, message):
+    """
+    Autenticação, app context do Flask, métricas e tratamento de erro das
+    rotas assíncronas; `name` segue o formato do Flask ("tickets.get_tickets")
+    """
+    blueprint = name.split('.')[0]
+
+    def decorator(handler):
+        async def wrapped(request):
+            started = time.perf_counter()
+            token = _endpoint.set(name)
+            try:
+                response = await dispatch(request)
+            finally:
+                _endpoint.reset(token)
+            http_request_duration.observe(time.perf_counter() - started, blueprint, name, request.method)
+            http_requests_total.inc(blueprint, name, request.method, str(response.status_code))
+            return response
+
+        async def dispatch(request):
+            with flask_app.app_context():
+                try:
+                    user = await authenticate(request)
+                except AuthError as e:
+                    return error_response(str(e), 401)
+                try:
+                    return await handler(request, user)
+                except Exception as e:
+                    return error_response(f'{message}: {str(e)}', 500)
+
+        return wrapped
+    return decorator
+
+
+@endpoint('tickets.get_tickets', 'Erro ao buscar tickets')
+async def get_tickets(request, current_user):
+    try:
+        query, params, limit = build_listing_query(request.query_params)
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    # Versão e catálogo de tipos são independentes
+    (_, _, types_etag), version = await asyncio.gather(types_snapshot(), fetch_version())
+    etag, last_modified = build_validators(version, 'tickets', types_etag, request.url.query)
+    if is_not_modified(request, version, etag, last_modified):
+        return set_validators(Response(status_code=304), etag, last_modified)
+
+    tickets = [dict(row) for row in await fetch(to_asyncpg(query), *params)]
+
+    if limit is None:
+        payload = tickets
+    else:
+        next_cursor = None
+        if len(tickets) > limit:
+            tickets = tickets[:limit]
+            next_cursor = encode_cursor(tickets[-1])
+        payload = {'tickets': tickets, 'next_cursor': next_cursor}
+
+    return set_validators(json_response(payload), etag, last_modified)
+
+
+@endpoint('tickets.get_ticket_types', 'Erro ao buscar tipos')
+async def get_ticket_types(request, current_user):
+    _, body, etag = await types_snapshot()
+    if parse_etags(request.headers.get('if-none-match')).contains(etag):
+        response = Response(status_code=304)
+    else:
+        response = Response(body, media_type='application/json')
+    response.headers['ETag'] = quote_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+async def compute_stats():
+    aggregate_rows, (type_rows, _, _) = await asyncio.gather(
+        fetch(AGGREGATE_STATS_SQL), types_snapshot()
+    )
+    return build_stats_payload(summarize_ticket_aggregates(aggregate_rows), type_rows)
+
+
+async def compute_dashboard_stats():
+    aggregate_rows, completed_rows = await asyncio.gather(
+        fetch(AGGREGATE_STATS_SQL), fetch(COMPLETED_TODAY_SQL)
+    )
+    return build_dashboard_payload(
+        summarize_ticket_aggregates(aggregate_rows),
+        [dict(row) for row in completed_rows]
+    )
+
+
+async def fetch_version_and_types():
+    (_, _, types_etag), version = await asyncio.gather(types_snapshot(), fetch_version())
+    return version, types_etag
+
+
+async def stats_response(request, resource, compute):
+    """Mesma validação e cache de src.routes.stats._conditional_response"""
+    version, types_etag = await cached_async(VERSION_CACHE_KEY, fetch_version_and_types)
+    etag, last_modified = build_validators(version, resource, types_etag)
+    if is_not_modified(request, version, etag, last_modified):
+        return set_validators(Response(status_code=304), etag, last_modified)
+
+    payload = await cached_async(f'{resource}:{etag}', compute)
+    return set_validators(json_response(payload), etag, last_modified)
+
+
+@endpoint('stats.get_stats', 'Erro ao buscar estatísticas')
+async def get_stats(request, current_user):
+    return await stats_response(request, 'stats', compute_stats)
+
+
+@endpoint('stats.get_dashboard_stats', 'Erro ao buscar estatísticas')
+async def get_dashboard_stats(request, current_user):
+    return await stats_response(request, 'dashboard', compute_dashboard_stats)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await open_async_pool(flask_app.config)
+    try:
+        yield
+    finally:
+        await close_async_pool()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/tickets/', get_tickets, methods=['GET']),
+        Route('/api/tickets/types', get_ticket_types, methods=['GET']),
+        Route('/api/stats/', get_stats, methods=['GET']),
+        Route('/api/stats/dashboard', get_dashboard_stats, methods=['GET']),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=WSGI_THREADS)),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'],
+                   allow_headers=['Content-Type', 'Authorization'], allow_methods=['*']),
+    ],
+    lifespan=lifespan,
+)
@@ -10,8 +10,11 @@ from src.models.user import db
 from src.routes.auth import auth_bp
 from src.routes.tickets import tickets_bp
 from src.routes.stats import stats_bp
+from src.routes.metrics import metrics_bp, instrument_app
+from src.utils.serialization import TicketJSONProvider
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+app.json = TicketJSONProvider(app)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 
 # Configurar CORS
@@ -21,6 +24,8 @@ CORS(app, origins="*", allow_headers=["Content-Type", "Authorization"])
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(tickets_bp, url_prefix='/api/tickets')
 app.register_blueprint(stats_bp, url_prefix='/api/stats')
+app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
+instrument_app(app)
 
 # Configuração do SQLite para autenticação
 # Criar diretório database se não existir
@@ -36,6 +41,77 @@ app.config['POSTGRES_PORT'] = os.environ.get('POSTGRES_PORT', '5432')
 app.config['POSTGRES_DB'] = os.environ.get('POSTGRES_DB', 'dashboard_suporte')
 app.config['POSTGRES_USER'] = os.environ.get('POSTGRES_USER', 'postgres')
 app.config['POSTGRES_PASSWORD'] = os.environ.get('POSTGRES_PASSWORD', 'password')
+app.config['POSTGRES_CONNECT_TIMEOUT'] = int(os.environ.get('POSTGRES_CONNECT_TIMEOUT', '10'))
+
+# Pool de conexões PostgreSQL (por processo)
+app.config['POSTGRES_POOL_MIN'] = int(os.environ.get('POSTGRES_POOL_MIN', '1'))
+app.config['POSTGRES_POOL_MAX'] = int(os.environ.get('POSTGRES_POOL_MAX', '10'))
+app.config['POSTGRES_POOL_TIMEOUT'] = float(os.environ.get('POSTGRES_POOL_TIMEOUT', '5'))
+app.config['POSTGRES_POOL_VALIDATE_AFTER'] = float(os.environ.get('POSTGRES_POOL_VALIDATE_AFTER', '30'))
+
+# Pool asyncpg do app ASGI (src/asgi.py); cache de prepared statements
+# precisa ser 0 atrás de PgBouncer em modo transaction
+app.config['ASYNC_POSTGRES_POOL_MIN'] = int(os.environ.get('ASYNC_POSTGRES_POOL_MIN', '1'))
+app.config['ASYNC_POSTGRES_POOL_MAX'] = int(os.environ.get('ASYNC_POSTGRES_POOL_MAX', '20'))
+app.config['ASYNC_POSTGRES_STATEMENT_CACHE_SIZE'] = int(os.environ.get('ASYNC_POSTGRES_STATEMENT_CACHE_SIZE', '0'))
+
+# Cache das respostas de /api/stats (segundos; 0 desativa)
+app.config['STATS_CACHE_TTL'] = float(os.environ.get('STATS_CACHE_TTL', '10'))
+app.config['STATS_CACHE_STALE_TTL'] = float(os.environ.get('STATS_CACHE_STALE_TTL', '30'))
+
+# Catálogo de ticket_types em memória (segundos até recarregar)
+app.config['TICKET_TYPES_TTL'] = float(os.environ.get('TICKET_TYPES_TTL', '300'))
+
+# Limite de itens em POST /api/tickets/bulk
+app.config['TICKETS_BULK_MAX'] = int(os.environ.get('TICKETS_BULK_MAX', '1000'))
+
+# Intervalo (segundos) entre keep-alives de /api/tickets/stream
+app.config['TICKET_STREAM_HEARTBEAT'] = float(os.environ.get('TICKET_STREAM_HEARTBEAT', '15'))
+
+# Streams SSE simultâneos por processo; acima disso /api/tickets/stream responde
+# 503 com Retry-After. Cada stream ocupa uma thread do servidor (GUNICORN_THREADS
+# no gthread, ASGI_WSGI_THREADS no worker uvicorn): o padrão usa todas menos
+# TICKET_STREAM_RESERVED_THREADS, que ficam para as demais rotas. A capacidade
+# total é WEB_CONCURRENCY x TICKET_STREAM_MAX: aumente GUNICORN_THREADS para
+# cobrir os dashboards abertos ao mesmo tempo
+if 'uvicorn' in os.environ.get('GUNICORN_WORKER_CLASS', '').lower():
+    _server_threads = int(os.environ.get('ASGI_WSGI_THREADS', '16'))
+else:
+    _server_threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+_reserved_threads = int(os.environ.get('TICKET_STREAM_RESERVED_THREADS', '2'))
+app.config['TICKET_STREAM_MAX'] = int(os.environ.get(
+    'TICKET_STREAM_MAX', max(1, _server_threads - _reserved_threads)
+))
+app.config['TICKET_STREAM_RETRY_AFTER'] = int(os.environ.get('TICKET_STREAM_RETRY_AFTER', '30'))
+
+# Segundos que um usuário autenticado fica em cache (0 desativa). Mudanças
+# feitas por este processo invalidam na hora; os outros workers só as veem
+# quando a entrada expira, então um usuário desativado ou rebaixado ainda é
+# aceito por até AUTH_USER_CACHE_TTL segundos neles
+app.config['AUTH_USER_CACHE_TTL'] = float(os.environ.get('AUTH_USER_CACHE_TTL', '5'))
+
+# Validade (segundos) dos tickets de POST /api/auth/stream-ticket
+app.config['STREAM_TICKET_TTL'] = int(os.environ.get('STREAM_TICKET_TTL', '30'))
+
+# Linhas buscadas por lote no cursor server-side de /api/tickets/export
+app.config['TICKETS_EXPORT_BATCH'] = int(os.environ.get('TICKETS_EXPORT_BATCH', '2000'))
+
+# Token exigido em /api/metrics (vazio = aberto, como /api/health)
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')
+
+# Diretório onde cada worker grava suas métricas a cada METRICS_SNAPSHOT_INTERVAL
+# segundos para que /api/metrics some todos (gunicorn.conf.py define um padrão)
+app.config['METRICS_MULTIPROC_DIR'] = os.environ.get('METRICS_MULTIPROC_DIR', '')
+app.config['METRICS_SNAPSHOT_INTERVAL'] = float(os.environ.get('METRICS_SNAPSHOT_INTERVAL', '5'))
+
+# Instruções mais lentas que isso (ms) vão para o log de consultas lentas;
+# com SLOW_QUERY_EXPLAIN_INTERVAL > 0 o plano delas é capturado no máximo uma
+# vez por fingerprint a cada intervalo (segundos)
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', '500'))
+app.config['SLOW_QUERY_EXPLAIN_INTERVAL'] = float(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', '0'))
+
+# Mudanças mais recentes que isso (segundos) não geram 304 em GET condicional
+app.config['CONDITIONAL_GET_GRACE'] = float(os.environ.get('CONDITIONAL_GET_GRACE', '5'))
 
 db.init_app(app)
 with app.app_context():
@@ -51,13 +127,22 @@ def health_check():
             db.session.execute('SELECT 1')
         
         # Testar conexão PostgreSQL
-        from src.models.postgres_connection import test_postgres_connection
+        from src.models.postgres_connection import test_postgres_connection, get_pool_stats
+        from src.routes.stats import stats_cache
+        from src.routes.auth import get_auth_cache_stats
+        from src.models.async_postgres import get_async_pool_stats
+        from src.models.ticket_events import ticket_events
         postgres_ok = test_postgres_connection()
-        
+
         return {
             'status': 'healthy',
             'sqlite': 'ok',
             'postgresql': 'ok' if postgres_ok else 'error',
+            'postgres_pool': get_pool_stats(),
+            'async_postgres_pool': get_async_pool_stats(),
+            'stats_cache': stats_cache.stats(),
+            'auth_cache': get_auth_cache_stats(),
+            'ticket_stream': ticket_events.stats(),
             'timestamp': datetime.utcnow().isoformat()
         }, 200
     except Exception as e:
@@ -85,7 +170,7 @@ def serve(path):
 
 
 if __name__ == '__main__':
-    # Configuração para produção
+    # Servidor de desenvolvimento; em produção use gunicorn (gunicorn.conf.py)
     debug_mode = os.environ.get('FLASK_ENV') == 'development'
     app.run(host='0.0.0.0', port=5000, debug=debug_mode)
 
@@ -0,0 +1,69 @@
+import asyncpg
+import re
+
+# Placeholders do psycopg2 (%s) viram posicionais do asyncpg ($1, $2, ...)
+_PLACEHOLDER = re.compile(r'%s|%%')
+
+_pool = None
+
+
+def to_asyncpg(query):
+    """Converte uma consulta escrita para o psycopg2 para o formato do asyncpg"""
+    counter = 0
+
+    def replace(match):
+        nonlocal counter
+        if match.group() == '%%':
+            return '%'
+        counter += 1
+        return f'${counter}'
+
+    return _PLACEHOLDER.sub(replace, query)
+
+
+async def open_async_pool(config):
+    """Cria o pool asyncpg do event loop atual a partir da config do Flask"""
+    global _pool
+
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            host=config.get('POSTGRES_HOST', 'localhost'),
+            port=int(config.get('POSTGRES_PORT', '5432')),
+            database=config.get('POSTGRES_DB', 'dashboard_suporte'),
+            user=config.get('POSTGRES_USER', 'postgres'),
+            password=config.get('POSTGRES_PASSWORD', 'password'),
+            timeout=config.get('POSTGRES_CONNECT_TIMEOUT', 10),
+            min_size=config.get('ASYNC_POSTGRES_POOL_MIN', 1),
+            max_size=config.get('ASYNC_POSTGRES_POOL_MAX', 20),
+            # 0 é necessário atrás de PgBouncer em modo transaction (pooler do Supabase)
+            statement_cache_size=config.get('ASYNC_POSTGRES_STATEMENT_CACHE_SIZE', 0),
+        )
+    return _pool
+
+
+async def close_async_pool():
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_async_pool():
+    if _pool is None:
+        raise RuntimeError('Pool asyncpg não inicializado (o app ASGI não foi iniciado)')
+    return _pool
+
+
+def get_async_pool_stats():
+    """Estatísticas do pool asyncpg ou None fora do modo ASGI"""
+    if _pool is None:
+        return None
+    size = _pool.get_size()
+    idle = _pool.get_idle_size()
+    return {
+        'min': _pool.get_min_size(),
+        'max': _pool.get_max_size(),
+        'in_use': size - idle,
+        'idle': idle,
+    }
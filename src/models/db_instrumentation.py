@@ -0,0 +1,119 @@
+from psycopg2.extras import RealDictCursor
+from psycopg2.extensions import cursor as plain_cursor, TRANSACTION_STATUS_INERROR
+from flask import current_app, has_app_context, has_request_context, request
+from src.utils.metrics import db_query_duration, db_rows_total
+from src.utils.query_stats import query_stats
+import re
+import time
+
+# Só leituras podem ser reexecutadas por EXPLAIN ANALYZE sem efeitos colaterais
+_EXPLAINABLE = ('select ', 'with ')
+_WRITES = re.compile(r'\b(insert|update|delete|merge|for share)\b')
+# Nomes seguidos de "(": funções chamadas (e palavras-chave como IN/VALUES,
+# que não existem em pg_proc e não atrapalham a verificação)
+_FUNCTION_CALLS = re.compile(r'([a-z_][a-z0-9_$]*)\s*\(')
+# SELECT rebuild_ticket_counters() é uma leitura para o texto, mas a função
+# escreve: instruções que chamam funções voláteis não são explicadas
+VOLATILE_FUNCTIONS_SQL = """
+    SELECT proname FROM pg_proc WHERE proname = ANY(%s) AND provolatile = 'v' LIMIT 1
+"""
+
+
+def _current_endpoint():
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+
+def _slow_query_settings():
+    """(limite em segundos, intervalo da captura automática de planos ou None)"""
+    if not has_app_context():
+        return 0.5, None
+    config = current_app.config
+    interval = config.get('SLOW_QUERY_EXPLAIN_INTERVAL', 0)
+    return config.get('SLOW_QUERY_MS', 500) / 1000, interval if interval > 0 else None
+
+
+def is_explainable(normalized):
+    text = normalized.lower()
+    return text.startswith(_EXPLAINABLE) and not _WRITES.search(text)
+
+
+def called_functions(normalized):
+    return sorted(set(_FUNCTION_CALLS.findall(normalized.lower())))
+
+
+def log_slow_query(elapsed, endpoint, fingerprint, normalized):
+    # Só o texto normalizado: valores dos parâmetros nunca vão para o log
+    print(f"🐢 Consulta lenta: {elapsed * 1000:.1f} ms endpoint={endpoint} fingerprint={fingerprint} {normalized}")
+
+
+class InstrumentedCursor(RealDictCursor):
+    """
+    RealDictCursor que mede cada execute, conta as linhas devolvidas e
+    alimenta os agregados por fingerprint (src.utils.query_stats)
+
+    Instruções acima de SLOW_QUERY_MS vão para o log. O plano
+    `EXPLAIN (ANALYZE, BUFFERS)` é capturado na próxima execução de um
+    fingerprint armado em POST /api/metrics/queries/explain ou, com
+    SLOW_QUERY_EXPLAIN_INTERVAL > 0, de instruções lentas (no máximo um
+    plano por fingerprint a cada intervalo). Só leituras que não chamam
+    funções voláteis são explicadas, porque o ANALYZE executa a instrução
+    de novo.
+    """
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = super().execute(query, vars)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            endpoint = _current_endpoint()
+            db_query_duration.observe(elapsed, endpoint)
+            # description só existe quando a instrução devolve linhas
+            if self.description is not None and self.rowcount > 0:
+                db_rows_total.inc(endpoint, amount=self.rowcount)
+
+            fingerprint, normalized = query_stats.record(query, elapsed, endpoint)
+            threshold, explain_interval = _slow_query_settings()
+            slow = elapsed >= threshold
+            if slow:
+                query_stats.mark_slow(fingerprint)
+                log_slow_query(elapsed, endpoint, fingerprint, normalized)
+            if not failed and query_stats.should_explain(fingerprint, slow, explain_interval):
+                self._capture_plan(query, vars, fingerprint, normalized)
+
+    def _capture_plan(self, query, vars, fingerprint, normalized):
+        if not is_explainable(normalized):
+            return
+        if self.connection.info.transaction_status == TRANSACTION_STATUS_INERROR:
+            return
+        prefix = b'EXPLAIN (ANALYZE, BUFFERS) ' if isinstance(query, bytes) else 'EXPLAIN (ANALYZE, BUFFERS) '
+        # Cursor simples e separado: não entra nas métricas e não descarta as
+        # linhas ainda não lidas deste cursor. O savepoint impede que uma
+        # falha no EXPLAIN aborte a transação da rota e é sempre desfeito, para
+        # que nada do que o ANALYZE executou chegue ao COMMIT.
+        savepoint = not self.connection.autocommit
+        with self.connection.cursor(cursor_factory=plain_cursor) as explain:
+            try:
+                if savepoint:
+                    explain.execute('SAVEPOINT query_stats_explain')
+                explain.execute(VOLATILE_FUNCTIONS_SQL, (called_functions(normalized),))
+                volatile = explain.fetchone()
+                if volatile:
+                    plan = f'(sem plano: a instrução chama a função volátil {volatile[0]}(), que o ANALYZE executaria de novo)'
+                else:
+                    explain.execute(prefix + query, vars)
+                    plan = '\n'.join(row[0] for row in explain.fetchall())
+                if savepoint:
+                    explain.execute('ROLLBACK TO SAVEPOINT query_stats_explain')
+                    explain.execute('RELEASE SAVEPOINT query_stats_explain')
+            except Exception as e:
+                print(f"Erro ao capturar plano {fingerprint}: {e}")
+                if savepoint:
+                    explain.execute('ROLLBACK TO SAVEPOINT query_stats_explain')
+                return
+        query_stats.store_plan(fingerprint, plan)
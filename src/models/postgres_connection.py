@@ -1,37 +1,260 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+from src.models.db_instrumentation import InstrumentedCursor
+from src.utils.metrics import db_connect_duration, db_pool_wait_duration
 from contextlib import contextmanager
+from collections import deque
 from flask import current_app
 import os
+import threading
+import time
+
+
+class PoolTimeoutError(PoolError):
+    """Nenhuma conexão ficou livre dentro do tempo de espera configurado"""
+
+
+class PostgresPool:
+    """Pool de conexões PostgreSQL compartilhado por todas as threads do processo"""
+
+    def __init__(self, connect_kwargs, minconn=1, maxconn=10, timeout=5.0, validate_after=30.0):
+        """
+        Args:
+            connect_kwargs: Parâmetros repassados ao psycopg2.connect
+            minconn: Conexões abertas na criação do pool
+            maxconn: Limite de conexões abertas (em uso + ociosas)
+            timeout: Segundos que um checkout espera por uma conexão livre
+            validate_after: Conexões ociosas há mais tempo que isso recebem
+                um SELECT 1 antes de serem entregues (0 = sempre)
+        """
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError('Tamanho de pool inválido')
+
+        self._connect_kwargs = dict(connect_kwargs)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.validate_after = validate_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conexão, instante em que voltou ao pool)
+        self._in_use = 0
+        self._closed = False
+
+        # Contadores expostos em stats()
+        self._created = 0
+        self._discarded = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        started = time.perf_counter()
+        conn = psycopg2.connect(cursor_factory=InstrumentedCursor, **self._connect_kwargs)
+        db_connect_duration.observe(time.perf_counter() - started)
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_since):
+        """Valida a conexão antes de entregá-la ao chamador"""
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.validate_after:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._discarded += 1
+
+    def getconn(self):
+        """Retira uma conexão do pool, esperando no máximo `timeout` segundos"""
+        deadline = time.monotonic() + self.timeout
+        waited_since = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError('Pool de conexões fechado')
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self._in_use < self.maxconn:
+                    conn, idle_since = None, None
+                    break
+
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self._waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._wait_time += time.monotonic() - waited_since
+                    raise PoolTimeoutError(
+                        f'Nenhuma conexão PostgreSQL livre em {self.timeout}s '
+                        f'({self.maxconn} em uso)'
+                    )
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            waited = time.monotonic() - waited_since if waited_since is not None else 0.0
+            self._wait_time += waited
+
+        db_pool_wait_duration.observe(waited)
+
+        # Validação e abertura de conexão nova acontecem fora do lock
+        try:
+            if conn is not None:
+                if self._is_healthy(conn, idle_since):
+                    return conn
+                self._discard(conn)
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, close=False):
+        """Devolve a conexão ao pool, descartando-a se estiver quebrada"""
+        if not close and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        with self._cond:
+            self._in_use -= 1
+            keep = not close and not conn.closed and not self._closed
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+        if not keep:
+            self._discard(conn)
+
+    def closeall(self):
+        """Fecha todas as conexões ociosas e impede novos checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Retorna um retrato do uso do pool"""
+        with self._cond:
+            return {
+                'min': self.minconn,
+                'max': self.maxconn,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'created': self._created,
+                'discarded': self._discarded,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'wait_time_seconds': round(self._wait_time, 6),
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def connection_kwargs(config):
+    """Parâmetros de psycopg2.connect a partir da config do Flask"""
+    return {
+        'host': config.get('POSTGRES_HOST', 'localhost'),
+        'port': config.get('POSTGRES_PORT', '5432'),
+        'database': config.get('POSTGRES_DB', 'dashboard_suporte'),
+        'user': config.get('POSTGRES_USER', 'postgres'),
+        'password': config.get('POSTGRES_PASSWORD', 'password'),
+        'connect_timeout': config.get('POSTGRES_CONNECT_TIMEOUT', 10),
+    }
+
+
+def get_pool():
+    """Retorna o pool do processo atual, criando-o a partir da config do Flask"""
+    global _pool, _pool_pid
+
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid == pid:
+            return _pool
+
+        # Após um fork as conexões herdadas pertencem ao processo pai:
+        # abandona o pool antigo sem fechar os sockets compartilhados
+        config = current_app.config
+        _pool = PostgresPool(
+            connection_kwargs(config),
+            minconn=config.get('POSTGRES_POOL_MIN', 1),
+            maxconn=config.get('POSTGRES_POOL_MAX', 10),
+            timeout=config.get('POSTGRES_POOL_TIMEOUT', 5.0),
+            validate_after=config.get('POSTGRES_POOL_VALIDATE_AFTER', 30.0),
+        )
+        _pool_pid = pid
+        return _pool
+
+
+def close_pool():
+    """Fecha o pool do processo atual (ex.: no desligamento do worker)"""
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
+
+
+def get_pool_stats():
+    """Estatísticas do pool atual ou None se ainda não foi criado"""
+    if _pool is None or _pool_pid != os.getpid():
+        return None
+    return _pool.stats()
+
 
 @contextmanager
 def get_postgres_connection():
-    """Context manager para conexão com PostgreSQL"""
-    conn = None
+    """Context manager para conexão com PostgreSQL (emprestada do pool)"""
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
     try:
-        # Construir URL de conexão
-        host = current_app.config.get('POSTGRES_HOST', 'localhost')
-        port = current_app.config.get('POSTGRES_PORT', '5432')
-        database = current_app.config.get('POSTGRES_DB', 'dashboard_suporte')
-        user = current_app.config.get('POSTGRES_USER', 'postgres')
-        password = current_app.config.get('POSTGRES_PASSWORD', 'password')
-        
-        conn = psycopg2.connect(
-            host=host,
-            port=port,
-            database=database,
-            user=user,
-            password=password,
-            cursor_factory=RealDictCursor
-        )
         yield conn
     except Exception as e:
-        if conn:
-            conn.rollback()
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
         raise e
     finally:
-        if conn:
-            conn.close()
+        pool.putconn(conn, close=broken)
 
 def test_postgres_connection():
     """Testa a conexão com PostgreSQL"""
@@ -43,4 +266,3 @@ def test_postgres_connection():
     except Exception as e:
         print(f"Erro na conexão PostgreSQL: {e}")
         return False
-
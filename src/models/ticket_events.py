@@ -0,0 +1,206 @@
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from collections import deque
+from src.models.ticket_partitions import fetch_tickets_created_at
+from src.utils.serialization import json_default
+import json
+import os
+import select
+import threading
+import time
+
+CHANNEL = 'ticket_changes'
+
+# Evento enviado quando o cliente pode ter perdido mudanças (fila cheia ou
+# reconexão do listener): ele deve recarregar a lista completa
+RESYNC_EVENT = {'kind': 'resync'}
+
+
+class StreamLimitError(Exception):
+    """O processo já atende o número máximo de streams simultâneos"""
+
+
+def format_sse(event, event_id=None):
+    """Formata um evento no protocolo text/event-stream"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f"event: {'resync' if event['kind'] == 'resync' else 'ticket'}")
+    lines.append(f'data: {json.dumps(event, default=json_default)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """Fila de eventos de um cliente SSE"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.closed = False
+        self._events = deque()
+        self._cond = threading.Condition()
+
+    def push(self, event):
+        """Enfileira o evento; retorna False se o cliente ficou para trás e foi encerrado"""
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self._events) >= self.maxsize:
+                # Cliente lento: descarta o atraso e pede recarga completa
+                self._events.clear()
+                self._events.append((None, RESYNC_EVENT))
+                self.closed = True
+                self._cond.notify()
+                return False
+            self._events.append(event)
+            self._cond.notify()
+            return True
+
+    def get(self, timeout):
+        """Retorna (id, evento) ou None se nada chegou dentro do timeout"""
+        with self._cond:
+            if not self._events:
+                self._cond.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+
+class TicketEventBroadcaster:
+    """
+    Escuta NOTIFY ticket_changes em uma única conexão dedicada e distribui
+    os eventos para todos os clientes SSE conectados neste processo
+
+    Cada lote de notificações é enriquecido com uma única consulta (linha
+    completa do ticket + type_name), feita uma vez para todos os clientes.
+    """
+
+    def __init__(self, queue_size=1000, poll_interval=5.0, reconnect_delay=2.0):
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._thread = None
+        self._pid = None
+        self._connect_kwargs = None
+        self._next_id = 0
+        self._published = 0
+        self._dropped = 0
+        self._rejected = 0
+
+    def subscribe(self, connect_kwargs, max_subscribers=None):
+        """
+        Registra um cliente e garante que o listener está rodando
+
+        Cada stream ocupa uma thread do servidor enquanto está aberto; com
+        max_subscribers clientes já conectados levanta StreamLimitError.
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._ensure_listener(connect_kwargs)
+            if max_subscribers is not None and len(self._subscriptions) >= max_subscribers:
+                self._rejected += 1
+                raise StreamLimitError(f'Limite de {max_subscribers} streams atingido')
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _ensure_listener(self, connect_kwargs):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        # Após um fork a thread do pai não existe no filho
+        if self._pid != pid:
+            self._subscriptions = set()
+        self._connect_kwargs = dict(connect_kwargs)
+        self._pid = pid
+        self._thread = threading.Thread(target=self._run, name='ticket-events-listener', daemon=True)
+        self._thread.start()
+
+    def _publish(self, event):
+        with self._lock:
+            self._next_id += 1
+            item = (self._next_id, event)
+            self._published += 1
+            for subscription in list(self._subscriptions):
+                if not subscription.push(item):
+                    self._subscriptions.discard(subscription)
+                    self._dropped += 1
+
+    def _run(self):
+        first_connection = True
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(cursor_factory=RealDictCursor, **self._connect_kwargs)
+                conn.set_session(autocommit=True)
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {CHANNEL}")
+
+                # Mudanças feitas enquanto o listener estava fora foram perdidas
+                if not first_connection:
+                    self._publish(RESYNC_EVENT)
+                first_connection = False
+
+                while True:
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    notifications = []
+                    while conn.notifies:
+                        notifications.append(conn.notifies.pop(0))
+                    if notifications:
+                        for event in self._build_events(cursor, notifications):
+                            self._publish(event)
+            except Exception as e:
+                print(f"Erro no listener de tickets ({CHANNEL}): {e}")
+                time.sleep(self.reconnect_delay)
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
+
+    def _build_events(self, cursor, notifications):
+        """Converte notificações em eventos com a linha atual do ticket"""
+        changes = []
+        for notification in notifications:
+            try:
+                payload = json.loads(notification.payload)
+                changes.append((int(payload['id']), payload['kind']))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        ids = list({ticket_id for ticket_id, kind in changes if kind != 'deleted'})
+        rows = {}
+        if ids:
+            cursor.execute("""
+                SELECT t.*, tt.name as type_name
+                FROM tickets t
+                LEFT JOIN ticket_types tt ON t.type_id = tt.id
+                WHERE t.id = ANY(%s) AND t.created_at = ANY(%s::timestamp[])
+            """, (ids, fetch_tickets_created_at(cursor, ids)))
+            rows = {row['id']: dict(row) for row in cursor.fetchall()}
+
+        events = []
+        for ticket_id, kind in changes:
+            event = {'kind': kind, 'id': ticket_id}
+            if kind != 'deleted':
+                ticket = rows.get(ticket_id)
+                if ticket is None:
+                    # Removido antes de o evento ser processado
+                    continue
+                event['ticket'] = ticket
+            events.append(event)
+        return events
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscriptions) if self._pid == os.getpid() else 0,
+                'published': self._published,
+                'dropped_subscribers': self._dropped,
+                'rejected_subscribers': self._rejected,
+            }
+
+
+ticket_events = TicketEventBroadcaster()
@@ -0,0 +1,22 @@
+# created_at (chave de partição de tickets) a partir do id, em ticket_numbers
+# (não particionada, mantida por trigger). Comandos em tickets só com
+# `id = ...` planejam e travam todas as partições; com o created_at literal no
+# WHERE o planejador abre só a partição do ticket. Id inexistente devolve
+# None, e `created_at = NULL` não encontra linha: o comando responde como
+# "não encontrado".
+TICKET_CREATED_AT_SQL = "SELECT created_at FROM ticket_numbers WHERE ticket_id = %s"
+
+TICKETS_CREATED_AT_SQL = "SELECT created_at FROM ticket_numbers WHERE ticket_id = ANY(%s)"
+
+
+def fetch_ticket_created_at(cursor, ticket_id):
+    """created_at do ticket ou None se ele não existir"""
+    cursor.execute(TICKET_CREATED_AT_SQL, (ticket_id,))
+    row = cursor.fetchone()
+    return row['created_at'] if row else None
+
+
+def fetch_tickets_created_at(cursor, ticket_ids):
+    """created_at (sem repetições) dos tickets existentes entre `ticket_ids`"""
+    cursor.execute(TICKETS_CREATED_AT_SQL, (list(ticket_ids),))
+    return list({row['created_at'] for row in cursor.fetchall()})
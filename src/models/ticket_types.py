@@ -0,0 +1,78 @@
+from flask import current_app
+from src.models.postgres_connection import get_postgres_connection
+import hashlib
+import threading
+import time
+
+TICKET_TYPES_SQL = "SELECT * FROM ticket_types ORDER BY name"
+
+
+class TicketTypeCatalog:
+    """
+    Catálogo de ticket_types carregado uma vez por processo
+
+    A tabela quase nunca muda: o catálogo é recarregado quando passa de
+    `ttl` segundos ou quando um nome desconhecido é pedido (no máximo uma
+    vez a cada `miss_reload_interval` segundos, para não martelar o banco
+    com nomes inválidos).
+    """
+
+    def __init__(self, miss_reload_interval=5.0):
+        self.miss_reload_interval = miss_reload_interval
+        self._lock = threading.Lock()
+        self._rows = None
+        self._ids_by_name = {}
+        self._etag = None
+        self._body = None
+        self._loaded_at = 0.0
+
+    def _ttl(self):
+        return current_app.config.get('TICKET_TYPES_TTL', 300)
+
+    def _load(self, cursor=None):
+        if cursor is None:
+            with get_postgres_connection() as conn:
+                return self._load(conn.cursor())
+
+        cursor.execute(TICKET_TYPES_SQL)
+        self.store([dict(row) for row in cursor.fetchall()])
+
+    def store(self, rows):
+        """Substitui o catálogo pelas linhas dadas (ex.: lidas pelo app assíncrono)"""
+        body = current_app.json.dumps(rows)
+
+        with self._lock:
+            self._rows = rows
+            self._ids_by_name = {row['name']: row['id'] for row in rows}
+            self._body = body
+            self._etag = hashlib.sha1(body.encode()).hexdigest()
+            self._loaded_at = time.monotonic()
+
+    def is_fresh(self):
+        return self._rows is not None and time.monotonic() - self._loaded_at < self._ttl()
+
+    def snapshot(self, cursor=None):
+        """Retorna (linhas, corpo JSON, etag), recarregando se expirado"""
+        if not self.is_fresh():
+            self._load(cursor)
+        with self._lock:
+            return self._rows, self._body, self._etag
+
+    def get_type_id(self, name, cursor=None):
+        """Resolve o nome do tipo para id; None se não existir"""
+        if not self.is_fresh():
+            self._load(cursor)
+
+        type_id = self._ids_by_name.get(name)
+        if type_id is None and time.monotonic() - self._loaded_at >= self.miss_reload_interval:
+            # Tipo pode ter sido criado depois do último carregamento
+            self._load(cursor)
+            type_id = self._ids_by_name.get(name)
+        return type_id
+
+    def invalidate(self):
+        with self._lock:
+            self._rows = None
+
+
+ticket_type_catalog = TicketTypeCatalog()
@@ -1,16 +1,102 @@
 from flask import Blueprint, request, jsonify, current_app
 from src.models.user import User, db
+from src.utils.cache import TTLCache
+from sqlalchemy import event
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
+import time
 
 auth_bp = Blueprint('auth', __name__)
 
-def token_required(f):
-    """Decorator para verificar token JWT"""
+# Usuários ativos por user_id (instâncias desanexadas da sessão, somente
+# leitura) e payloads de tokens já verificados até o seu `exp`: a maioria
+# das requisições autenticadas não toca no SQLite nem refaz o HMAC
+user_cache = TTLCache(maxsize=1024)
+token_cache = TTLCache(maxsize=4096)
+
+
+def invalidate_user_cache(user_id=None):
+    """Remove um usuário (ou todos) do cache de autenticação"""
+    user_cache.invalidate(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, target):
+    # Desativação, troca de role ou senha valem na próxima requisição deste
+    # processo. O cache é por processo: os outros workers continuam aceitando
+    # a cópia antiga até ela expirar, em até AUTH_USER_CACHE_TTL segundos
+    invalidate_user_cache(target.id)
+
+
+def get_auth_cache_stats():
+    return {'users': user_cache.stats(), 'tokens': token_cache.stats()}
+
+
+def _decode_token(token):
+    data = token_cache.get(token)
+    if data is None:
+        data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        remaining = data.get('exp', 0) - time.time()
+        if remaining > 0:
+            token_cache.set(token, data, ttl=remaining)
+    return data
+
+
+def _load_active_user(user_id):
+    """
+    Usuário ativo pelo id (do cache quando possível) ou None
+
+    O cache só é invalidado no processo que alterou o usuário: nos outros
+    workers, desativação e troca de role ou senha levam até
+    AUTH_USER_CACHE_TTL segundos (padrão 5) para valer.
+    """
+    def load():
+        user = User.query.filter_by(id=user_id).first()
+        if not user or not user.is_active:
+            return None
+        # Desanexa para que o commit de outra requisição não expire os atributos
+        db.session.expunge(user)
+        return user
+
+    # get_or_compute descarta cargas feitas durante uma invalidação
+    return user_cache.get_or_compute(
+        user_id, load, ttl=current_app.config.get('AUTH_USER_CACHE_TTL', 5)
+    )
+
+# Finalidade gravada nos tickets de /api/auth/stream-ticket; tokens de login não têm
+STREAM_TICKET_PURPOSE = 'ticket-stream'
+
+
+def authenticate_token(token, purpose=None):
+    """
+    Valida o JWT e retorna o usuário ativo ou None
+
+    `purpose` precisa coincidir com a claim do token: um ticket de stream não
+    vale como token de login e vice-versa.
+    Levanta jwt.ExpiredSignatureError / jwt.InvalidTokenError.
+    """
+    data = _decode_token(token)
+    if data.get('purpose') != purpose:
+        raise jwt.InvalidTokenError('Token com finalidade incorreta')
+    return _load_active_user(data['user_id'])
+
+def token_required(f=None, *, allow_stream_ticket=False):
+    """
+    Decorator para verificar token JWT
+
+    Uso: @token_required ou @token_required(allow_stream_ticket=True). Só rotas
+    com allow_stream_ticket aceitam ?ticket= (ticket de stream, que aparece no
+    access log); nas demais ele é ignorado e só vale o header Authorization.
+    """
+    if f is None:
+        return lambda func: token_required(func, allow_stream_ticket=allow_stream_ticket)
+
     @wraps(f)
     def decorated(*args, **kwargs):
         token = None
+        purpose = None
         auth_header = request.headers.get('Authorization')
         
         if auth_header:
@@ -18,14 +104,18 @@ def token_required(f):
                 token = auth_header.split(" ")[1]  # Bearer <token>
             except IndexError:
                 return jsonify({'message': 'Token inválido'}), 401
+        elif allow_stream_ticket:
+            # EventSource (SSE) não permite definir headers: a query string leva
+            # um ticket de curta duração (ela aparece no access log do servidor)
+            token = request.args.get('ticket')
+            purpose = STREAM_TICKET_PURPOSE
         
         if not token:
             return jsonify({'message': 'Token não fornecido'}), 401
         
         try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.query.filter_by(id=data['user_id']).first()
-            if not current_user or not current_user.is_active:
+            current_user = authenticate_token(token, purpose)
+            if not current_user:
                 return jsonify({'message': 'Usuário inválido'}), 401
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token expirado'}), 401
@@ -76,6 +166,24 @@ def verify_token(current_user):
         'user': current_user.to_dict()
     }), 200
 
+@auth_bp.route('/stream-ticket', methods=['POST'])
+@token_required
+def create_stream_ticket(current_user):
+    """
+    Emite um ticket para abrir GET /api/tickets/stream?ticket=
+
+    Válido por STREAM_TICKET_TTL segundos e só para o stream, então o valor
+    que fica no access log não serve como credencial.
+    """
+    ttl = current_app.config.get('STREAM_TICKET_TTL', 30)
+    ticket = jwt.encode({
+        'user_id': current_user.id,
+        'purpose': STREAM_TICKET_PURPOSE,
+        'exp': datetime.utcnow() + timedelta(seconds=ttl)
+    }, current_app.config['SECRET_KEY'], algorithm='HS256')
+    
+    return jsonify({'ticket': ticket, 'expires_in': ttl}), 200
+
 @auth_bp.route('/create-admin', methods=['POST'])
 def create_admin():
     """Cria usuário admin inicial (apenas para setup)"""
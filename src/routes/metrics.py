@@ -0,0 +1,162 @@
+from flask import Blueprint, Response, current_app, g, jsonify, request
+from src.models.async_postgres import get_async_pool_stats
+from src.models.postgres_connection import get_pool_stats
+from src.models.ticket_events import ticket_events
+from src.routes.auth import token_required, user_cache, token_cache
+from src.routes.stats import stats_cache
+from src.utils.metrics import (
+    metrics, http_requests_total, http_request_duration, collect_all_workers, format_families
+)
+from src.utils.query_stats import query_stats
+import hmac
+import time
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _request_labels():
+    return (request.blueprint or 'app', request.endpoint or 'unmatched', request.method)
+
+
+def _record_request(status):
+    started = g.pop('_metrics_started', None)
+    if started is None:
+        return
+    blueprint, endpoint, method = _request_labels()
+    http_request_duration.observe(time.perf_counter() - started, blueprint, endpoint, method)
+    http_requests_total.inc(blueprint, endpoint, method, str(status))
+
+
+def instrument_app(app):
+    """Registra os hooks que medem todas as requisições do app"""
+
+    @app.before_request
+    def start_request_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        _record_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def record_failed_request(exc):
+        # Exceção não tratada: after_request não roda
+        _record_request(500)
+
+
+@metrics.register_collector
+def _collect_pools():
+    families = []
+    for name, stats in (('dashboard_db_pool', get_pool_stats()), ('dashboard_async_db_pool', get_async_pool_stats())):
+        if stats is None:
+            continue
+        families.append((f'{name}_connections', 'gauge', 'Conexões do pool por estado', [
+            ({'state': 'in_use'}, stats['in_use']),
+            ({'state': 'idle'}, stats['idle']),
+        ]))
+        families.append((f'{name}_max_connections', 'gauge', 'Limite de conexões do pool', [({}, stats['max'])]))
+        if 'created' in stats:
+            families.append((f'{name}_events_total', 'counter', 'Eventos do pool', [
+                ({'event': event}, stats[event])
+                for event in ('created', 'discarded', 'waits', 'timeouts')
+            ]))
+    return families
+
+
+@metrics.register_collector
+def _collect_caches():
+    caches = (('stats', stats_cache), ('auth_users', user_cache), ('auth_tokens', token_cache))
+    lookups, ratios, sizes = [], [], []
+    for name, cache in caches:
+        stats = cache.stats()
+        for result in ('hits', 'stale_hits', 'misses'):
+            lookups.append(({'cache': name, 'result': result}, stats[result]))
+        ratios.append(({'cache': name}, stats['hit_ratio']))
+        sizes.append(({'cache': name}, stats['size']))
+    return [
+        ('dashboard_cache_lookups_total', 'counter', 'Consultas aos caches em memória', lookups),
+        ('dashboard_cache_hit_ratio', 'gauge', 'Fração de consultas atendidas pelo cache', ratios),
+        ('dashboard_cache_entries', 'gauge', 'Entradas em cada cache', sizes),
+    ]
+
+
+@metrics.register_collector
+def _collect_ticket_stream():
+    stats = ticket_events.stats()
+    return [
+        ('dashboard_ticket_stream_subscribers', 'gauge', 'Clientes SSE conectados', [({}, stats['subscribers'])]),
+        ('dashboard_ticket_stream_events_total', 'counter', 'Eventos publicados no stream', [({}, stats['published'])]),
+        ('dashboard_ticket_stream_rejected_total', 'counter', 'Streams recusados pelo limite TICKET_STREAM_MAX', [({}, stats['rejected_subscribers'])]),
+    ]
+
+
+@metrics.register_collector
+def _collect_query_stats():
+    counts, totals, p95s = [], [], []
+    for entry in query_stats.snapshot():
+        labels = {'fingerprint': entry['fingerprint']}
+        counts.append((labels, entry['count']))
+        totals.append((labels, entry['total_seconds']))
+        p95s.append((labels, entry['p95_seconds']))
+    return [
+        ('dashboard_db_statement_calls_total', 'counter', 'Execuções por fingerprint de SQL', counts),
+        ('dashboard_db_statement_seconds_total', 'counter', 'Tempo total por fingerprint de SQL', totals),
+        ('dashboard_db_statement_p95_seconds', 'gauge', 'p95 das execuções recentes por fingerprint de SQL', p95s),
+    ]
+
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """
+    Métricas no formato texto do Prometheus
+
+    Com METRICS_MULTIPROC_DIR (padrão no gunicorn) a resposta soma os
+    snapshots de todos os workers; sem ele, reflete só este processo. Se
+    METRICS_TOKEN estiver definido, exige `Authorization: Bearer <token>`.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(provided.encode(), token.encode()):
+            return Response('unauthorized\n', status=401, mimetype='text/plain')
+
+    directory = current_app.config.get('METRICS_MULTIPROC_DIR')
+    body = format_families(collect_all_workers(metrics, directory)) if directory else metrics.render()
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+
+@metrics_bp.route('/queries', methods=['GET'])
+@token_required
+def get_query_stats(current_user):
+    """
+    Agregados por fingerprint de SQL deste processo (apenas admins),
+    ordenados pelo tempo total; `?limit=` limita a lista
+    """
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acesso negado'}), 403
+
+    limit = request.args.get('limit', type=int)
+    return jsonify({
+        'slow_query_ms': current_app.config.get('SLOW_QUERY_MS', 500),
+        'queries': query_stats.snapshot(limit),
+    })
+
+
+@metrics_bp.route('/queries/explain', methods=['POST'])
+@token_required
+def arm_query_explain(current_user):
+    """
+    Captura o EXPLAIN (ANALYZE, BUFFERS) da próxima execução do fingerprint
+    neste processo (apenas admins); o plano aparece em GET /queries
+    """
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acesso negado'}), 403
+
+    data = request.get_json(silent=True) or {}
+    fingerprint = data.get('fingerprint')
+    if not isinstance(fingerprint, str) or not fingerprint:
+        return jsonify({'message': 'fingerprint é obrigatório'}), 400
+
+    query_stats.arm_explain(fingerprint)
+    return jsonify({'message': 'Plano será capturado na próxima execução', 'fingerprint': fingerprint}), 202
@@ -1,129 +1,251 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, current_app
 from src.models.postgres_connection import get_postgres_connection
+from src.models.ticket_types import ticket_type_catalog
 from src.routes.auth import token_required
+from src.utils.cache import TTLCache
+from src.utils.conditional import (
+    fetch_tickets_version, build_validators, is_not_modified,
+    set_validators, not_modified_response
+)
 
 stats_bp = Blueprint('stats', __name__)
 
+# Respostas de estatísticas são iguais para todos os usuários: ficam em cache
+# por STATS_CACHE_TTL segundos e são invalidadas a cada escrita em tickets
+stats_cache = TTLCache(maxsize=16)
+
+
+def invalidate_stats_cache():
+    """Chamado pelas rotas que alteram tickets"""
+    stats_cache.invalidate()
+
+
+# Chave da versão dos tickets em stats_cache: escritas deste processo a
+# invalidam junto com os payloads; as dos outros workers aparecem em até
+# version_cache_ttl segundos, dentro da janela de CONDITIONAL_GET_GRACE
+VERSION_CACHE_KEY = 'version'
+
+
+def version_cache_ttl(config):
+    return min(config.get('CONDITIONAL_GET_GRACE', 5), config.get('STATS_CACHE_TTL', 10))
+
+
+def _cache_ttls(key):
+    config = current_app.config
+    if key == VERSION_CACHE_KEY:
+        return {'ttl': version_cache_ttl(config)}
+    return {
+        'ttl': config.get('STATS_CACHE_TTL', 10),
+        'stale_ttl': config.get('STATS_CACHE_STALE_TTL', 30),
+    }
+
+
+def cached(key, compute):
+    """
+    Valor de stats_cache ou compute(), com os TTLs da chave
+
+    Usado pelas rotas Flask e (via cached_async) pelas rotas de src/asgi.py,
+    que dividem o cache: as duas têm stale-while-revalidate e descartam
+    valores calculados durante uma invalidação.
+    """
+    return stats_cache.get_or_compute(key, compute, **_cache_ttls(key))
+
+
+async def cached_async(key, compute):
+    """cached() para o app ASGI: compute() devolve uma corrotina"""
+    return await stats_cache.get_or_compute_async(key, compute, **_cache_ttls(key))
+
+
+def _fetch_version():
+    with get_postgres_connection() as conn:
+        cursor = conn.cursor()
+        _, _, types_etag = ticket_type_catalog.snapshot(cursor)
+        return fetch_tickets_version(cursor), types_etag
+
+
+def _conditional_response(resource, compute):
+    """
+    Responde com ETag/Last-Modified derivados da versão dos tickets
+
+    A validação custa só a consulta de versão, que também fica em cache por
+    version_cache_ttl; 304 não toca em ticket_counters. A chave do cache inclui
+    o ETag, então um payload em cache nunca é servido com o validador de outra
+    versão.
+    """
+    version, types_etag = cached(VERSION_CACHE_KEY, _fetch_version)
+
+    etag, last_modified = build_validators(version, resource, types_etag)
+    if is_not_modified(version, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    response = jsonify(cached(f'{resource}:{etag}', compute))
+    return set_validators(response, etag, last_modified), 200
+
+# As estatísticas são lidas de ticket_counter_totals e ticket_counters (mantidas
+# por trigger), então o custo não depende do tamanho do histórico de tickets:
+# os totais vêm da tabela sem dia (tamanho fixo) e ticket_counters só é lida nos
+# últimos 7 dias e em hoje, pelo índice idx_ticket_counters_day.
+# Cada linha pertence a um bucket, identificado pela coluna bucket:
+#   total           -> contagem geral
+#   status_urgency  -> contagem por (status, urgência)
+#   type            -> contagem por tipo
+#   day             -> criados por dia nos últimos 7 dias
+#   completed_today -> finalizados hoje
+AGGREGATE_STATS_SQL = """
+    SELECT
+        CASE GROUPING(status, urgency, type_id)
+            WHEN 7 THEN 'total'
+            WHEN 1 THEN 'status_urgency'
+            WHEN 6 THEN 'type'
+        END AS bucket,
+        NULLIF(status, '') AS status,
+        NULLIF(urgency, '') AS urgency,
+        NULLIF(type_id, 0) AS type_id,
+        NULL::DATE AS day,
+        COALESCE(SUM(count), 0)::BIGINT AS count
+    FROM ticket_counter_totals
+    GROUP BY GROUPING SETS ((), (status, urgency), (type_id))
+    UNION ALL
+    SELECT
+        CASE kind WHEN 'created' THEN 'day' ELSE 'completed_today' END AS bucket,
+        NULL, NULL, NULL,
+        CASE kind WHEN 'created' THEN day END AS day,
+        SUM(count)::BIGINT AS count
+    FROM ticket_counters
+    WHERE day >= CURRENT_DATE - INTERVAL '7 days'
+      AND (kind = 'created' OR day = CURRENT_DATE)
+    GROUP BY kind, CASE kind WHEN 'created' THEN day END
+"""
+
+
+# Finalizados hoje (faixa em completed_at para usar índice)
+COMPLETED_TODAY_SQL = """
+    SELECT * FROM tickets
+    WHERE status = 'completed'
+      AND completed_at >= CURRENT_DATE
+      AND completed_at < CURRENT_DATE + INTERVAL '1 day'
+"""
+
+
+def fetch_ticket_aggregates(cursor):
+    """Executa AGGREGATE_STATS_SQL sobre ticket_counters e organiza o resultado"""
+    cursor.execute(AGGREGATE_STATS_SQL)
+    return summarize_ticket_aggregates(cursor.fetchall())
+
+
+def summarize_ticket_aggregates(rows):
+    """
+    Organiza as linhas de AGGREGATE_STATS_SQL
+
+    Retorna dict com total, completed_today, pending, status, pending_urgency,
+    by_type_id e daily (lista ordenada por data).
+    """
+    result = {
+        'total': 0,
+        'completed_today': 0,
+        'pending': 0,
+        'status': {},
+        'pending_urgency': {},
+        'by_type_id': {},
+        'daily': [],
+    }
+    for row in rows:
+        bucket = row['bucket']
+        # Buckets zerados (ex.: todos os tickets mudaram de status) são omitidos
+        if bucket != 'total' and row['count'] == 0:
+            continue
+        if bucket == 'total':
+            result['total'] = row['count']
+        elif bucket == 'completed_today':
+            result['completed_today'] = row['count']
+        elif bucket == 'status_urgency':
+            status = row['status']
+            result['status'][status] = result['status'].get(status, 0) + row['count']
+            if status == 'pending':
+                result['pending'] += row['count']
+                result['pending_urgency'][row['urgency']] = row['count']
+        elif bucket == 'type':
+            result['by_type_id'][row['type_id']] = row['count']
+        elif bucket == 'day' and row['day'] is not None:
+            result['daily'].append({'date': row['day'].isoformat(), 'count': row['count']})
+
+    result['daily'].sort(key=lambda d: d['date'])
+    return result
+
+
+def _urgency_summary(counts):
+    return {
+        'low': counts.get('low', 0),
+        'medium': counts.get('medium', 0),
+        'high': counts.get('high', 0)
+    }
+
+
 @stats_bp.route('/', methods=['GET'])
 @token_required
 def get_stats(current_user):
     """Busca estatísticas do dashboard"""
     try:
-        with get_postgres_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Tickets pendentes
-            cursor.execute("SELECT COUNT(*) as count FROM tickets WHERE status = 'pending'")
-            pending_count = cursor.fetchone()['count']
-            
-            # Tickets finalizados hoje
-            cursor.execute("""
-                SELECT COUNT(*) as count FROM tickets 
-                WHERE status = 'completed' AND DATE(completed_at) = CURRENT_DATE
-            """)
-            completed_today = cursor.fetchone()['count']
-            
-            # Tickets por urgência (apenas pendentes)
-            cursor.execute("""
-                SELECT urgency, COUNT(*) as count 
-                FROM tickets 
-                WHERE status = 'pending' 
-                GROUP BY urgency
-            """)
-            urgency_results = cursor.fetchall()
-            urgency_stats = {row['urgency']: row['count'] for row in urgency_results}
-            
-            # Total de tickets
-            cursor.execute("SELECT COUNT(*) as count FROM tickets")
-            total_tickets = cursor.fetchone()['count']
-            
-            # Tickets por status
-            cursor.execute("""
-                SELECT status, COUNT(*) as count 
-                FROM tickets 
-                GROUP BY status
-            """)
-            status_results = cursor.fetchall()
-            status_stats = {row['status']: row['count'] for row in status_results}
-            
-            # Tickets por tipo
-            cursor.execute("""
-                SELECT tt.name, COUNT(t.id) as count 
-                FROM ticket_types tt 
-                LEFT JOIN tickets t ON tt.id = t.type_id 
-                GROUP BY tt.id, tt.name
-                ORDER BY count DESC
-            """)
-            type_results = cursor.fetchall()
-            type_stats = [{'type': row['name'], 'count': row['count']} for row in type_results]
-            
-            # Estatísticas por período (últimos 7 dias)
-            cursor.execute("""
-                SELECT DATE(created_at) as date, COUNT(*) as count 
-                FROM tickets 
-                WHERE created_at >= CURRENT_DATE - INTERVAL '7 days'
-                GROUP BY DATE(created_at)
-                ORDER BY date
-            """)
-            daily_results = cursor.fetchall()
-            daily_stats = [{'date': row['date'].isoformat(), 'count': row['count']} for row in daily_results]
-            
-            return jsonify({
-                'pending': pending_count,
-                'completed_today': completed_today,
-                'total': total_tickets,
-                'urgency': {
-                    'low': urgency_stats.get('low', 0),
-                    'medium': urgency_stats.get('medium', 0),
-                    'high': urgency_stats.get('high', 0)
-                },
-                'status': status_stats,
-                'by_type': type_stats,
-                'daily_last_week': daily_stats
-            }), 200
-            
+        return _conditional_response('stats', _compute_stats)
     except Exception as e:
         return jsonify({'message': f'Erro ao buscar estatísticas: {str(e)}'}), 500
 
+def _compute_stats():
+    with get_postgres_connection() as conn:
+        cursor = conn.cursor()
+        aggregates = fetch_ticket_aggregates(cursor)
+        type_rows, _, _ = ticket_type_catalog.snapshot(cursor)
+        return build_stats_payload(aggregates, type_rows)
+
+def build_stats_payload(aggregates, type_rows):
+    # Tickets por tipo (inclui tipos sem tickets)
+    type_stats = [
+        {'type': row['name'], 'count': aggregates['by_type_id'].get(row['id'], 0)}
+        for row in type_rows
+    ]
+    type_stats.sort(key=lambda t: t['count'], reverse=True)
+
+    return {
+        'pending': aggregates['pending'],
+        'completed_today': aggregates['completed_today'],
+        'total': aggregates['total'],
+        'urgency': _urgency_summary(aggregates['pending_urgency']),
+        'status': aggregates['status'],
+        'by_type': type_stats,
+        'daily_last_week': aggregates['daily']
+    }
+
 @stats_bp.route('/dashboard', methods=['GET'])
 @token_required
 def get_dashboard_stats(current_user):
     """Estatísticas simplificadas para o dashboard principal"""
     try:
-        with get_postgres_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Tickets pendentes
-            cursor.execute("SELECT COUNT(*) as count FROM tickets WHERE status = 'pending'")
-            pending = cursor.fetchone()['count']
-            
-            # Finalizados hoje
-            cursor.execute("""
-                SELECT * FROM tickets 
-                WHERE status = 'completed' AND DATE(completed_at) = CURRENT_DATE
-            """)
-            completed_today_results = cursor.fetchall()
-            
-            # Por urgência (apenas pendentes)
-            cursor.execute("""
-                SELECT urgency, COUNT(*) as count 
-                FROM tickets 
-                WHERE status = 'pending' 
-                GROUP BY urgency
-            """)
-            urgency_results = cursor.fetchall()
-            urgency = {row['urgency']: row['count'] for row in urgency_results}
-            
-            return jsonify({
-                'pending': pending,
-                'completed_today': completed_today_results,
-                'urgency': {
-                    'low': urgency.get('low', 0),
-                    'medium': urgency.get('medium', 0),
-                    'high': urgency.get('high', 0)
-                }
-            }), 200
-            
+        return _conditional_response('dashboard', _compute_dashboard_stats)
     except Exception as e:
         return jsonify({'message': f'Erro ao buscar estatísticas: {str(e)}'}), 500
 
+def _compute_dashboard_stats():
+    with get_postgres_connection() as conn:
+        cursor = conn.cursor()
+        aggregates = fetch_ticket_aggregates(cursor)
+        cursor.execute(COMPLETED_TODAY_SQL)
+        return build_dashboard_payload(aggregates, cursor.fetchall())
+
+def build_dashboard_payload(aggregates, completed_today_rows):
+    return {
+        'pending': aggregates['pending'],
+        'completed_today': completed_today_rows,
+        'urgency': _urgency_summary(aggregates['pending_urgency'])
+    }
+
+
+@stats_bp.cli.command('reconcile-counters')
+def reconcile_counters_command():
+    """Reconstrói ticket_counters a partir de tickets (use após cargas em massa)"""
+    with get_postgres_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT rebuild_ticket_counters() AS buckets")
+        buckets = cursor.fetchone()['buckets']
+        conn.commit()
+
+    print(f"✅ ticket_counters reconstruída: {buckets} buckets")
@@ -1,43 +1,369 @@
-from flask import Blueprint, request, jsonify
-from src.models.postgres_connection import get_postgres_connection
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from src.models.postgres_connection import get_postgres_connection, connection_kwargs
+from src.models.ticket_events import ticket_events, format_sse, StreamLimitError
+from src.models.ticket_types import ticket_type_catalog
+from src.models.ticket_partitions import fetch_ticket_created_at
 from src.routes.auth import token_required
+from src.routes.stats import invalidate_stats_cache
+from src.utils.serialization import json_default
+from src.utils.ticket_limits import VALID_STATUSES, VALID_URGENCIES, MAX_FIELD_LENGTHS
+from src.utils.conditional import (
+    fetch_tickets_version, build_validators, is_not_modified,
+    set_validators, not_modified_response
+)
+from psycopg2.extras import execute_values
+import psycopg2
+import click
 from datetime import datetime
+import base64
+import csv
+import io
+import json
+import uuid
 
 tickets_bp = Blueprint('tickets', __name__)
 
+# Ordem da listagem: urgência (alta primeiro), mais recentes, id como desempate.
+# A chave de urgência é o rank negado para que as três colunas da ordem sejam
+# DESC: o cursor vira uma única comparação de linha, que o índice usa como
+# ponto de partida. A expressão precisa ser idêntica à do índice idx_tickets_listing.
+URGENCY_RANK_SQL = "CASE t.urgency WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END"
+URGENCY_KEY_SQL = f"(-{URGENCY_RANK_SQL})"
+URGENCY_RANK = {'high': 1, 'medium': 2, 'low': 3}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Colunas do export (cabeçalho do CSV e chaves do NDJSON), na ordem de saída
+EXPORT_COLUMNS = (
+    ('id', 't.id'),
+    ('ticket_number', 't.ticket_number'),
+    ('type', 'tt.name'),
+    ('title', 't.title'),
+    ('description', 't.description'),
+    ('requester', 't.requester'),
+    ('requester_email', 't.requester_email'),
+    ('urgency', 't.urgency'),
+    ('status', 't.status'),
+    ('priority', 't.priority'),
+    ('assigned_to', 't.assigned_to'),
+    ('created_by', 't.created_by'),
+    ('created_at', 't.created_at'),
+    ('updated_at', 't.updated_at'),
+    ('completed_at', 't.completed_at'),
+    ('estimated_hours', 't.estimated_hours'),
+    ('actual_hours', 't.actual_hours'),
+    ('resolution', 't.resolution'),
+    ('tags', 't.tags'),
+)
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+REQUIRED_TICKET_FIELDS = ('type', 'title', 'description', 'requester')
+
+
+def validate_ticket_payload(data):
+    """
+    Valida os dados de criação de um ticket; retorna a mensagem de erro ou None
+
+    Verifica também os tipos: no lote (/bulk) um valor nulo ou de tipo errado
+    vira erro do item em vez de falhar no catálogo ou no INSERT do lote inteiro
+    """
+    if not isinstance(data, dict) or not all(k in data for k in REQUIRED_TICKET_FIELDS):
+        return 'Campos obrigatórios: type, title, description, requester'
+
+    for field in REQUIRED_TICKET_FIELDS:
+        value = data[field]
+        if not isinstance(value, str) or not value.strip():
+            return f'{field} deve ser um texto não vazio'
+
+    if data.get('requester_email') is not None and not isinstance(data['requester_email'], str):
+        return 'requester_email deve ser um texto'
+
+    urgency = data.get('urgency', 'medium')
+    if not isinstance(urgency, str) or urgency not in VALID_URGENCIES:
+        return f"Urgência inválida: {urgency}"
+
+    for field, max_length in MAX_FIELD_LENGTHS.items():
+        value = data.get(field)
+        if value is not None and len(value) > max_length:
+            return f'{field} excede {max_length} caracteres'
+
+    return None
+
+
+def _parse_datetime(value, field):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Data inválida em {field}: {value}')
+
+
+def _parse_list(value, field, allowed):
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    invalid = [item for item in items if item not in allowed]
+    if invalid:
+        raise ValueError(f'Valor inválido em {field}: {", ".join(invalid)}')
+    return items
+
+
+def build_ticket_filters(args):
+    """
+    Monta as condições WHERE a partir da query string
+
+    Filtros aceitos: status, urgency (listas separadas por vírgula), type
+    (nome do tipo), assigned_to, created_from e created_to (ISO 8601).
+    Retorna (condições, parâmetros); levanta ValueError para valores inválidos.
+    """
+    conditions = []
+    params = []
+
+    if args.get('status'):
+        conditions.append("t.status = ANY(%s)")
+        params.append(_parse_list(args['status'], 'status', VALID_STATUSES))
+
+    if args.get('urgency'):
+        conditions.append("t.urgency = ANY(%s)")
+        params.append(_parse_list(args['urgency'], 'urgency', VALID_URGENCIES))
+
+    if args.get('type'):
+        conditions.append("tt.name = %s")
+        params.append(args['type'])
+
+    if args.get('assigned_to'):
+        conditions.append("t.assigned_to = %s")
+        params.append(args['assigned_to'])
+
+    if args.get('created_from'):
+        conditions.append("t.created_at >= %s")
+        params.append(_parse_datetime(args['created_from'], 'created_from'))
+
+    if args.get('created_to'):
+        conditions.append("t.created_at < %s")
+        params.append(_parse_datetime(args['created_to'], 'created_to'))
+
+    return conditions, params
+
+
+def _encode_token(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def _decode_token(value):
+    padded = value + '=' * (-len(value) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_cursor(ticket):
+    """Cursor opaco com a posição (urgência, created_at, id) do último ticket da página"""
+    return _encode_token([URGENCY_RANK.get(ticket['urgency']), _isoformat(ticket['created_at']), ticket['id']])
+
+
+def decode_cursor(value):
+    """Inverso de encode_cursor; levanta ValueError para cursores malformados"""
+    try:
+        rank, created_at, ticket_id = _decode_token(value)
+        return int(rank), datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+
+
+def encode_search_cursor(ticket):
+    """Cursor opaco da busca textual: (relevância, id) do último ticket da página"""
+    return _encode_token([ticket['rank'], ticket['id']])
+
+
+def decode_search_cursor(value):
+    try:
+        rank, ticket_id = _decode_token(value)
+        return float(rank), int(ticket_id)
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+
+
+def encode_watermark(tickets_position, deleted_position):
+    """Watermark opaco de GET /changes: posições (timestamp, id) em tickets e tombstones"""
+    return _encode_token([
+        [_isoformat(tickets_position[0]), tickets_position[1]],
+        [_isoformat(deleted_position[0]), deleted_position[1]]
+    ])
+
+
+def decode_watermark(value):
+    """
+    Aceita o watermark devolvido por /changes ou um timestamp ISO 8601
+
+    Retorna ((updated_at, id), (deleted_at, ticket_id)); levanta ValueError.
+    """
+    try:
+        since = datetime.fromisoformat(value)
+        return (since, 0), (since, 0)
+    except ValueError:
+        pass
+
+    try:
+        (updated_at, ticket_id), (deleted_at, deleted_id) = _decode_token(value)
+        return (
+            (datetime.fromisoformat(updated_at), int(ticket_id)),
+            (datetime.fromisoformat(deleted_at), int(deleted_id))
+        )
+    except (ValueError, TypeError):
+        raise ValueError('Watermark inválido')
+
+
+def cap_watermark_position(since, positions, horizon, has_more):
+    """
+    Posição do watermark após uma página de /changes
+
+    `positions` são as posições (timestamp, id) das linhas devolvidas, em
+    ordem. Posições depois de `horizon` (agora - CONDITIONAL_GET_GRACE) ainda
+    podem ganhar linhas anteriores com o COMMIT de transações em andamento,
+    então o watermark para em `horizon`. Numa página cheia o watermark precisa
+    avançar sobre alguma linha devolvida, senão a mesma página voltaria
+    para sempre: usa a última antes de `horizon` ou, se não houver, a última.
+    """
+    last = positions[-1]
+    if last <= horizon:
+        return last
+    if not has_more:
+        return max(since, horizon)
+    settled = [position for position in positions if position <= horizon]
+    return settled[-1] if settled else last
+
+
+def parse_page_size(value):
+    try:
+        limit = int(value) if value else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise ValueError('limit deve ser um número inteiro')
+    if limit < 1:
+        raise ValueError('limit deve ser maior que zero')
+    return min(limit, MAX_PAGE_SIZE)
+
+def build_listing_query(args):
+    """
+    Monta a consulta da listagem de tickets a partir da query string
+
+    Retorna (query, parâmetros, limit); limit é None quando a listagem não é
+    paginada. Com paginação a consulta busca limit + 1 linhas para indicar
+    se existe próxima página. Levanta ValueError para parâmetros inválidos.
+    """
+    conditions, params = build_ticket_filters(args)
+    paginated = 'limit' in args or 'cursor' in args
+    limit = parse_page_size(args.get('limit')) if paginated else None
+
+    if args.get('cursor'):
+        rank, created_at, last_id = decode_cursor(args['cursor'])
+        conditions.append(f"({URGENCY_KEY_SQL}, t.created_at, t.id) < (%s, %s, %s)")
+        params.extend([-rank, created_at, last_id])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT t.*, tt.name as type_name 
+        FROM tickets t 
+        LEFT JOIN ticket_types tt ON t.type_id = tt.id 
+        {where}
+        ORDER BY {URGENCY_KEY_SQL} DESC, t.created_at DESC, t.id DESC
+    """
+    if paginated:
+        query += " LIMIT %s"
+        params.append(limit + 1)
+    return query, params, limit
+
+
+INSERT_TICKET_SQL = """
+    INSERT INTO tickets (type_id, title, description, requester, requester_email, urgency, status, created_by)
+    VALUES (%s, %s, %s, %s, %s, %s, 'pending', %s)
+    RETURNING *
+"""
+
+
+def build_update_query(data, username, ticket_id, created_at):
+    """
+    UPDATE dinâmico de update_ticket: (query, values) só com os campos
+    enviados, ou None se nenhum campo editável veio em `data`.
+    `created_at` (fetch_ticket_created_at) restringe o UPDATE à partição do ticket
+    """
+    update_fields = []
+    values = []
+    
+    if 'urgency' in data:
+        update_fields.append("urgency = %s")
+        values.append(data['urgency'])
+    
+    if 'status' in data:
+        update_fields.append("status = %s")
+        values.append(data['status'])
+        if data['status'] == 'completed':
+            update_fields.append("completed_at = %s")
+            values.append(datetime.utcnow())
+    
+    if 'description' in data:
+        update_fields.append("description = %s")
+        values.append(data['description'])
+    
+    if not update_fields:
+        return None
+    
+    # Adicionar campos de auditoria
+    update_fields.append("updated_at = %s")
+    update_fields.append("updated_by = %s")
+    values.extend([datetime.utcnow(), username])
+    
+    values.extend([ticket_id, created_at])
+    return f"UPDATE tickets SET {', '.join(update_fields)} WHERE id = %s AND created_at = %s RETURNING *", values
+
+
 @tickets_bp.route('/', methods=['GET'])
 @token_required
 def get_tickets(current_user):
-    """Busca todos os tickets"""
+    """
+    Busca tickets com filtros opcionais
+
+    Sem `limit`/`cursor` devolve a lista completa (compatível com o dashboard).
+    Com `limit` e/ou `cursor` devolve uma página: {"tickets": [...], "next_cursor": ...}
+
+    Responde com ETag/Last-Modified; If-None-Match ou If-Modified-Since
+    válidos recebem 304 sem executar a consulta da listagem.
+    """
+    try:
+        query, params, limit = build_listing_query(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    paginated = limit is not None
     try:
         with get_postgres_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT t.*, tt.name as type_name 
-                FROM tickets t 
-                LEFT JOIN ticket_types tt ON t.type_id = tt.id 
-                ORDER BY 
-                    CASE t.urgency 
-                        WHEN 'high' THEN 1 
-                        WHEN 'medium' THEN 2 
-                        WHEN 'low' THEN 3 
-                    END,
-                    t.created_at DESC
-            """)
+
+            _, _, types_etag = ticket_type_catalog.snapshot(cursor)
+            version = fetch_tickets_version(cursor)
+            etag, last_modified = build_validators(
+                version, 'tickets', types_etag, request.query_string.decode()
+            )
+            if is_not_modified(version, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+
+            cursor.execute(query, params)
             tickets = cursor.fetchall()
-            
-            # Converter para lista de dicionários
-            result = []
-            for ticket in tickets:
-                ticket_dict = dict(ticket)
-                # Converter datetime para string ISO
-                if ticket_dict.get('created_at'):
-                    ticket_dict['created_at'] = ticket_dict['created_at'].isoformat()
-                if ticket_dict.get('completed_at'):
-                    ticket_dict['completed_at'] = ticket_dict['completed_at'].isoformat()
-                result.append(ticket_dict)
-            
-            return jsonify(result), 200
+
+            next_cursor = None
+            if paginated and len(tickets) > limit:
+                tickets = tickets[:limit]
+                next_cursor = encode_cursor(tickets[-1])
+
+            # Linhas vão direto para o TicketJSONProvider (datetime/Decimal)
+            if paginated:
+                response = jsonify({'tickets': tickets, 'next_cursor': next_cursor})
+            else:
+                response = jsonify(tickets)
+            return set_validators(response, etag, last_modified), 200
             
     except Exception as e:
         return jsonify({'message': f'Erro ao buscar tickets: {str(e)}'}), 500
@@ -49,25 +375,21 @@ def create_ticket(current_user):
     try:
         data = request.get_json()
         
-        if not data or not all(k in data for k in ['type', 'title', 'description', 'requester']):
-            return jsonify({'message': 'Campos obrigatórios: type, title, description, requester'}), 400
+        error = validate_ticket_payload(data)
+        if error:
+            return jsonify({'message': error}), 400
         
         with get_postgres_connection() as conn:
             cursor = conn.cursor()
             
-            # Buscar type_id
-            cursor.execute("SELECT id FROM ticket_types WHERE name = %s", (data['type'],))
-            type_result = cursor.fetchone()
-            if not type_result:
+            # Buscar type_id (catálogo em memória)
+            type_id = ticket_type_catalog.get_type_id(data['type'], cursor)
+            if type_id is None:
                 return jsonify({'message': 'Tipo de ticket inválido'}), 400
             
             # Inserir novo ticket
-            cursor.execute("""
-                INSERT INTO tickets (type_id, title, description, requester, requester_email, urgency, status, created_by)
-                VALUES (%s, %s, %s, %s, %s, %s, 'pending', %s)
-                RETURNING *
-            """, (
-                type_result['id'], 
+            cursor.execute(INSERT_TICKET_SQL, (
+                type_id, 
                 data['title'],
                 data['description'], 
                 data['requester'], 
@@ -78,17 +400,94 @@ def create_ticket(current_user):
             
             new_ticket = cursor.fetchone()
             conn.commit()
+            invalidate_stats_cache()
             
-            # Converter datetime para string
-            ticket_dict = dict(new_ticket)
-            if ticket_dict.get('created_at'):
-                ticket_dict['created_at'] = ticket_dict['created_at'].isoformat()
-            
-            return jsonify(ticket_dict), 201
+            return jsonify(new_ticket), 201
             
     except Exception as e:
         return jsonify({'message': f'Erro ao criar ticket: {str(e)}'}), 500
 
+@tickets_bp.route('/bulk', methods=['POST'])
+@token_required
+def create_tickets_bulk(current_user):
+    """
+    Cria vários tickets em uma requisição
+
+    Aceita uma lista de tickets (ou {"tickets": [...]}) no mesmo formato do
+    POST /. Itens inválidos são reportados individualmente e os válidos são
+    inseridos com um único INSERT multi-linha. Retorna 201 se todos foram
+    criados, 207 se apenas parte e 400 se nenhum.
+    """
+    data = request.get_json(silent=True)
+    items = data.get('tickets') if isinstance(data, dict) else data
+
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': 'Envie uma lista de tickets'}), 400
+
+    max_items = current_app.config.get('TICKETS_BULK_MAX', 1000)
+    if len(items) > max_items:
+        return jsonify({'message': f'Máximo de {max_items} tickets por requisição'}), 400
+
+    try:
+        with get_postgres_connection() as conn:
+            cursor = conn.cursor()
+
+            results = [None] * len(items)
+            rows = []
+            row_indexes = []
+            for index, item in enumerate(items):
+                error = validate_ticket_payload(item)
+                if error is None:
+                    type_id = ticket_type_catalog.get_type_id(item['type'], cursor)
+                    if type_id is None:
+                        error = 'Tipo de ticket inválido'
+
+                if error:
+                    results[index] = {'index': index, 'status': 'error', 'message': error}
+                    continue
+
+                rows.append((
+                    type_id,
+                    item['title'],
+                    item['description'],
+                    item['requester'],
+                    item.get('requester_email', ''),
+                    item.get('urgency', 'medium'),
+                    'pending',
+                    current_user.username
+                ))
+                row_indexes.append(index)
+
+            if rows:
+                created = execute_values(cursor, """
+                    INSERT INTO tickets (type_id, title, description, requester, requester_email, urgency, status, created_by)
+                    VALUES %s
+                    RETURNING *
+                """, rows, page_size=len(rows), fetch=True)
+                conn.commit()
+                invalidate_stats_cache()
+
+                for index, ticket in zip(row_indexes, created):
+                    results[index] = {'index': index, 'status': 'created', 'ticket': ticket}
+
+            created_count = len(rows)
+            failed_count = len(items) - created_count
+            if failed_count == 0:
+                status_code = 201
+            elif created_count:
+                status_code = 207
+            else:
+                status_code = 400
+
+            return jsonify({
+                'created': created_count,
+                'failed': failed_count,
+                'results': results
+            }), status_code
+
+    except Exception as e:
+        return jsonify({'message': f'Erro ao criar tickets: {str(e)}'}), 500
+
 @tickets_bp.route('/<int:ticket_id>', methods=['PUT'])
 @token_required
 def update_ticket(current_user, ticket_id):
@@ -99,54 +498,27 @@ def update_ticket(current_user, ticket_id):
         if not data:
             return jsonify({'message': 'Dados não fornecidos'}), 400
         
+        if 'urgency' in data and data['urgency'] not in VALID_URGENCIES:
+            return jsonify({'message': f"Urgência inválida: {data['urgency']}"}), 400
+        
         with get_postgres_connection() as conn:
             cursor = conn.cursor()
             
-            # Construir query dinamicamente
-            update_fields = []
-            values = []
-            
-            if 'urgency' in data:
-                update_fields.append("urgency = %s")
-                values.append(data['urgency'])
-            
-            if 'status' in data:
-                update_fields.append("status = %s")
-                values.append(data['status'])
-                if data['status'] == 'completed':
-                    update_fields.append("completed_at = %s")
-                    values.append(datetime.utcnow())
-            
-            if 'description' in data:
-                update_fields.append("description = %s")
-                values.append(data['description'])
-            
-            if not update_fields:
+            created_at = fetch_ticket_created_at(cursor, ticket_id)
+            update = build_update_query(data, current_user.username, ticket_id, created_at)
+            if update is None:
                 return jsonify({'message': 'Nenhum campo para atualizar'}), 400
             
-            # Adicionar campos de auditoria
-            update_fields.append("updated_at = %s")
-            update_fields.append("updated_by = %s")
-            values.extend([datetime.utcnow(), current_user.username])
-            
-            values.append(ticket_id)
-            query = f"UPDATE tickets SET {', '.join(update_fields)} WHERE id = %s RETURNING *"
-            
-            cursor.execute(query, values)
+            cursor.execute(*update)
             updated_ticket = cursor.fetchone()
             
             if not updated_ticket:
                 return jsonify({'message': 'Ticket não encontrado'}), 404
             
             conn.commit()
+            invalidate_stats_cache()
             
-            # Converter datetime para string
-            ticket_dict = dict(updated_ticket)
-            for field in ['created_at', 'completed_at', 'updated_at']:
-                if ticket_dict.get(field):
-                    ticket_dict[field] = ticket_dict[field].isoformat()
-            
-            return jsonify(ticket_dict), 200
+            return jsonify(updated_ticket), 200
             
     except Exception as e:
         return jsonify({'message': f'Erro ao atualizar ticket: {str(e)}'}), 500
@@ -161,30 +533,370 @@ def delete_ticket(current_user, ticket_id):
         
         with get_postgres_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM tickets WHERE id = %s RETURNING id", (ticket_id,))
+            created_at = fetch_ticket_created_at(cursor, ticket_id)
+            cursor.execute(
+                "DELETE FROM tickets WHERE id = %s AND created_at = %s RETURNING id",
+                (ticket_id, created_at)
+            )
             deleted = cursor.fetchone()
             
             if not deleted:
                 return jsonify({'message': 'Ticket não encontrado'}), 404
             
             conn.commit()
+            invalidate_stats_cache()
             return jsonify({'message': 'Ticket deletado com sucesso'}), 200
             
     except Exception as e:
         return jsonify({'message': f'Erro ao deletar ticket: {str(e)}'}), 500
 
-@tickets_bp.route('/types', methods=['GET'])
+@tickets_bp.route('/changes', methods=['GET'])
 @token_required
-def get_ticket_types(current_user):
-    """Busca tipos de tickets disponíveis"""
+def get_ticket_changes(current_user):
+    """
+    Sincronização incremental: tickets criados/alterados e ids removidos desde `since`
+
+    `since` é o watermark devolvido pela chamada anterior (ou um timestamp ISO);
+    sem `since` devolve tudo desde o início. Quando `has_more` é true, chame de
+    novo com o watermark recebido até esvaziar.
+
+    O watermark nunca passa de agora - CONDITIONAL_GET_GRACE: uma transação que
+    ainda não fez COMMIT grava updated_at anterior às linhas já visíveis e seria
+    pulada. Mudanças dessa janela voltam na chamada seguinte (aplique por id).
+    """
+    try:
+        limit = parse_page_size(request.args.get('limit'))
+        if request.args.get('since'):
+            tickets_position, deleted_position = decode_watermark(request.args['since'])
+        else:
+            tickets_position = deleted_position = (datetime.min, 0)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
     try:
         with get_postgres_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM ticket_types ORDER BY name")
-            types = cursor.fetchall()
-            
-            return jsonify([dict(t) for t in types]), 200
+
+            cursor.execute(
+                "SELECT LOCALTIMESTAMP - %s * INTERVAL '1 second' AS horizon",
+                (current_app.config.get('CONDITIONAL_GET_GRACE', 5),)
+            )
+            horizon = (cursor.fetchone()['horizon'], 0)
+
+            # Servido pelo índice idx_tickets_updated_at (updated_at, id)
+            cursor.execute("""
+                SELECT t.*, tt.name as type_name
+                FROM tickets t
+                LEFT JOIN ticket_types tt ON t.type_id = tt.id
+                WHERE (t.updated_at, t.id) > (%s, %s)
+                ORDER BY t.updated_at, t.id
+                LIMIT %s
+            """, (tickets_position[0], tickets_position[1], limit + 1))
+            changed = cursor.fetchall()
+
+            cursor.execute("""
+                SELECT ticket_id, deleted_at
+                FROM ticket_tombstones
+                WHERE (deleted_at, ticket_id) > (%s, %s)
+                ORDER BY deleted_at, ticket_id
+                LIMIT %s
+            """, (deleted_position[0], deleted_position[1], limit + 1))
+            deleted = cursor.fetchall()
+
+            more_changed = len(changed) > limit
+            more_deleted = len(deleted) > limit
+            has_more = more_changed or more_deleted
+            changed = changed[:limit]
+            deleted = deleted[:limit]
+
+            if changed:
+                tickets_position = cap_watermark_position(
+                    tickets_position, [(row['updated_at'], row['id']) for row in changed], horizon, more_changed
+                )
+            if deleted:
+                deleted_position = cap_watermark_position(
+                    deleted_position, [(row['deleted_at'], row['ticket_id']) for row in deleted], horizon, more_deleted
+                )
+
+            return jsonify({
+                'tickets': changed,
+                'deleted': [row['ticket_id'] for row in deleted],
+                'watermark': encode_watermark(tickets_position, deleted_position),
+                'has_more': has_more
+            }), 200
+
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar alterações: {str(e)}'}), 500
+
+@tickets_bp.route('/stream', methods=['GET'])
+@token_required(allow_stream_ticket=True)
+def stream_ticket_changes(current_user):
+    """
+    Stream de mudanças em tickets (Server-Sent Events)
+
+    Eventos `ticket` trazem {"kind": "created"|"updated"|"deleted", "id", "ticket"}.
+    Um evento `resync` indica que o cliente deve recarregar a lista completa.
+    EventSource não envia headers: autentica com ?ticket= (POST /api/auth/stream-ticket).
+
+    Cada stream prende uma thread do worker: acima de TICKET_STREAM_MAX
+    streams no processo a resposta é 503 com Retry-After.
+    """
+    try:
+        subscription = ticket_events.subscribe(
+            connection_kwargs(current_app.config),
+            max_subscribers=current_app.config.get('TICKET_STREAM_MAX')
+        )
+    except StreamLimitError:
+        response = jsonify({'message': 'Limite de streams atingido, tente novamente mais tarde'})
+        response.headers['Retry-After'] = str(current_app.config.get('TICKET_STREAM_RETRY_AFTER', 30))
+        return response, 503
+    heartbeat = current_app.config.get('TICKET_STREAM_HEARTBEAT', 15)
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                item = subscription.get(timeout=heartbeat)
+                if item is None:
+                    # Comentário SSE mantém proxies e o navegador conectados
+                    yield ': keep-alive\n\n'
+                    continue
+                event_id, event = item
+                yield format_sse(event, event_id)
+                if subscription.closed and event['kind'] == 'resync':
+                    return
+        finally:
+            ticket_events.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@tickets_bp.route('/search', methods=['GET'])
+@token_required
+def search_tickets(current_user):
+    """
+    Busca textual em título, descrição e resolução (?q=)
+
+    Aceita a sintaxe de websearch_to_tsquery ("frase exata", -palavra, or)
+    e os filtros da listagem. Ordena por relevância e pagina com `limit` e
+    `cursor`: {"tickets": [...], "next_cursor": ...}
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'message': 'Parâmetro q é obrigatório'}), 400
+
+    try:
+        conditions, filter_params = build_ticket_filters(request.args)
+        limit = parse_page_size(request.args.get('limit'))
+
+        if request.args.get('cursor'):
+            rank, last_id = decode_search_cursor(request.args['cursor'])
+            conditions.append("(ts_rank_cd(s.document, q.query), t.id) < (%s::real, %s)")
+            filter_params.extend([rank, last_id])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    conditions.insert(0, "s.document @@ q.query")
+    query = f"""
+        SELECT t.*, tt.name as type_name, ts_rank_cd(s.document, q.query) AS rank
+        FROM ticket_search s
+        CROSS JOIN websearch_to_tsquery('portuguese', %s) AS q(query)
+        JOIN tickets t ON t.id = s.ticket_id AND t.created_at = s.created_at
+        LEFT JOIN ticket_types tt ON t.type_id = tt.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY rank DESC, t.id DESC
+        LIMIT %s
+    """
+    params = [q, *filter_params, limit + 1]
+
+    try:
+        with get_postgres_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            tickets = cursor.fetchall()
+
+        next_cursor = None
+        if len(tickets) > limit:
+            tickets = tickets[:limit]
+            next_cursor = encode_search_cursor(tickets[-1])
+
+        return jsonify({'tickets': tickets, 'next_cursor': next_cursor}), 200
+
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar tickets: {str(e)}'}), 500
+
+@tickets_bp.route('/requesters', methods=['GET'])
+@token_required
+def search_requesters(current_user):
+    """
+    Busca aproximada de solicitantes por nome ou email (?q=)
+
+    Usa similaridade trigram (pg_trgm) e ILIKE, ambos atendidos pelos índices
+    GIN. Agrupa por solicitante: total de tickets, tickets abertos, emails e
+    data do último ticket, do mais parecido para o menos parecido.
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'message': 'Parâmetro q é obrigatório'}), 400
+
+    try:
+        limit = parse_page_size(request.args.get('limit') or '20')
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    # Curingas digitados pelo usuário são literais no ILIKE
+    pattern = '%' + q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+    try:
+        with get_postgres_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT
+                    requester,
+                    ARRAY_AGG(DISTINCT requester_email) FILTER (WHERE requester_email IS NOT NULL) AS emails,
+                    COUNT(*) AS tickets,
+                    COUNT(*) FILTER (WHERE status IN ('pending', 'in_progress')) AS open_tickets,
+                    MAX(created_at) AS last_ticket_at,
+                    MAX(GREATEST(
+                        similarity(requester, %(q)s),
+                        similarity(COALESCE(requester_email, ''), %(q)s)
+                    )) AS score
+                FROM tickets
+                WHERE requester %% %(q)s
+                   OR requester ILIKE %(pattern)s
+                   OR requester_email %% %(q)s
+                   OR requester_email ILIKE %(pattern)s
+                GROUP BY requester
+                ORDER BY score DESC, tickets DESC, requester
+                LIMIT %(limit)s
+            """, {'q': q, 'pattern': pattern, 'limit': limit})
+            requesters = cursor.fetchall()
+
+        return jsonify({'requesters': requesters}), 200
+
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar solicitantes: {str(e)}'}), 500
+
+@tickets_bp.route('/export', methods=['GET'])
+@token_required
+def export_tickets(current_user):
+    """
+    Exporta tickets em CSV ou NDJSON (?format=csv|ndjson), com os filtros da listagem
+
+    As linhas vêm de um cursor nomeado (server-side) em lotes de
+    TICKETS_EXPORT_BATCH e são escritas conforme chegam: a memória não
+    depende do tamanho do export e o cabeçalho sai antes da consulta. Um erro
+    no meio do export interrompe a conexão (transferência incompleta).
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'message': f"format inválido: use {', '.join(EXPORT_FORMATS)}"}), 400
+
+    try:
+        conditions, params = build_ticket_filters(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    batch_size = current_app.config.get('TICKETS_EXPORT_BATCH', 2000)
+    names = [name for name, _ in EXPORT_COLUMNS]
+    columns = []
+    for name, expression in EXPORT_COLUMNS:
+        if export_format == 'csv' and name == 'tags':
+            expression = "array_to_string(t.tags, ';')"
+        columns.append(f"{expression} AS {name}")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # Ordem por id segue a chave primária: o plano começa a devolver linhas
+    # sem ordenar a tabela inteira
+    query = f"""
+        SELECT {', '.join(columns)}
+        FROM tickets t
+        LEFT JOIN ticket_types tt ON t.type_id = tt.id
+        {where}
+        ORDER BY t.id
+    """
+
+    def write_csv(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def write_ndjson(rows):
+        return ''.join(
+            json.dumps(dict(zip(names, row)), default=json_default, ensure_ascii=False) + '\n'
+            for row in rows
+        )
+
+    write = write_csv if export_format == 'csv' else write_ndjson
+
+    def generate():
+        if export_format == 'csv':
+            yield write_csv([names])
+
+        with get_postgres_connection() as conn:
+            # Tuplas em vez de RealDictRow: menos alocação por linha
+            cursor = conn.cursor(
+                name=f'tickets_export_{uuid.uuid4().hex}',
+                cursor_factory=psycopg2.extensions.cursor
+            )
+            cursor.itersize = batch_size
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield write(rows)
+            except psycopg2.Error:
+                # Os headers já foram enviados: propagar faz o servidor abortar
+                # a resposta sem o chunk final, e o cliente vê a transferência
+                # incompleta em vez de um arquivo truncado que parece inteiro
+                current_app.logger.exception("Erro no export de tickets")
+                raise
+            finally:
+                cursor.close()
+
+    filename = f"tickets-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    return Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[export_format], headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store',
+        'X-Accel-Buffering': 'no'
+    })
+
+@tickets_bp.route('/types', methods=['GET'])
+@token_required
+def get_ticket_types(current_user):
+    """Busca tipos de tickets disponíveis (com ETag / If-None-Match)"""
+    try:
+        _, body, etag = ticket_type_catalog.snapshot()
+
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(body, mimetype='application/json')
+
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
             
     except Exception as e:
         return jsonify({'message': f'Erro ao buscar tipos: {str(e)}'}), 500
 
+
+@tickets_bp.cli.command('ensure-partitions')
+@click.option('--months', default=3, show_default=True, help='Meses à frente do atual')
+def ensure_partitions_command(months):
+    """Cria as partições mensais de tickets e ticket_history (agende diariamente sem pg_cron)"""
+    with get_postgres_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT ensure_ticket_partitions(LOCALTIMESTAMP, LOCALTIMESTAMP + make_interval(months => %s)) AS created",
+            (months,)
+        )
+        created = cursor.fetchone()['created']
+        conn.commit()
+
+    print(f"✅ Partições garantidas até {months} meses à frente: {created} criadas")
@@ -0,0 +1,138 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Cache em memória com expiração por tempo, limite de tamanho (LRU) e
+    stale-while-revalidate
+
+    Depois de expirar, uma entrada ainda pode ser servida por até `stale_ttl`
+    segundos enquanto uma única requisição recalcula o valor; as demais
+    recebem a cópia antiga em vez de repetir a consulta.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # chave -> (valor, expira_em, stale_ate)
+        self._refreshing = set()
+        self._generation = 0
+
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, key):
+        """Retorna o valor ainda válido da chave ou None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[1]:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+            return None
+
+    def set(self, key, value, ttl, stale_ttl=0):
+        now = time.monotonic()
+        with self._lock:
+            self._store(key, value, now + ttl, now + ttl + stale_ttl)
+
+    def _store(self, key, value, expires_at, stale_until):
+        self._entries[key] = (value, expires_at, stale_until)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute, ttl, stale_ttl=0):
+        """
+        Retorna o valor em cache ou calcula com compute()
+
+        ttl <= 0 desativa o cache para a chamada. Valores calculados durante
+        uma invalidação não são armazenados, para não ressuscitar dados antigos.
+        """
+        if ttl <= 0:
+            return compute()
+
+        found, value, generation = self._begin(key)
+        if found:
+            return value
+        try:
+            value = compute()
+        finally:
+            self._end(key)
+        self._finish(key, value, generation, ttl, stale_ttl)
+        return value
+
+    async def get_or_compute_async(self, key, compute, ttl, stale_ttl=0):
+        """get_or_compute para o app ASGI: compute() devolve uma corrotina"""
+        if ttl <= 0:
+            return await compute()
+
+        found, value, generation = self._begin(key)
+        if found:
+            return value
+        try:
+            value = await compute()
+        finally:
+            self._end(key)
+        self._finish(key, value, generation, ttl, stale_ttl)
+        return value
+
+    def _begin(self, key):
+        """
+        (True, valor, None) se a entrada pode ser servida; senão marca a chave
+        como em recálculo e devolve (False, None, geração atual)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, stale_until = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, value, None
+                if now < stale_until and key in self._refreshing:
+                    self._stale_hits += 1
+                    return True, value, None
+
+            self._misses += 1
+            self._refreshing.add(key)
+            return False, None, self._generation
+
+    def _end(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def _finish(self, key, value, generation, ttl, stale_ttl):
+        now = time.monotonic()
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, value, now + ttl, now + ttl + stale_ttl)
+
+    def invalidate(self, key=None):
+        """Remove uma chave (ou todas) e descarta recálculos em andamento"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._generation += 1
+            self._invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._stale_hits + self._misses
+            return {
+                'size': len(self._entries),
+                'hits': self._hits,
+                'stale_hits': self._stale_hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations,
+                'hit_ratio': round((self._hits + self._stale_hits) / lookups, 4) if lookups else None,
+            }
@@ -0,0 +1,83 @@
+from flask import current_app, request
+from datetime import timezone
+import hashlib
+
+# Versão barata dos dados de tickets: os dois MAX são resolvidos por índice
+# (idx_tickets_updated_at e idx_ticket_tombstones_deleted_at). INSERT e UPDATE
+# movem updated_at; DELETE gera um tombstone.
+TICKETS_VERSION_SQL = """
+    SELECT
+        (SELECT MAX(updated_at) FROM tickets) AS updated_at,
+        (SELECT MAX(deleted_at) FROM ticket_tombstones) AS deleted_at,
+        CURRENT_DATE AS today,
+        LOCALTIMESTAMP AS now
+"""
+
+
+def fetch_tickets_version(cursor):
+    cursor.execute(TICKETS_VERSION_SQL)
+    return cursor.fetchone()
+
+
+def build_validators(version, resource, *extra):
+    """
+    Gera (etag, last_modified) para um recurso derivado de tickets
+
+    `extra` entra no ETag para diferenciar variações do mesmo recurso
+    (ex.: query string dos filtros).
+    """
+    changes = [ts for ts in (version['updated_at'], version['deleted_at']) if ts is not None]
+    last_modified = max(changes) if changes else None
+
+    key = '|'.join(str(part) for part in (
+        resource, version['updated_at'], version['deleted_at'], version['today'], *extra
+    ))
+    return hashlib.sha1(key.encode()).hexdigest(), last_modified
+
+
+def is_not_modified(version, etag, last_modified):
+    """Verifica If-None-Match / If-Modified-Since da requisição Flask atual"""
+    return evaluate_preconditions(
+        version, etag, last_modified,
+        request.if_none_match, request.if_modified_since,
+        current_app.config.get('CONDITIONAL_GET_GRACE', 5),
+    )
+
+
+def evaluate_preconditions(version, etag, last_modified, if_none_match, if_modified_since, grace):
+    """
+    Decide se a resposta pode ser 304
+
+    `if_none_match` é um werkzeug ETags e `if_modified_since` um datetime
+    com fuso (como em werkzeug.http.parse_etags / parse_date).
+
+    updated_at recebe o horário de início da transação: uma transação que
+    ainda não fez COMMIT pode aparecer depois com horário anterior ao máximo
+    atual. Por isso, mudanças mais novas que `grace` segundos nunca geram 304.
+    """
+    if last_modified is not None:
+        if (version['now'] - last_modified).total_seconds() < grace:
+            return False
+
+    if if_none_match:
+        return if_none_match.contains(etag)
+
+    if if_modified_since and last_modified is not None:
+        # Datas HTTP têm resolução de segundos
+        modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return modified <= if_modified_since
+
+    return False
+
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified_response(etag, last_modified):
+    return set_validators(current_app.response_class(status=304), etag, last_modified)
@@ -0,0 +1,289 @@
+from bisect import bisect_left
+import json
+import os
+import threading
+import time
+
+# Limites (segundos) dos histogramas de latência
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monotônico com labels"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = list(self._values.items())
+        samples = [(self.name, dict(zip(self.labelnames, labels)), value) for labels, value in sorted(values)]
+        return self.name, 'counter', self.documentation, samples
+
+
+class Histogram:
+    """
+    Histograma com buckets fixos
+
+    observe() faz uma busca binária fora do lock e só incrementa dois
+    contadores dentro dele; a soma cumulativa dos buckets é feita na leitura.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # labels -> [contagens por bucket (+Inf no fim), soma]
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+
+        samples = []
+        for labels, counts, total in sorted(snapshot):
+            label_map = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((f'{self.name}_bucket', {**label_map, 'le': _format_value(float(bound))}, cumulative))
+            samples.append((f'{self.name}_sum', label_map, total))
+            samples.append((f'{self.name}_count', label_map, cumulative))
+        return self.name, 'histogram', self.documentation, samples
+
+
+class MetricsRegistry:
+    """
+    Métricas do processo no formato texto do Prometheus
+
+    Contadores e histogramas são atualizados nas requisições; valores que já
+    existem em outros objetos (pool, caches) são lidos por coletores na hora
+    da coleta, sem custo no caminho da requisição.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect):
+        """
+        `collect()` retorna uma lista de (nome, tipo, ajuda, amostras), com
+        amostras como [(dict de labels, valor), ...]
+        """
+        self._collectors.append(collect)
+        return collect
+
+    def collect(self):
+        """Famílias (nome, tipo, ajuda, [(nome da amostra, labels, valor), ...]) deste processo"""
+        families = [metric.collect() for metric in self._metrics]
+        for collect in self._collectors:
+            for name, metric_type, documentation, samples in collect():
+                families.append((name, metric_type, documentation, [
+                    (name, labels, value) for labels, value in samples if value is not None
+                ]))
+        return families
+
+    def render(self):
+        return format_families(self.collect())
+
+
+def format_families(families):
+    """Formato texto do Prometheus"""
+    lines = []
+    for name, metric_type, documentation, samples in families:
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for sample_name, labels, value in samples:
+            label_text = _format_labels(labels.keys(), labels.values())
+            lines.append(f'{sample_name}{label_text} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# Agregação entre workers (gunicorn). Cada worker grava periodicamente as suas
+# famílias em <dir>/worker-<pid>.json; a coleta soma contadores e histogramas
+# de todos os arquivos e mantém os gauges por worker, com o label `pid`.
+# Quando um worker sai, o mestre incorpora os contadores dele em exited.json
+# para que os totais não voltem atrás.
+EXITED_SNAPSHOT = 'exited.json'
+
+
+def _snapshot_path(directory, pid):
+    return os.path.join(directory, f'worker-{pid}.json')
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_worker_snapshot(registry, directory):
+    """Grava as métricas deste processo para as coletas dos outros workers"""
+    _write_json(_snapshot_path(directory, os.getpid()), registry.collect())
+
+
+def merge_families(snapshots):
+    """
+    Combina [(pid, famílias), ...]: contadores e histogramas são somados por
+    (amostra, labels) e gauges recebem o label `pid` de cada worker
+    """
+    merged = {}
+    for pid, families in snapshots:
+        for name, metric_type, documentation, samples in families:
+            family = merged.setdefault(name, (metric_type, documentation, {}))
+            values = family[2]
+            for sample_name, labels, value in samples:
+                if metric_type == 'gauge':
+                    if pid is None:
+                        continue
+                    labels = {**labels, 'pid': str(pid)}
+                key = (sample_name, tuple(sorted(labels.items())))
+                if metric_type == 'gauge':
+                    values[key] = value
+                else:
+                    values[key] = values.get(key, 0) + value
+    return [
+        (name, metric_type, documentation, [
+            (sample_name, dict(labels), value) for (sample_name, labels), value in values.items()
+        ])
+        for name, (metric_type, documentation, values) in merged.items()
+    ]
+
+
+def collect_all_workers(registry, directory):
+    """Famílias de todos os workers, com a cópia deste processo atualizada agora"""
+    write_worker_snapshot(registry, directory)
+    snapshots = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.json'):
+            continue
+        families = _read_json(os.path.join(directory, filename))
+        if families is None:
+            continue
+        pid = filename[len('worker-'):-len('.json')] if filename.startswith('worker-') else None
+        snapshots.append((pid, families))
+    return merge_families(snapshots)
+
+
+def mark_worker_exited(directory, pid):
+    """Chamado pelo mestre quando um worker sai: preserva os contadores dele"""
+    path = _snapshot_path(directory, pid)
+    families = _read_json(path)
+    if families is not None:
+        exited_path = os.path.join(directory, EXITED_SNAPSHOT)
+        previous = _read_json(exited_path) or []
+        kept = [family for family in families if family[1] != 'gauge']
+        _write_json(exited_path, merge_families([(None, previous), (None, kept)]))
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def reset_snapshot_dir(directory):
+    """Limpa snapshots de uma execução anterior (mestre, antes dos workers)"""
+    os.makedirs(directory, exist_ok=True)
+    for filename in os.listdir(directory):
+        if filename.endswith('.json') or filename.endswith('.tmp'):
+            os.remove(os.path.join(directory, filename))
+
+
+def start_snapshot_writer(registry, directory, interval):
+    """Thread que regrava o snapshot deste worker a cada `interval` segundos"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                write_worker_snapshot(registry, directory)
+            except Exception as e:
+                print(f"Erro ao gravar snapshot de métricas: {e}")
+
+    thread = threading.Thread(target=run, name='metrics-snapshot', daemon=True)
+    thread.start()
+    return thread
+
+
+metrics = MetricsRegistry()
+
+http_requests_total = metrics.counter(
+    'dashboard_http_requests_total',
+    'Requisições HTTP atendidas',
+    ('blueprint', 'endpoint', 'method', 'status'),
+)
+http_request_duration = metrics.histogram(
+    'dashboard_http_request_duration_seconds',
+    'Latência das requisições HTTP (até o início da resposta em streams)',
+    ('blueprint', 'endpoint', 'method'),
+)
+db_connect_duration = metrics.histogram(
+    'dashboard_db_connect_seconds',
+    'Tempo para abrir uma conexão PostgreSQL nova',
+)
+db_pool_wait_duration = metrics.histogram(
+    'dashboard_db_pool_wait_seconds',
+    'Espera por uma conexão livre no pool',
+)
+db_query_duration = metrics.histogram(
+    'dashboard_db_query_seconds',
+    'Duração de cursor.execute por endpoint',
+    ('endpoint',),
+)
+db_rows_total = metrics.counter(
+    'dashboard_db_rows_total',
+    'Linhas devolvidas por consultas, por endpoint',
+    ('endpoint',),
+)
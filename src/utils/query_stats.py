@@ -0,0 +1,165 @@
+from collections import OrderedDict, deque
+import hashlib
+import re
+import threading
+import time
+
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PARAMS = re.compile(r'%\(\w+\)s|%s|\$\d+')
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+# (?, ?), (?, ?), ... de execute_values e listas de IN viram um único (...)
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*')
+
+
+def normalize_sql(query):
+    """
+    Texto da instrução sem valores: literais, placeholders (%s, %(nome)s,
+    $1) e listas de VALUES/IN viram `?`/`(...)`, comentários somem e os
+    espaços são colapsados
+    """
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    text = _COMMENTS.sub(' ', query)
+    text = _STRINGS.sub('?', text)
+    text = _PARAMS.sub('?', text)
+    text = _NUMBERS.sub('?', text)
+    text = _SPACES.sub(' ', text).strip()
+    return _LISTS.sub('(...)', text)
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class QueryStats:
+    """
+    Agregados por fingerprint de SQL (contagem, tempo total, máximo e p95)
+
+    O p95 é calculado sobre as últimas `samples` execuções de cada
+    fingerprint. O número de fingerprints é limitado: ao passar de
+    `max_fingerprints`, o menos usado recentemente é descartado (instruções
+    montadas com literais, como a de execute_values, não crescem sem limite
+    porque a normalização remove os valores).
+    """
+
+    def __init__(self, max_fingerprints=500, samples=256, normalized_cache=2048):
+        self.max_fingerprints = max_fingerprints
+        self.samples = samples
+        self.normalized_cache = normalized_cache
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._normalized = {}
+        self._armed = set()
+
+    def fingerprint(self, query):
+        """Retorna (fingerprint, texto normalizado), com cache pelo texto original"""
+        cached = self._normalized.get(query)
+        if cached is not None:
+            return cached
+        text = normalize_sql(query)
+        result = (hashlib.sha1(text.encode()).hexdigest()[:12], text)
+        if len(self._normalized) >= self.normalized_cache:
+            self._normalized.clear()
+        self._normalized[query] = result
+        return result
+
+    def record(self, query, elapsed, endpoint):
+        """Registra uma execução e retorna (fingerprint, texto normalizado)"""
+        fingerprint, text = self.fingerprint(query)
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                entry = self._entries[fingerprint] = {
+                    'query': text,
+                    'count': 0,
+                    'total': 0.0,
+                    'max': 0.0,
+                    'slow': 0,
+                    'samples': deque(maxlen=self.samples),
+                    'endpoints': set(),
+                    'plan': None,
+                    'plan_at': None,
+                }
+                if len(self._entries) > self.max_fingerprints:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(fingerprint)
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            entry['samples'].append(elapsed)
+            entry['endpoints'].add(endpoint)
+        return fingerprint, text
+
+    def mark_slow(self, fingerprint):
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None:
+                entry['slow'] += 1
+
+    def arm_explain(self, fingerprint):
+        """Pede o EXPLAIN (ANALYZE, BUFFERS) da próxima execução do fingerprint"""
+        with self._lock:
+            self._armed.add(fingerprint)
+
+    def should_explain(self, fingerprint, slow, interval):
+        """
+        True se a execução atual deve ser explicada: o fingerprint foi armado
+        (uma vez) ou a instrução foi lenta e o último plano tem mais de
+        `interval` segundos (interval None desativa a captura automática)
+        """
+        with self._lock:
+            if fingerprint in self._armed:
+                self._armed.discard(fingerprint)
+                return True
+            if not slow or interval is None:
+                return False
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return False
+            return entry['plan_at'] is None or time.time() - entry['plan_at'] >= interval
+
+    def store_plan(self, fingerprint, plan):
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None:
+                entry['plan'] = plan
+                entry['plan_at'] = time.time()
+
+    def snapshot(self, limit=None):
+        """Fingerprints ordenados pelo tempo total, do maior para o menor"""
+        with self._lock:
+            items = [
+                (fingerprint, dict(entry, samples=list(entry['samples']), endpoints=sorted(entry['endpoints'])))
+                for fingerprint, entry in self._entries.items()
+            ]
+            armed = set(self._armed)
+
+        result = []
+        for fingerprint, entry in sorted(items, key=lambda item: item[1]['total'], reverse=True)[:limit]:
+            result.append({
+                'fingerprint': fingerprint,
+                'query': entry['query'],
+                'endpoints': entry['endpoints'],
+                'count': entry['count'],
+                'slow': entry['slow'],
+                'total_seconds': entry['total'],
+                'mean_seconds': entry['total'] / entry['count'],
+                'p95_seconds': _percentile(entry['samples'], 0.95),
+                'max_seconds': entry['max'],
+                'explain_armed': fingerprint in armed,
+                'plan': entry['plan'],
+                'plan_at': entry['plan_at'],
+            })
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._armed.clear()
+
+
+query_stats = QueryStats()
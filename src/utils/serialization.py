@@ -0,0 +1,30 @@
+from flask.json.provider import DefaultJSONProvider
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def json_default(value):
+    """
+    Converte os tipos que o psycopg2 devolve em linhas de tickets
+
+    datetime/date viram ISO 8601 e Decimal (estimated_hours, actual_hours)
+    vira float. Os demais tipos seguem a conversão padrão do Flask.
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return DefaultJSONProvider.default(value)
+
+
+class TicketJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON do app: serializa RealDictRow diretamente
+
+    RealDictRow já é um dict, então o encoder em C do módulo json percorre
+    as linhas sem cópias intermediárias; só os campos datetime/Decimal passam
+    por json_default. As chaves mantêm a ordem das colunas (sem sort_keys).
+    """
+
+    default = staticmethod(json_default)
+    sort_keys = False
@@ -0,0 +1,7 @@
+# Valores aceitos e limites dos campos de tickets, sem dependências: usados pela
+# API (src/routes/tickets.py) e pelo importador standalone (direct_database_client.py)
+VALID_STATUSES = ('pending', 'in_progress', 'completed', 'cancelled')
+VALID_URGENCIES = ('low', 'medium', 'high')
+
+# Tamanho das colunas VARCHAR de tickets preenchidas pela API
+MAX_FIELD_LENGTHS = {'title': 255, 'requester': 255, 'requester_email': 255}
@@ -0,0 +1,8 @@
+-- Índice para a listagem paginada (keyset) de GET /api/tickets
+-- A expressão de urgência precisa ser idêntica a URGENCY_RANK_SQL em src/routes/tickets.py
+
+CREATE INDEX IF NOT EXISTS idx_tickets_listing ON tickets (
+    (CASE urgency WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END),
+    created_at DESC,
+    id DESC
+);
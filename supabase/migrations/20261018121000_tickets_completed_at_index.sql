@@ -0,0 +1,3 @@
+-- Índice para "finalizados hoje" em /api/stats/dashboard (faixa em completed_at)
+
+CREATE INDEX IF NOT EXISTS idx_tickets_completed_at ON tickets(completed_at) WHERE completed_at IS NOT NULL;
@@ -0,0 +1,106 @@
+-- Contadores agregados de tickets para /api/stats e /api/stats/dashboard
+-- Mantidos por trigger; reconstrução manual: SELECT rebuild_ticket_counters();
+
+-- Tabela de contadores agregados para as estatísticas do dashboard
+-- kind = 'created'   -> tickets por (status, urgência, tipo, dia de criação)
+-- kind = 'completed' -> tickets finalizados por (urgência, tipo, dia de finalização)
+-- Valores nulos viram sentinelas ('' / 0 / -infinity) para caber na chave primária
+CREATE TABLE IF NOT EXISTS ticket_counters (
+    kind VARCHAR(10) NOT NULL CHECK (kind IN ('created', 'completed')),
+    status VARCHAR(20) NOT NULL DEFAULT '',
+    urgency VARCHAR(20) NOT NULL DEFAULT '',
+    type_id INTEGER NOT NULL DEFAULT 0,
+    day DATE NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, status, urgency, type_id, day)
+);
+
+-- Função para somar delta a um bucket de ticket_counters
+CREATE OR REPLACE FUNCTION bump_ticket_counter(
+    p_kind VARCHAR, p_status VARCHAR, p_urgency VARCHAR, p_type_id INTEGER, p_day DATE, p_delta INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO ticket_counters (kind, status, urgency, type_id, day, count)
+    VALUES (p_kind, COALESCE(p_status, ''), COALESCE(p_urgency, ''), COALESCE(p_type_id, 0),
+            COALESCE(p_day, '-infinity'::DATE), p_delta)
+    ON CONFLICT (kind, status, urgency, type_id, day)
+    DO UPDATE SET count = ticket_counters.count + EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para manter ticket_counters a cada INSERT/UPDATE/DELETE em tickets
+CREATE OR REPLACE FUNCTION maintain_ticket_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- UPDATE que não mexe em nenhuma dimensão não altera contadores
+    IF TG_OP = 'UPDATE'
+       AND (OLD.status, OLD.urgency, OLD.type_id, OLD.created_at, OLD.completed_at)
+           IS NOT DISTINCT FROM (NEW.status, NEW.urgency, NEW.type_id, NEW.created_at, NEW.completed_at) THEN
+        RETURN NULL;
+    END IF;
+
+    -- Remove a contribuição da versão antiga
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_ticket_counter('created', OLD.status, OLD.urgency, OLD.type_id, DATE(OLD.created_at), -1);
+        IF OLD.status = 'completed' AND OLD.completed_at IS NOT NULL THEN
+            PERFORM bump_ticket_counter('completed', OLD.status, OLD.urgency, OLD.type_id, DATE(OLD.completed_at), -1);
+        END IF;
+    END IF;
+
+    -- Adiciona a contribuição da versão nova
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_ticket_counter('created', NEW.status, NEW.urgency, NEW.type_id, DATE(NEW.created_at), 1);
+        IF NEW.status = 'completed' AND NEW.completed_at IS NOT NULL THEN
+            PERFORM bump_ticket_counter('completed', NEW.status, NEW.urgency, NEW.type_id, DATE(NEW.completed_at), 1);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para manter os contadores
+DROP TRIGGER IF EXISTS trigger_maintain_ticket_counters ON tickets;
+CREATE TRIGGER trigger_maintain_ticket_counters
+    AFTER INSERT OR UPDATE OR DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_ticket_counters();
+
+-- Função para reconstruir ticket_counters a partir de tickets (após cargas em massa)
+-- Uso: SELECT rebuild_ticket_counters();  ou  flask stats reconcile-counters
+CREATE OR REPLACE FUNCTION rebuild_ticket_counters()
+RETURNS BIGINT AS $$
+DECLARE
+    bucket_count BIGINT;
+BEGIN
+    -- Bloqueia escritas em tickets enquanto os contadores são recalculados
+    LOCK TABLE tickets IN SHARE MODE;
+
+    DELETE FROM ticket_counters;
+
+    INSERT INTO ticket_counters (kind, status, urgency, type_id, day, count)
+    SELECT 'created', COALESCE(status, ''), COALESCE(urgency, ''), COALESCE(type_id, 0),
+           COALESCE(DATE(created_at), '-infinity'::DATE), COUNT(*)
+    FROM tickets
+    GROUP BY 1, 2, 3, 4, 5
+    UNION ALL
+    SELECT 'completed', status, COALESCE(urgency, ''), COALESCE(type_id, 0),
+           DATE(completed_at), COUNT(*)
+    FROM tickets
+    WHERE status = 'completed' AND completed_at IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5;
+
+    GET DIAGNOSTICS bucket_count = ROW_COUNT;
+    RETURN bucket_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Popular ticket_counters em bancos que já tinham tickets antes da tabela existir
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM ticket_counters) THEN
+        PERFORM rebuild_ticket_counters();
+    END IF;
+END;
+$$;
@@ -0,0 +1,42 @@
+-- Geração de ticket_number em O(1) e segura sob concorrência
+-- Substitui a busca por MAX(ticket_number) do ano por um contador por ano
+
+-- Contador de números de ticket por ano (evita varrer tickets a cada INSERT)
+CREATE TABLE IF NOT EXISTS ticket_number_counters (
+    year_suffix VARCHAR(2) PRIMARY KEY,
+    last_value INTEGER NOT NULL DEFAULT 0
+);
+
+-- Semear/ajustar os contadores a partir dos números já existentes (TKYY####)
+INSERT INTO ticket_number_counters (year_suffix, last_value)
+SELECT SUBSTRING(ticket_number FROM 3 FOR 2), MAX(CAST(SUBSTRING(ticket_number FROM 5) AS INTEGER))
+FROM tickets
+WHERE ticket_number ~ '^TK[0-9]{3,}$'
+GROUP BY SUBSTRING(ticket_number FROM 3 FOR 2)
+ON CONFLICT (year_suffix)
+DO UPDATE SET last_value = GREATEST(ticket_number_counters.last_value, EXCLUDED.last_value);
+
+-- Função para gerar número do ticket automaticamente
+-- O UPSERT no contador do ano é O(1) e o lock da linha serializa inserts
+-- concorrentes, então dois tickets nunca recebem o mesmo número
+CREATE OR REPLACE FUNCTION generate_ticket_number()
+RETURNS TRIGGER AS $$
+DECLARE
+    current_suffix VARCHAR(2);
+    sequence_num INTEGER;
+BEGIN
+    -- Pegar os últimos 2 dígitos do ano
+    current_suffix := RIGHT(EXTRACT(YEAR FROM CURRENT_DATE)::TEXT, 2);
+    
+    -- Reservar o próximo número sequencial do ano
+    -- (variável não pode se chamar year_suffix: conflitaria com a coluna)
+    INSERT INTO ticket_number_counters AS c (year_suffix, last_value)
+    VALUES (current_suffix, 1)
+    ON CONFLICT (year_suffix) DO UPDATE SET last_value = c.last_value + 1
+    RETURNING c.last_value INTO sequence_num;
+    
+    -- Gerar o número com padding de zeros (acima de 9999 usa mais dígitos)
+    NEW.ticket_number := 'TK' || current_suffix || LPAD(sequence_num::TEXT, GREATEST(4, LENGTH(sequence_num::TEXT)), '0');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,26 @@
+-- Notificações de mudança em tickets para GET /api/tickets/stream (SSE)
+
+-- Função para avisar os ouvintes (LISTEN ticket_changes) sobre mudanças em tickets
+-- Payload: {"id": <ticket id>, "kind": "created" | "updated" | "deleted"}
+CREATE OR REPLACE FUNCTION notify_ticket_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('ticket_changes', json_build_object('id', OLD.id, 'kind', 'deleted')::TEXT);
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify(
+        'ticket_changes',
+        json_build_object('id', NEW.id, 'kind', CASE TG_OP WHEN 'INSERT' THEN 'created' ELSE 'updated' END)::TEXT
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para notificar mudanças (entregue somente após o COMMIT)
+DROP TRIGGER IF EXISTS trigger_notify_ticket_change ON tickets;
+CREATE TRIGGER trigger_notify_ticket_change
+    AFTER INSERT OR UPDATE OR DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_ticket_change();
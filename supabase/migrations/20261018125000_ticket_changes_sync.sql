@@ -0,0 +1,29 @@
+-- Sincronização incremental de tickets (GET /api/tickets/changes)
+-- Índice em updated_at e tombstones para tickets removidos
+
+-- Registro de tickets removidos para a sincronização incremental (GET /api/tickets/changes)
+CREATE TABLE IF NOT EXISTS ticket_tombstones (
+    ticket_id INTEGER PRIMARY KEY,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Função para registrar o tombstone de um ticket removido
+CREATE OR REPLACE FUNCTION record_ticket_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO ticket_tombstones (ticket_id, deleted_at)
+    VALUES (OLD.id, CURRENT_TIMESTAMP)
+    ON CONFLICT (ticket_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para registrar remoções
+DROP TRIGGER IF EXISTS trigger_record_ticket_tombstone ON tickets;
+CREATE TRIGGER trigger_record_ticket_tombstone
+    AFTER DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION record_ticket_tombstone();
+
+CREATE INDEX IF NOT EXISTS idx_tickets_updated_at ON tickets(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_ticket_tombstones_deleted_at ON ticket_tombstones(deleted_at, ticket_id);
@@ -0,0 +1,44 @@
+-- Busca textual em tickets (GET /api/tickets/search)
+-- Documento tsvector (config portuguese) em ticket_search, índice GIN e trigger
+
+-- Documento de busca textual dos tickets (GET /api/tickets/search), mantido por trigger
+-- Fica fora de tickets para não pesar em SELECT t.* e nas respostas da API
+CREATE TABLE IF NOT EXISTS ticket_search (
+    ticket_id INTEGER PRIMARY KEY REFERENCES tickets(id) ON DELETE CASCADE,
+    document TSVECTOR NOT NULL
+);
+
+-- Função que monta o documento: título (peso A), descrição (B) e resolução (C)
+CREATE OR REPLACE FUNCTION ticket_search_document(p_title TEXT, p_description TEXT, p_resolution TEXT)
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('portuguese', COALESCE(p_title, '')), 'A')
+        || setweight(to_tsvector('portuguese', COALESCE(p_description, '')), 'B')
+        || setweight(to_tsvector('portuguese', COALESCE(p_resolution, '')), 'C');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Função para atualizar o documento de busca do ticket
+CREATE OR REPLACE FUNCTION update_ticket_search()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO ticket_search (ticket_id, document)
+    VALUES (NEW.id, ticket_search_document(NEW.title, NEW.description, NEW.resolution))
+    ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para manter ticket_search (só quando os campos pesquisáveis mudam)
+DROP TRIGGER IF EXISTS trigger_update_ticket_search ON tickets;
+CREATE TRIGGER trigger_update_ticket_search
+    AFTER INSERT OR UPDATE OF title, description, resolution ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION update_ticket_search();
+
+-- Popular ticket_search com tickets criados antes do trigger existir
+-- (INSERT direto: não dispara os triggers de tickets nem altera updated_at)
+INSERT INTO ticket_search (ticket_id, document)
+SELECT id, ticket_search_document(title, description, resolution)
+FROM tickets
+ON CONFLICT (ticket_id) DO NOTHING;
+
+CREATE INDEX IF NOT EXISTS idx_ticket_search_document ON ticket_search USING GIN (document);
@@ -0,0 +1,7 @@
+-- Busca aproximada de solicitantes (GET /api/tickets/requesters)
+-- Índices trigram atendem similaridade (%) e ILIKE '%...%' sem varrer tickets
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_tickets_requester_trgm ON tickets USING GIN (requester gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_tickets_requester_email_trgm ON tickets USING GIN (requester_email gin_trgm_ops);
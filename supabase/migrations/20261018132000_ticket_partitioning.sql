@@ -0,0 +1,366 @@
+-- Particionamento mensal de tickets (por created_at) e ticket_history (por changed_at)
+-- Consultas com filtro em created_at só leem as partições do período e
+-- VACUUM/ANALYZE trabalham por mês em vez da tabela inteira.
+--
+-- As tabelas são recriadas e os dados copiados numa única transação, que
+-- bloqueia tickets até o fim: rode em janela de manutenção.
+--
+-- Consequências do particionamento:
+--   * a chave primária passa a incluir a coluna de partição: (id, created_at) e
+--     (id, changed_at); ids continuam vindo das mesmas sequências
+--   * ticket_number deixa de ter índice único (precisaria incluir created_at);
+--     a unicidade já é garantida por ticket_number_counters
+--   * chaves estrangeiras para tickets(id) não são possíveis: a remoção em
+--     cascata vira trigger e comentários/anexos validam o ticket por trigger
+--   * created_at não pode mais ser alterado (mover a linha de partição
+--     dispararia os triggers de remoção e criação)
+
+-- Função para criar a partição mensal de uma tabela particionada por RANGE
+-- Linhas do mês que tenham caído na partição default (a partição ainda não
+-- existia no INSERT) são movidas para a nova partição
+CREATE OR REPLACE FUNCTION create_monthly_partition(p_parent TEXT, p_column TEXT, p_month DATE)
+RETURNS BOOLEAN AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := p_parent || '_' || to_char(p_month, 'YYYY_MM');
+    default_name TEXT := p_parent || '_default';
+    has_stray_rows BOOLEAN := FALSE;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    IF to_regclass(default_name) IS NOT NULL THEN
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE %I >= %L AND %I < %L)',
+                       default_name, p_column, month_start, p_column, month_end)
+        INTO has_stray_rows;
+    END IF;
+
+    IF NOT has_stray_rows THEN
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                       partition_name, p_parent, month_start, month_end);
+        RETURN TRUE;
+    END IF;
+
+    -- A default desanexada não tem mais os triggers da tabela: as linhas mudam
+    -- de partição sem gerar histórico, contadores, tombstones ou notificações
+    EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', p_parent, default_name);
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, p_parent);
+    EXECUTE format('WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                   default_name, p_column, month_start, p_column, month_end, partition_name);
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   p_parent, partition_name, month_start, month_end);
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', p_parent, default_name);
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para garantir as partições mensais de tickets e ticket_history entre duas datas
+-- Uso: SELECT ensure_ticket_partitions();  (mês atual e os 3 seguintes)
+--      ou  flask tickets ensure-partitions
+-- Retorna o número de partições criadas
+CREATE OR REPLACE FUNCTION ensure_ticket_partitions(
+    p_from TIMESTAMP DEFAULT LOCALTIMESTAMP,
+    p_to TIMESTAMP DEFAULT LOCALTIMESTAMP + INTERVAL '3 months'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE;
+    created_count INTEGER := 0;
+BEGIN
+    FOR month_start IN
+        SELECT generate_series(date_trunc('month', p_from), date_trunc('month', p_to), INTERVAL '1 month')::DATE
+    LOOP
+        IF create_monthly_partition('tickets', 'created_at', month_start) THEN
+            created_count := created_count + 1;
+        END IF;
+        IF create_monthly_partition('ticket_history', 'changed_at', month_start) THEN
+            created_count := created_count + 1;
+        END IF;
+    END LOOP;
+    RETURN created_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Views dependem de tickets e são recriadas no fim
+DROP VIEW IF EXISTS v_tickets_summary;
+DROP VIEW IF EXISTS v_ticket_stats;
+
+-- Chaves estrangeiras para tickets(id) (ticket_history, ticket_comments,
+-- ticket_attachments, ticket_search) viram triggers mais abaixo
+DO $$
+DECLARE
+    fk RECORD;
+BEGIN
+    FOR fk IN
+        SELECT conrelid::regclass AS table_name, conname
+        FROM pg_constraint
+        WHERE contype = 'f' AND confrelid = 'tickets'::regclass
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.table_name, fk.conname);
+    END LOOP;
+END;
+$$;
+
+ALTER TABLE tickets RENAME TO tickets_unpartitioned;
+ALTER TABLE ticket_history RENAME TO ticket_history_unpartitioned;
+
+-- Tabela principal de tickets, particionada por mês de criação
+-- Chave primária e índices são criados depois da cópia dos dados
+CREATE TABLE tickets (
+    id INTEGER NOT NULL DEFAULT nextval('tickets_id_seq'),
+    ticket_number VARCHAR(20) NOT NULL,
+    type_id INTEGER CONSTRAINT tickets_type_id_fkey REFERENCES ticket_types(id),
+    title VARCHAR(255) NOT NULL,
+    description TEXT NOT NULL,
+    requester VARCHAR(255) NOT NULL,
+    requester_email VARCHAR(255),
+    urgency VARCHAR(20) DEFAULT 'medium' CONSTRAINT tickets_urgency_check CHECK (urgency IN ('low', 'medium', 'high')),
+    status VARCHAR(20) DEFAULT 'pending' CONSTRAINT tickets_status_check CHECK (status IN ('pending', 'in_progress', 'completed', 'cancelled')),
+    priority INTEGER DEFAULT 3 CONSTRAINT tickets_priority_check CHECK (priority BETWEEN 1 AND 5),
+    assigned_to VARCHAR(100),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP NULL,
+    created_by VARCHAR(100),
+    updated_by VARCHAR(100),
+    estimated_hours DECIMAL(5,2),
+    actual_hours DECIMAL(5,2),
+    resolution TEXT,
+    tags TEXT[]
+) PARTITION BY RANGE (created_at);
+
+-- Tabela de histórico de tickets, particionada por mês da alteração
+CREATE TABLE ticket_history (
+    id INTEGER NOT NULL DEFAULT nextval('ticket_history_id_seq'),
+    ticket_id INTEGER,
+    action VARCHAR(50) NOT NULL,
+    field_name VARCHAR(100),
+    old_value TEXT,
+    new_value TEXT,
+    changed_by VARCHAR(100) NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    notes TEXT
+) PARTITION BY RANGE (changed_at);
+
+-- Partições default: recebem linhas de meses sem partição em vez de falhar o INSERT
+CREATE TABLE tickets_default PARTITION OF tickets DEFAULT;
+CREATE TABLE ticket_history_default PARTITION OF ticket_history DEFAULT;
+
+-- Uma partição por mês com dados, até 3 meses à frente
+SELECT ensure_ticket_partitions(
+    LEAST((SELECT MIN(created_at) FROM tickets_unpartitioned),
+          (SELECT MIN(changed_at) FROM ticket_history_unpartitioned),
+          LOCALTIMESTAMP),
+    GREATEST((SELECT MAX(created_at) FROM tickets_unpartitioned),
+             (SELECT MAX(changed_at) FROM ticket_history_unpartitioned),
+             LOCALTIMESTAMP + INTERVAL '3 months')
+);
+
+-- Cópia sem triggers (ainda não existem nas tabelas novas)
+INSERT INTO tickets (
+    id, ticket_number, type_id, title, description, requester, requester_email, urgency, status,
+    priority, assigned_to, created_at, updated_at, completed_at, created_by, updated_by,
+    estimated_hours, actual_hours, resolution, tags
+)
+SELECT
+    id, ticket_number, type_id, title, description, requester, requester_email, urgency, status,
+    priority, assigned_to, COALESCE(created_at, updated_at, CURRENT_TIMESTAMP), updated_at, completed_at,
+    created_by, updated_by, estimated_hours, actual_hours, resolution, tags
+FROM tickets_unpartitioned;
+
+INSERT INTO ticket_history (id, ticket_id, action, field_name, old_value, new_value, changed_by, changed_at, notes)
+SELECT id, ticket_id, action, field_name, old_value, new_value, changed_by, COALESCE(changed_at, CURRENT_TIMESTAMP), notes
+FROM ticket_history_unpartitioned;
+
+-- As sequências passam para as tabelas novas antes de remover as antigas
+ALTER SEQUENCE tickets_id_seq OWNED BY tickets.id;
+ALTER SEQUENCE ticket_history_id_seq OWNED BY ticket_history.id;
+
+DROP TABLE tickets_unpartitioned;
+DROP TABLE ticket_history_unpartitioned;
+
+ALTER TABLE tickets ADD CONSTRAINT tickets_pkey PRIMARY KEY (id, created_at);
+ALTER TABLE ticket_history ADD CONSTRAINT ticket_history_pkey PRIMARY KEY (id, changed_at);
+
+-- Índices (criados em cada partição, atuais e futuras)
+CREATE INDEX IF NOT EXISTS idx_tickets_ticket_number ON tickets(ticket_number);
+CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status);
+CREATE INDEX IF NOT EXISTS idx_tickets_urgency ON tickets(urgency);
+CREATE INDEX IF NOT EXISTS idx_tickets_created_at ON tickets(created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_type_id ON tickets(type_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_assigned_to ON tickets(assigned_to);
+CREATE INDEX IF NOT EXISTS idx_tickets_completed_at ON tickets(completed_at) WHERE completed_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_tickets_updated_at ON tickets(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_tickets_requester_trgm ON tickets USING GIN (requester gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_tickets_requester_email_trgm ON tickets USING GIN (requester_email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_tickets_listing ON tickets (
+    (CASE urgency WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END),
+    created_at DESC,
+    id DESC
+);
+CREATE INDEX IF NOT EXISTS idx_ticket_history_ticket_id ON ticket_history(ticket_id);
+CREATE INDEX IF NOT EXISTS idx_ticket_attachments_ticket_id ON ticket_attachments(ticket_id);
+
+-- Triggers de tickets (funções inalteradas; valem para todas as partições)
+CREATE TRIGGER trigger_generate_ticket_number
+    BEFORE INSERT ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION generate_ticket_number();
+
+CREATE TRIGGER trigger_update_tickets_updated_at
+    BEFORE UPDATE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER trigger_log_ticket_changes
+    AFTER INSERT OR UPDATE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION log_ticket_changes();
+
+CREATE TRIGGER trigger_maintain_ticket_counters
+    AFTER INSERT OR UPDATE OR DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_ticket_counters();
+
+CREATE TRIGGER trigger_notify_ticket_change
+    AFTER INSERT OR UPDATE OR DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_ticket_change();
+
+CREATE TRIGGER trigger_record_ticket_tombstone
+    AFTER DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION record_ticket_tombstone();
+
+CREATE TRIGGER trigger_update_ticket_search
+    AFTER INSERT OR UPDATE OF title, description, resolution ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION update_ticket_search();
+
+-- Função para impedir a troca de created_at (chave de partição)
+CREATE OR REPLACE FUNCTION keep_ticket_created_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.created_at IS DISTINCT FROM OLD.created_at THEN
+        RAISE EXCEPTION 'created_at do ticket % não pode ser alterado', OLD.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para manter created_at fixo
+CREATE TRIGGER trigger_keep_ticket_created_at
+    BEFORE UPDATE OF created_at ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION keep_ticket_created_at();
+
+-- Função para remover histórico, comentários, anexos e documento de busca
+-- de um ticket removido (substitui o ON DELETE CASCADE das chaves estrangeiras)
+CREATE OR REPLACE FUNCTION delete_ticket_dependents()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM ticket_history WHERE ticket_id = OLD.id;
+    DELETE FROM ticket_comments WHERE ticket_id = OLD.id;
+    DELETE FROM ticket_attachments WHERE ticket_id = OLD.id;
+    DELETE FROM ticket_search WHERE ticket_id = OLD.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para a remoção em cascata
+CREATE TRIGGER trigger_delete_ticket_dependents
+    AFTER DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION delete_ticket_dependents();
+
+-- Função para validar ticket_id em comentários e anexos (substitui a chave estrangeira)
+-- FOR KEY SHARE impede que o ticket seja removido antes do COMMIT
+CREATE OR REPLACE FUNCTION check_ticket_reference()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.ticket_id IS NOT NULL THEN
+        PERFORM 1 FROM tickets WHERE id = NEW.ticket_id FOR KEY SHARE;
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Ticket % não encontrado (%)', NEW.ticket_id, TG_TABLE_NAME
+                USING ERRCODE = 'foreign_key_violation';
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Triggers para validar as referências
+DROP TRIGGER IF EXISTS trigger_check_ticket_reference ON ticket_comments;
+CREATE TRIGGER trigger_check_ticket_reference
+    BEFORE INSERT OR UPDATE OF ticket_id ON ticket_comments
+    FOR EACH ROW
+    EXECUTE FUNCTION check_ticket_reference();
+
+DROP TRIGGER IF EXISTS trigger_check_ticket_reference ON ticket_attachments;
+CREATE TRIGGER trigger_check_ticket_reference
+    BEFORE INSERT OR UPDATE OF ticket_id ON ticket_attachments
+    FOR EACH ROW
+    EXECUTE FUNCTION check_ticket_reference();
+
+-- Views úteis para relatórios
+CREATE VIEW v_tickets_summary AS
+SELECT
+    t.id,
+    t.ticket_number,
+    t.title,
+    t.description,
+    t.requester,
+    t.urgency,
+    t.status,
+    t.created_at,
+    t.completed_at,
+    tt.name as type_name,
+    tt.color as type_color,
+    CASE
+        WHEN t.completed_at IS NOT NULL THEN
+            EXTRACT(EPOCH FROM (t.completed_at - t.created_at))/3600
+        ELSE
+            EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - t.created_at))/3600
+    END as hours_elapsed
+FROM tickets t
+LEFT JOIN ticket_types tt ON t.type_id = tt.id;
+
+-- View para estatísticas
+CREATE VIEW v_ticket_stats AS
+SELECT
+    COUNT(*) as total_tickets,
+    COUNT(*) FILTER (WHERE status = 'pending') as pending_tickets,
+    COUNT(*) FILTER (WHERE status = 'in_progress') as in_progress_tickets,
+    COUNT(*) FILTER (WHERE status = 'completed') as completed_tickets,
+    COUNT(*) FILTER (WHERE urgency = 'high') as high_urgency,
+    COUNT(*) FILTER (WHERE urgency = 'medium') as medium_urgency,
+    COUNT(*) FILTER (WHERE urgency = 'low') as low_urgency,
+    COUNT(*) FILTER (WHERE DATE(completed_at) = CURRENT_DATE) as completed_today,
+    AVG(CASE
+        WHEN completed_at IS NOT NULL THEN
+            EXTRACT(EPOCH FROM (completed_at - created_at))/3600
+    END) as avg_resolution_hours
+FROM tickets;
+
+COMMENT ON TABLE tickets IS 'Tabela principal de tickets de suporte (partições mensais por created_at)';
+COMMENT ON TABLE ticket_history IS 'Histórico de mudanças nos tickets (partições mensais por changed_at)';
+COMMENT ON COLUMN tickets.ticket_number IS 'Número único do ticket no formato TKYY#### (ex: TK250001)';
+COMMENT ON COLUMN tickets.urgency IS 'Nível de urgência: low, medium, high';
+COMMENT ON COLUMN tickets.status IS 'Status atual: pending, in_progress, completed, cancelled';
+COMMENT ON COLUMN tickets.priority IS 'Prioridade numérica de 1 (mais alta) a 5 (mais baixa)';
+
+-- Criação diária das partições futuras quando pg_cron estiver habilitado
+-- (sem pg_cron, agende `flask tickets ensure-partitions` no cron do servidor)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('ensure-ticket-partitions', '0 3 * * *', 'SELECT ensure_ticket_partitions()');
+    END IF;
+END;
+$$;
+
+-- O autovacuum não analisa a tabela particionada em si, só as partições
+ANALYZE tickets;
+ANALYZE ticket_history;
@@ -0,0 +1,7 @@
+-- urgency passa a ser NOT NULL: o cursor da listagem (encode_cursor em
+-- src/routes/tickets.py) guarda o rank da urgência e não representa NULL.
+-- created_at já é NOT NULL por fazer parte da chave primária particionada.
+
+UPDATE tickets SET urgency = 'medium' WHERE urgency IS NULL;
+
+ALTER TABLE tickets ALTER COLUMN urgency SET NOT NULL;
@@ -0,0 +1,25 @@
+-- Divide cada bucket de ticket_counters em slots (pg_backend_pid() % 16)
+-- Antes, todo INSERT em tickets fazia upsert na mesma linha (kind, status,
+-- urgência, tipo, dia) e as transações concorrentes esperavam o lock dessa
+-- linha até o commit umas das outras. Com o slot por sessão, conexões
+-- diferentes do pool atualizam linhas diferentes; AGGREGATE_STATS_SQL já soma
+-- count por bucket e rebuild_ticket_counters() compacta tudo no slot 0.
+
+ALTER TABLE ticket_counters ADD COLUMN IF NOT EXISTS slot SMALLINT NOT NULL DEFAULT 0;
+
+ALTER TABLE ticket_counters DROP CONSTRAINT IF EXISTS ticket_counters_pkey;
+ALTER TABLE ticket_counters ADD PRIMARY KEY (kind, status, urgency, type_id, day, slot);
+
+-- Função para somar delta ao slot da sessão atual
+CREATE OR REPLACE FUNCTION bump_ticket_counter(
+    p_kind VARCHAR, p_status VARCHAR, p_urgency VARCHAR, p_type_id INTEGER, p_day DATE, p_delta INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO ticket_counters (kind, status, urgency, type_id, day, slot, count)
+    VALUES (p_kind, COALESCE(p_status, ''), COALESCE(p_urgency, ''), COALESCE(p_type_id, 0),
+            COALESCE(p_day, '-infinity'::DATE), pg_backend_pid() % 16, p_delta)
+    ON CONFLICT (kind, status, urgency, type_id, day, slot)
+    DO UPDATE SET count = ticket_counters.count + EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
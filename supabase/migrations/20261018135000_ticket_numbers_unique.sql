@@ -0,0 +1,46 @@
+-- Volta a garantir ticket_number único em tickets particionada
+-- A chave primária de tickets inclui created_at, então um índice UNIQUE só em
+-- ticket_number não é aceito. ticket_number_counters evita colisões só para os
+-- números gerados por generate_ticket_number(); quem grava ticket_number com os
+-- triggers desligados (generate_dataset.py, session_replication_role = replica)
+-- ou informa o número no INSERT passava sem verificação.
+-- ticket_numbers guarda um número por ticket com chave primária própria e é
+-- mantida por um trigger ENABLE ALWAYS, que dispara também em modo replica.
+-- Falha se já houver números repetidos: corrija-os antes de aplicar.
+
+CREATE TABLE IF NOT EXISTS ticket_numbers (
+    ticket_number VARCHAR(20) PRIMARY KEY,
+    ticket_id INTEGER NOT NULL
+);
+
+INSERT INTO ticket_numbers (ticket_number, ticket_id)
+SELECT ticket_number, id FROM tickets;
+
+-- Função para reservar e liberar o número do ticket
+CREATE OR REPLACE FUNCTION claim_ticket_number()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.ticket_number IS NOT DISTINCT FROM OLD.ticket_number THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM ticket_numbers WHERE ticket_number = OLD.ticket_number;
+    END IF;
+
+    -- Número repetido viola ticket_numbers_pkey e desfaz o comando em tickets
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO ticket_numbers (ticket_number, ticket_id)
+        VALUES (NEW.ticket_number, NEW.id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_claim_ticket_number ON tickets;
+CREATE TRIGGER trigger_claim_ticket_number
+    AFTER INSERT OR UPDATE OF ticket_number OR DELETE ON tickets
+    FOR EACH ROW
+    EXECUTE FUNCTION claim_ticket_number();
+
+ALTER TABLE tickets ENABLE ALWAYS TRIGGER trigger_claim_ticket_number;
@@ -0,0 +1,59 @@
+-- created_at de cada ticket em ticket_numbers, para buscas por id com poda de partição
+-- Sem created_at no WHERE, um comando por id em tickets planeja e trava todas
+-- as partições: com ~30 partições, 2 a 3 ms de planejamento contra 0,1 ms na
+-- tabela sem particionamento, crescendo a cada mês. ticket_numbers não é
+-- particionada e tem um índice em ticket_id: o app busca created_at por ali e
+-- envia o valor literal no WHERE (src/models/ticket_partitions.py), e o
+-- planejador abre só a partição do ticket. created_at não muda depois do INSERT
+-- (keep_ticket_created_at), então a cópia não precisa ser atualizada.
+
+ALTER TABLE ticket_numbers ADD COLUMN IF NOT EXISTS created_at TIMESTAMP;
+
+UPDATE ticket_numbers n
+SET created_at = t.created_at
+FROM tickets t
+WHERE t.id = n.ticket_id AND n.created_at IS NULL;
+
+ALTER TABLE ticket_numbers ALTER COLUMN created_at SET NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ticket_numbers_ticket_id ON ticket_numbers (ticket_id) INCLUDE (created_at);
+
+-- Função para reservar e liberar o número do ticket
+CREATE OR REPLACE FUNCTION claim_ticket_number()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.ticket_number IS NOT DISTINCT FROM OLD.ticket_number THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM ticket_numbers WHERE ticket_number = OLD.ticket_number;
+    END IF;
+
+    -- Número repetido viola ticket_numbers_pkey e desfaz o comando em tickets
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO ticket_numbers (ticket_number, ticket_id, created_at)
+        VALUES (NEW.ticket_number, NEW.id, NEW.created_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Validação de ticket_id em comentários e anexos com created_at conhecido:
+-- o SELECT em tickets lê só a partição do ticket
+CREATE OR REPLACE FUNCTION check_ticket_reference()
+RETURNS TRIGGER AS $$
+DECLARE
+    ticket_created_at TIMESTAMP;
+BEGIN
+    IF NEW.ticket_id IS NOT NULL THEN
+        SELECT created_at INTO ticket_created_at FROM ticket_numbers WHERE ticket_id = NEW.ticket_id;
+        PERFORM 1 FROM tickets WHERE id = NEW.ticket_id AND created_at = ticket_created_at FOR KEY SHARE;
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Ticket % não encontrado (%)', NEW.ticket_id, TG_TABLE_NAME
+                USING ERRCODE = 'foreign_key_violation';
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,18 @@
+-- Recria idx_tickets_listing com a urgência negada e as três colunas DESC
+-- A ordem (urgência crescente, created_at e id decrescentes) não cabia numa
+-- comparação de linha só: o cursor era um OR que o índice não usa como ponto
+-- de partida, e cada página relia o índice do início em todas as partições
+-- (custo proporcional à posição). Com a chave -rank DESC o cursor vira
+-- (chave, created_at, id) < (...) e cada página começa direto na posição.
+-- A expressão precisa ser idêntica a URGENCY_KEY_SQL em src/routes/tickets.py
+--
+-- Em tabela particionada CREATE INDEX não aceita CONCURRENTLY e trava as
+-- escritas em tickets até o fim: rode em janela de manutenção.
+
+DROP INDEX IF EXISTS idx_tickets_listing;
+
+CREATE INDEX idx_tickets_listing ON tickets (
+    (-(CASE urgency WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END)) DESC,
+    created_at DESC,
+    id DESC
+);
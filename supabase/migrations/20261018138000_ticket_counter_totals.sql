@@ -0,0 +1,128 @@
+-- Totais de todo o histórico de tickets sem a coluna day (ticket_counter_totals)
+-- AGGREGATE_STATS_SQL somava todos os buckets 'created' de ticket_counters, um
+-- por (status, urgência, tipo, dia, slot): as linhas lidas cresciam com cada dia
+-- de histórico e os slots multiplicavam isso por até 16. Agora os totais por
+-- (status, urgência) e por tipo vêm de ticket_counter_totals, com tamanho fixo
+-- (statuses x urgências x tipos x slots), e ticket_counters só é lida nos
+-- últimos 7 dias e em hoje, pelo índice em day.
+--
+-- Trava escritas em tickets enquanto copia os totais (mesmo lock de
+-- rebuild_ticket_counters): sem isso um INSERT concorrente entraria em
+-- ticket_counters mas não nos totais.
+
+LOCK TABLE tickets IN SHARE MODE;
+
+CREATE TABLE IF NOT EXISTS ticket_counter_totals (
+    status VARCHAR(20) NOT NULL DEFAULT '',
+    urgency VARCHAR(20) NOT NULL DEFAULT '',
+    type_id INTEGER NOT NULL DEFAULT 0,
+    slot SMALLINT NOT NULL DEFAULT 0,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, urgency, type_id, slot)
+);
+
+DELETE FROM ticket_counter_totals;
+
+INSERT INTO ticket_counter_totals (status, urgency, type_id, count)
+SELECT status, urgency, type_id, SUM(count)
+FROM ticket_counters
+WHERE kind = 'created'
+GROUP BY status, urgency, type_id;
+
+CREATE INDEX IF NOT EXISTS idx_ticket_counters_day ON ticket_counters (day, kind);
+
+-- Função para somar delta ao total de todo o histórico (slot da sessão atual)
+CREATE OR REPLACE FUNCTION bump_ticket_total(
+    p_status VARCHAR, p_urgency VARCHAR, p_type_id INTEGER, p_delta INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO ticket_counter_totals (status, urgency, type_id, slot, count)
+    VALUES (COALESCE(p_status, ''), COALESCE(p_urgency, ''), COALESCE(p_type_id, 0),
+            pg_backend_pid() % 16, p_delta)
+    ON CONFLICT (status, urgency, type_id, slot)
+    DO UPDATE SET count = ticket_counter_totals.count + EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para manter ticket_counters e ticket_counter_totals a cada INSERT/UPDATE/DELETE em tickets
+CREATE OR REPLACE FUNCTION maintain_ticket_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- UPDATE que não mexe em nenhuma dimensão não altera contadores
+    IF TG_OP = 'UPDATE'
+       AND (OLD.status, OLD.urgency, OLD.type_id, OLD.created_at, OLD.completed_at)
+           IS NOT DISTINCT FROM (NEW.status, NEW.urgency, NEW.type_id, NEW.created_at, NEW.completed_at) THEN
+        RETURN NULL;
+    END IF;
+
+    -- Remove a contribuição da versão antiga
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_ticket_counter('created', OLD.status, OLD.urgency, OLD.type_id, DATE(OLD.created_at), -1);
+        IF OLD.status = 'completed' AND OLD.completed_at IS NOT NULL THEN
+            PERFORM bump_ticket_counter('completed', OLD.status, OLD.urgency, OLD.type_id, DATE(OLD.completed_at), -1);
+        END IF;
+    END IF;
+
+    -- Adiciona a contribuição da versão nova
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_ticket_counter('created', NEW.status, NEW.urgency, NEW.type_id, DATE(NEW.created_at), 1);
+        IF NEW.status = 'completed' AND NEW.completed_at IS NOT NULL THEN
+            PERFORM bump_ticket_counter('completed', NEW.status, NEW.urgency, NEW.type_id, DATE(NEW.completed_at), 1);
+        END IF;
+    END IF;
+
+    -- Totais sem dia: só mudam quando status, urgência ou tipo mudam
+    IF TG_OP = 'DELETE'
+       OR (TG_OP = 'UPDATE' AND (OLD.status, OLD.urgency, OLD.type_id)
+                                IS DISTINCT FROM (NEW.status, NEW.urgency, NEW.type_id)) THEN
+        PERFORM bump_ticket_total(OLD.status, OLD.urgency, OLD.type_id, -1);
+    END IF;
+    IF TG_OP = 'INSERT'
+       OR (TG_OP = 'UPDATE' AND (OLD.status, OLD.urgency, OLD.type_id)
+                                IS DISTINCT FROM (NEW.status, NEW.urgency, NEW.type_id)) THEN
+        PERFORM bump_ticket_total(NEW.status, NEW.urgency, NEW.type_id, 1);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para reconstruir ticket_counters e ticket_counter_totals a partir de tickets
+-- Grava um único slot (0) por bucket, compactando os slots acumulados pelo trigger
+CREATE OR REPLACE FUNCTION rebuild_ticket_counters()
+RETURNS BIGINT AS $$
+DECLARE
+    bucket_count BIGINT;
+    total_count BIGINT;
+BEGIN
+    -- Bloqueia escritas em tickets enquanto os contadores são recalculados
+    LOCK TABLE tickets IN SHARE MODE;
+
+    DELETE FROM ticket_counters;
+    DELETE FROM ticket_counter_totals;
+
+    INSERT INTO ticket_counters (kind, status, urgency, type_id, day, count)
+    SELECT 'created', COALESCE(status, ''), COALESCE(urgency, ''), COALESCE(type_id, 0),
+           COALESCE(DATE(created_at), '-infinity'::DATE), COUNT(*)
+    FROM tickets
+    GROUP BY 1, 2, 3, 4, 5
+    UNION ALL
+    SELECT 'completed', status, COALESCE(urgency, ''), COALESCE(type_id, 0),
+           DATE(completed_at), COUNT(*)
+    FROM tickets
+    WHERE status = 'completed' AND completed_at IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5;
+
+    GET DIAGNOSTICS bucket_count = ROW_COUNT;
+
+    INSERT INTO ticket_counter_totals (status, urgency, type_id, count)
+    SELECT status, urgency, type_id, SUM(count)
+    FROM ticket_counters
+    WHERE kind = 'created'
+    GROUP BY status, urgency, type_id;
+
+    GET DIAGNOSTICS total_count = ROW_COUNT;
+    RETURN bucket_count + total_count;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,29 @@
+-- created_at de cada ticket em ticket_search, para a busca textual abrir só as partições dos resultados
+-- /api/tickets/search junta ticket_search com tickets: só por id, cada linha
+-- encontrada no índice GIN procura o ticket em todas as partições. Com
+-- created_at na junção, o planejador poda em tempo de execução e lê só a
+-- partição de cada ticket. created_at não muda depois do INSERT
+-- (keep_ticket_created_at), então o trigger só grava o valor na criação.
+
+ALTER TABLE ticket_search ADD COLUMN IF NOT EXISTS created_at TIMESTAMP;
+
+UPDATE ticket_search s
+SET created_at = t.created_at
+FROM tickets t
+WHERE t.id = s.ticket_id AND s.created_at IS NULL;
+
+-- Documentos de tickets que já não existem não têm created_at
+DELETE FROM ticket_search WHERE created_at IS NULL;
+
+ALTER TABLE ticket_search ALTER COLUMN created_at SET NOT NULL;
+
+-- Função para atualizar o documento de busca do ticket
+CREATE OR REPLACE FUNCTION update_ticket_search()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO ticket_search (ticket_id, created_at, document)
+    VALUES (NEW.id, NEW.created_at, ticket_search_document(NEW.title, NEW.description, NEW.resolution))
+    ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
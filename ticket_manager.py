@@ -14,6 +14,8 @@ class TicketManager:
         self.token = None
         self.session = requests.Session()
         self.ticket_types = []
+        self.local_tickets = {}  # cópia local mantida por sync_tickets()
+        self.watermark = None
     
     def login(self, username=None, password=None):
         """Login interativo ou com credenciais fornecidas"""
@@ -126,19 +128,27 @@ class TicketManager:
         except Exception as e:
             print(f"❌ Erro: {e}")
     
-    def list_tickets(self):
-        """Lista todos os tickets"""
+    def list_tickets(self, page_size=20, **filters):
+        """Lista tickets página a página (filtros: status, urgency, type, assigned_to...)"""
+        params = {"limit": page_size, **filters}
+        page = 1
+        
         try:
-            response = self.session.get(f"{self.base_url}/api/tickets/")
-            
-            if response.status_code == 200:
-                tickets = response.json()
+            while True:
+                response = self.session.get(f"{self.base_url}/api/tickets/", params=params)
+                
+                if response.status_code != 200:
+                    print(f"❌ Erro ao buscar tickets: {response.status_code}")
+                    return
+                
+                data = response.json()
+                tickets = data['tickets']
                 
-                if not tickets:
+                if not tickets and page == 1:
                     print("\n📋 Nenhum ticket encontrado")
                     return
                 
-                print(f"\n📋 TICKETS ({len(tickets)} total)")
+                print(f"\n📋 TICKETS (página {page})")
                 print("-" * 80)
                 
                 for ticket in tickets:
@@ -149,11 +159,51 @@ class TicketManager:
                     print(f"   👤 {ticket['requester']} | {urgency_icon} {ticket['urgency']} | 📅 {ticket['created_at'][:10]}")
                     print(f"   📝 {ticket['description'][:100]}{'...' if len(ticket['description']) > 100 else ''}")
                     print()
-            else:
-                print(f"❌ Erro ao buscar tickets: {response.status_code}")
+                
+                if not data.get('next_cursor'):
+                    return
+                if input("Enter para a próxima página, 'q' para voltar: ").strip().lower() == 'q':
+                    return
+                
+                params['cursor'] = data['next_cursor']
+                page += 1
         except Exception as e:
             print(f"❌ Erro: {e}")
     
+    def sync_tickets(self):
+        """Atualiza a cópia local só com o que mudou desde a última sincronização"""
+        changed = 0
+        removed = 0
+        
+        try:
+            while True:
+                params = {"limit": 500}
+                if self.watermark:
+                    params["since"] = self.watermark
+                
+                response = self.session.get(f"{self.base_url}/api/tickets/changes", params=params)
+                if response.status_code != 200:
+                    print(f"❌ Erro ao sincronizar: {response.status_code}")
+                    return False
+                
+                data = response.json()
+                for ticket in data['tickets']:
+                    self.local_tickets[ticket['id']] = ticket
+                for ticket_id in data['deleted']:
+                    if self.local_tickets.pop(ticket_id, None) is not None:
+                        removed += 1
+                changed += len(data['tickets'])
+                self.watermark = data['watermark']
+                
+                if not data['has_more']:
+                    break
+            
+            print(f"🔄 Sincronizado: {changed} alterados, {removed} removidos, {len(self.local_tickets)} em cache")
+            return True
+        except Exception as e:
+            print(f"❌ Erro: {e}")
+            return False
+    
     def show_stats(self):
         """Mostra estatísticas"""
         try:
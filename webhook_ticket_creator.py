@@ -7,7 +7,7 @@ Para integrar com outros sistemas (formulários web, chatbots, etc.)
 import requests
 import json
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 class WebhookTicketCreator:
     def __init__(self, api_url: str, username: str, password: str):
@@ -60,6 +60,11 @@ class WebhookTicketCreator:
         if not self.token:
             return None
         
+        return self._create_ticket(self.form_payload(form_data))
+    
+    @staticmethod
+    def form_payload(form_data: Dict) -> Dict:
+        """Payload da API (POST /api/tickets/) a partir dos dados do formulário"""
         # Mapear dados do formulário para formato da API
         urgency_map = {
             'baixa': 'low',
@@ -89,7 +94,7 @@ class WebhookTicketCreator:
             "urgency": urgency_map.get(form_data.get('urgencia', '').lower(), 'medium')
         }
         
-        return self._create_ticket(ticket_data)
+        return ticket_data
     
     def create_from_email(self, email_data: Dict) -> Optional[Dict]:
         """
@@ -105,6 +110,11 @@ class WebhookTicketCreator:
         if not self.token:
             return None
         
+        return self._create_ticket(self.email_payload(email_data))
+    
+    @staticmethod
+    def email_payload(email_data: Dict) -> Dict:
+        """Payload da API (POST /api/tickets/) a partir de um email"""
         # Determinar tipo baseado no assunto
         subject = email_data.get('subject', '').lower()
         ticket_type = 'Outros'
@@ -129,7 +139,7 @@ class WebhookTicketCreator:
             "urgency": "medium"
         }
         
-        return self._create_ticket(ticket_data)
+        return ticket_data
     
     def create_from_chatbot(self, chat_data: Dict) -> Optional[Dict]:
         """
@@ -146,6 +156,11 @@ class WebhookTicketCreator:
         if not self.token:
             return None
         
+        return self._create_ticket(self.chatbot_payload(chat_data))
+    
+    @staticmethod
+    def chatbot_payload(chat_data: Dict) -> Dict:
+        """Payload da API (POST /api/tickets/) a partir de uma conversa de chatbot"""
         ticket_data = {
             "type": chat_data.get('category', 'Outros'),
             "title": f"Solicitação via chatbot - {chat_data.get('category', 'Geral')}",
@@ -155,7 +170,7 @@ class WebhookTicketCreator:
             "urgency": chat_data.get('urgency', 'medium')
         }
         
-        return self._create_ticket(ticket_data)
+        return ticket_data
     
     def _create_ticket(self, ticket_data: Dict) -> Optional[Dict]:
         """Cria ticket via API"""
@@ -184,6 +199,44 @@ class WebhookTicketCreator:
             print(f"❌ Erro na requisição: {e}")
             return None
 
+    def create_bulk(self, tickets: List[Dict]) -> List[Dict]:
+        """
+        Cria vários tickets em uma única requisição (POST /api/tickets/bulk)
+        
+        Args:
+            tickets: Lista no formato da API (type, title, description, requester...)
+        
+        Returns:
+            Resultados por item, na mesma ordem da lista enviada
+        """
+        if not self.token or not tickets:
+            return []
+        
+        try:
+            headers = {
+                'Authorization': f'Bearer {self.token}',
+                'Content-Type': 'application/json'
+            }
+            
+            response = requests.post(
+                f"{self.api_url}/api/tickets/bulk",
+                json=tickets,
+                headers=headers,
+                timeout=120
+            )
+            
+            data = response.json()
+            if 'results' not in data:
+                print(f"❌ Erro ao criar tickets: {data}")
+                return []
+            
+            print(f"✅ {data['created']} tickets criados, {data['failed']} com erro")
+            return data['results']
+                
+        except Exception as e:
+            print(f"❌ Erro na requisição: {e}")
+            return []
+
 # ========================================
 # EXEMPLOS DE USO
 # ========================================